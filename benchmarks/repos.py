@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+import dataclasses
+import shutil
+import subprocess
+from pathlib import Path
+
+# bump to regenerate repositories left over from an older version of this module
+GENERATOR_VERSION = 1
+
+PYPROJECT = """\
+[project]
+name = "benchmark"
+dynamic = ["version", "dependencies"]
+
+[tool.uv-dynamic-versioning]
+"""
+
+
+@dataclasses.dataclass(frozen=True)
+class Scale:
+    name: str
+    commits: int
+    tags: int
+    files: int
+    dirty: bool = False
+
+
+SCALES = {
+    scale.name: scale
+    for scale in (
+        Scale("small", commits=1_000, tags=100, files=1_000),
+        Scale("commits", commits=10_000, tags=100, files=1_000),
+        Scale("tags", commits=50_000, tags=50_000, files=1_000),
+        Scale("files", commits=100, tags=10, files=100_000, dirty=True),
+    )
+}
+
+
+def _git(path: Path, *args: str, input: bytes | None = None) -> None:
+    subprocess.run(
+        ["git", "-c", "core.hooksPath=/dev/null", *args],
+        cwd=path,
+        input=input,
+        check=True,
+        capture_output=True,
+    )
+
+
+def _fast_import_stream(scale: Scale) -> bytes:
+    lines = [
+        "blob",
+        "mark :1",
+        "data 5",
+        "file",
+        "blob",
+        "mark :2",
+        f"data {len(PYPROJECT.encode())}",
+        PYPROJECT,
+    ]
+
+    # tag evenly spaced commits, ending with the tip so that `distance` is 0
+    tag_every = max(scale.commits // max(scale.tags, 1), 1)
+    tagged = []
+    for index in range(scale.commits):
+        mark = index + 3
+        lines += [
+            "commit refs/heads/main",
+            f"mark :{mark}",
+            f"committer Benchmark <benchmark@example.com> {1_600_000_000 + index} +0000",
+            f"data {len(str(index))}",
+            str(index),
+        ]
+        if index == 0:
+            lines.append("M 100644 :2 pyproject.toml")
+            lines.append("M 100644 inline version.txt\ndata 5\n1.2.3")
+            # one tree with all the files, so their count doesn't slow down the history
+            lines += [
+                f"M 100644 :1 src/{n // 1000}/{n}.txt" for n in range(scale.files)
+            ]
+        else:
+            lines.append(
+                f"M 100644 inline counter.txt\ndata {len(str(index))}\n{index}"
+            )
+        if (scale.commits - 1 - index) % tag_every == 0 and len(tagged) < scale.tags:
+            tagged.append(mark)
+
+    for number, mark in enumerate(sorted(tagged)):
+        lines += [f"reset refs/tags/v{number // 100}.{number % 100}.0", f"from :{mark}"]
+
+    lines.append("done")
+    return ("\n".join(lines) + "\n").encode()
+
+
+def generate(scale: Scale, directory: Path) -> Path:
+    """Create (or reuse) a synthetic repository for `scale` under `directory`."""
+    path = directory / f"{scale.name}-v{GENERATOR_VERSION}"
+    marker = path / ".git" / "benchmark-ready"
+    if marker.is_file() and marker.read_text() == repr(scale):
+        return path
+
+    shutil.rmtree(path, ignore_errors=True)
+    path.mkdir(parents=True)
+    _git(path, "init", "--quiet", "--initial-branch=main")
+    _git(path, "fast-import", "--quiet", "--done", input=_fast_import_stream(scale))
+    _git(path, "pack-refs", "--all")
+    _git(path, "checkout", "--quiet", "--force", "main")
+
+    if scale.dirty:
+        (path / "pyproject.toml").write_text(PYPROJECT + "\n", encoding="utf-8")
+        (path / "untracked.txt").write_text("untracked", encoding="utf-8")
+
+    marker.write_text(repr(scale))
+    return path
@@ -0,0 +1,193 @@
+"""Time each path of `get_version` against synthetic repositories.
+
+python -m benchmarks --scale small --save baseline.json
+python -m benchmarks --scale small --compare baseline.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import json
+import os
+import platform
+import tempfile
+import time
+from collections.abc import Callable, Iterator, Sequence
+from pathlib import Path
+
+from uv_dynamic_versioning import main as uv_main
+from uv_dynamic_versioning import registry, schemas
+from uv_dynamic_versioning.metadata_hook import DependenciesMetadataHook
+from uv_dynamic_versioning.template import compile_template
+
+from .repos import SCALES, Scale, generate
+
+DEFAULT_THRESHOLD = 0.25
+# differences below this many seconds are timer noise, whatever the ratio
+NOISE_FLOOR = 0.001
+
+
+@contextlib.contextmanager
+def _chdir(path: Path) -> Iterator[None]:
+    # `contextlib.chdir` is Python 3.11+
+    previous = Path.cwd()
+    os.chdir(path)
+    try:
+        yield
+    finally:
+        os.chdir(previous)
+
+
+@contextlib.contextmanager
+def _bypass(version: str) -> Iterator[None]:
+    os.environ["UV_DYNAMIC_VERSIONING_BYPASS"] = version
+    try:
+        yield
+    finally:
+        del os.environ["UV_DYNAMIC_VERSIONING_BYPASS"]
+
+
+def _reset() -> None:
+    # every build is a new process, so don't let in-process memos hide the cost
+    registry.invalidate()
+    uv_main._projects.clear()
+    compile_template.cache_clear()
+
+
+def _metadata_hook(root: Path) -> None:
+    hook = DependenciesMetadataHook(
+        str(root), {"dependencies": ["benchmark=={{ version }}"]}
+    )
+    hook.update({"dynamic": ["dependencies"]})
+
+
+def _bypassed() -> None:
+    with _bypass("1.2.3"):
+        uv_main.get_version(schemas.UvDynamicVersioning())
+
+
+def paths(root: Path) -> dict[str, Callable[[], object]]:
+    """Return the code paths to time, each resolving the version of `root` once."""
+    get_version = uv_main.get_version
+    return {
+        "bypass": _bypassed,
+        "from-file": lambda: get_version(
+            schemas.UvDynamicVersioning.from_dict(
+                {"from-file": {"source": "version.txt"}}
+            )
+        ),
+        "vcs": lambda: get_version(schemas.UvDynamicVersioning()),
+        "vcs-python": lambda: get_version(
+            schemas.UvDynamicVersioning(git_backend=schemas.GitBackend.Python)
+        ),
+        "highest-tag": lambda: get_version(
+            schemas.UvDynamicVersioning(highest_tag=True)
+        ),
+        "format-jinja": lambda: get_version(
+            schemas.UvDynamicVersioning(
+                format_jinja="{{ base }}.post{{ distance }}+{{ commit }}"
+            )
+        ),
+        "bump": lambda: get_version(
+            schemas.UvDynamicVersioning.from_dict({"bump": True})
+        ),
+        "metadata-hook": lambda: _metadata_hook(root),
+    }
+
+
+def measure(func: Callable[[], object], repeat: int) -> float:
+    """Return the best wall time of `repeat` calls, the least noisy estimate."""
+    timings = []
+    for _ in range(repeat):
+        _reset()
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def run(
+    scales: Sequence[Scale], directory: Path, *, repeat: int = 5
+) -> dict[str, float]:
+    results = {}
+    for scale in scales:
+        root = generate(scale, directory)
+        with _chdir(root):
+            for name, func in paths(root).items():
+                results[f"{scale.name}/{name}"] = measure(func, repeat)
+    return results
+
+
+def compare(
+    results: dict[str, float], baseline: dict[str, float], threshold: float
+) -> list[str]:
+    """Describe every result slower than its baseline by more than `threshold`."""
+    regressions = []
+    for name, elapsed in sorted(results.items()):
+        expected = baseline.get(name)
+        if expected is None:
+            continue
+        if elapsed > expected * (1 + threshold) and elapsed - expected > NOISE_FLOOR:
+            regressions.append(
+                f"{name}: {elapsed * 1000:.2f}ms (baseline {expected * 1000:.2f}ms, "
+                f"+{(elapsed / expected - 1) * 100:.0f}%)"
+            )
+    return regressions
+
+
+def _environment() -> dict[str, str]:
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+    }
+
+
+def _parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks")
+    parser.add_argument(
+        "--scale",
+        action="append",
+        choices=[*SCALES, "all"],
+        help="repository scale to run (default: small), can be repeated",
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument(
+        "--work-dir",
+        type=Path,
+        default=Path(tempfile.gettempdir()) / "uv-dynamic-versioning-benchmarks",
+        help="where synthetic repositories are generated and reused",
+    )
+    parser.add_argument("--save", type=Path, help="write the results as a baseline")
+    parser.add_argument("--compare", type=Path, help="baseline to compare against")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    return parser
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    args = _parser().parse_args(argv)
+
+    names = args.scale or ["small"]
+    scales = list(SCALES.values()) if "all" in names else [SCALES[n] for n in names]
+    results = run(scales, args.work_dir, repeat=args.repeat)
+
+    for name, elapsed in results.items():
+        print(f"{name:<32} {elapsed * 1000:10.2f}ms")  # noqa: T201
+
+    if args.save:
+        data = {"environment": _environment(), "results": results}
+        args.save.write_text(json.dumps(data, indent=2) + "\n", encoding="utf-8")
+
+    if args.compare:
+        baseline = json.loads(args.compare.read_text(encoding="utf-8"))
+        if baseline.get("environment") != _environment():
+            print("warning: the baseline was recorded on another environment")  # noqa: T201
+
+        regressions = compare(results, baseline["results"], args.threshold)
+        for regression in regressions:
+            print(f"regression: {regression}")  # noqa: T201
+        if regressions:
+            return 1
+
+    return 0
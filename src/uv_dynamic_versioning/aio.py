@@ -0,0 +1,159 @@
+from __future__ import annotations
+
+import asyncio
+import concurrent.futures
+import contextvars
+import functools
+import shlex
+import subprocess
+from collections.abc import Iterable, Sequence
+from concurrent.futures import Executor, ThreadPoolExecutor
+from pathlib import Path
+
+from dunamai import Version
+
+from . import commands, schemas
+from .main import get_version as get_version_sync
+from .main import load
+
+DEFAULT_JOBS = 16
+
+
+class _Call:
+    """The commands run by one resolution, so that they can be killed together."""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop):
+        self.loop = loop
+        self.cancelled = False
+        self.pending: set[concurrent.futures.Future] = set()
+
+    def cancel(self) -> None:
+        self.cancelled = True
+        for future in list(self.pending):
+            future.cancel()
+
+
+async def _run(
+    command: str, where: Path | None, shell: bool, env: dict | None, stderr: bool
+) -> tuple[int, bytes]:
+    kwargs = {
+        "stdout": subprocess.PIPE,
+        "stderr": subprocess.STDOUT if stderr else subprocess.DEVNULL,
+        "cwd": str(where) if where is not None else None,
+        "env": env,
+    }
+    if shell:
+        process = await asyncio.create_subprocess_shell(command, **kwargs)
+    else:
+        process = await asyncio.create_subprocess_exec(*shlex.split(command), **kwargs)
+
+    try:
+        stdout, _ = await process.communicate()
+    except asyncio.CancelledError:
+        process.kill()
+        await process.wait()
+        raise
+    assert process.returncode is not None
+    return process.returncode, stdout
+
+
+def _run_on_loop(
+    call: _Call,
+    command: str,
+    where: Path | None,
+    codes: Sequence[int],
+    shell: bool,
+    env: dict | None,
+    stderr: bool,
+) -> tuple[int, str]:
+    # the same as `dunamai._run_cmd`, but on the loop of the resolution
+    if call.cancelled:
+        raise RuntimeError(f"The command '{command}' was cancelled")
+    future = asyncio.run_coroutine_threadsafe(
+        _run(command, where, shell, env, stderr), call.loop
+    )
+    call.pending.add(future)
+    if call.cancelled:  # cancelled while the command was being submitted
+        future.cancel()
+    try:
+        code, stdout = future.result()
+    except concurrent.futures.CancelledError:
+        raise RuntimeError(f"The command '{command}' was cancelled") from None
+    finally:
+        call.pending.discard(future)
+    return commands.checked(command, codes, code, stdout)
+
+
+def _resolve(
+    config: schemas.UvDynamicVersioning, root: Path | None, call: _Call
+) -> tuple[str, Version]:
+    commands.use(functools.partial(_run_on_loop, call))
+    return get_version_sync(config, root=root)
+
+
+async def _get_version(
+    config: schemas.UvDynamicVersioning,
+    root: Path | None,
+    timeout: float | None,
+    executor: Executor | None = None,
+) -> tuple[str, Version]:
+    loop = asyncio.get_running_loop()
+    call = _Call(loop)
+    # Dunamai is synchronous, so it runs in a thread that waits for its
+    # commands to run on the loop, where they can be killed on timeout
+    resolve = functools.partial(
+        contextvars.copy_context().run, _resolve, config, root, call
+    )
+    try:
+        return await asyncio.wait_for(loop.run_in_executor(executor, resolve), timeout)
+    except BaseException:
+        call.cancel()
+        raise
+
+
+async def get_version(
+    config: schemas.UvDynamicVersioning,
+    *,
+    root: Path | None = None,
+    timeout: float | None = None,
+) -> tuple[str, Version]:
+    """Resolve a version like `main.get_version`, running Git through asyncio.
+
+    Raises `asyncio.TimeoutError` (and kills the commands still running) if it
+    takes longer than `timeout` seconds.
+    """
+    return await _get_version(config, root, timeout)
+
+
+async def get_versions(
+    roots: Iterable[Path],
+    *,
+    jobs: int = DEFAULT_JOBS,
+    timeout: float | None = None,
+    return_exceptions: bool = False,
+) -> list[tuple[str, Version] | BaseException]:
+    """Resolve the version of each project, at most `jobs` at a time.
+
+    Like `asyncio.gather`, results are in the order of `roots`, and with
+    `return_exceptions`, failures are returned in place of their result.
+    `timeout` applies to each project, not counting the wait for its turn.
+    """
+    loop = asyncio.get_running_loop()
+    limit = asyncio.Semaphore(jobs)
+
+    async def resolve(root: Path) -> tuple[str, Version]:
+        async with limit:
+            project = await loop.run_in_executor(executor, load, str(root))
+            config = project.tool.uv_dynamic_versioning or schemas.UvDynamicVersioning()
+            return await _get_version(config, root, timeout, executor)
+
+    # the default executor may have fewer threads than `jobs`
+    executor = ThreadPoolExecutor(jobs)
+    try:
+        return await asyncio.gather(
+            *(resolve(root) for root in roots), return_exceptions=return_exceptions
+        )
+    finally:
+        # threads of timed out resolutions wind down on their own, and waiting
+        # for them here would block the loop they need to do so
+        executor.shutdown(wait=False)
@@ -0,0 +1,184 @@
+from __future__ import annotations
+
+import functools
+import string
+from collections.abc import Iterable
+from typing import Any
+
+from . import schemas
+
+FIELDS = (
+    "base",
+    "stage",
+    "revision",
+    "epoch",
+    "distance",
+    "commit",
+    "dirty",
+    "branch",
+    "tagged_metadata",
+    "timestamp",
+)
+
+# fields that only change when another tag is picked
+TAG_FIELDS = frozenset(("base", "stage", "revision", "epoch", "tagged_metadata"))
+
+# fields that take VCS queries of their own, which can be skipped if unused
+OPTIONAL_FIELDS = frozenset(("distance", "dirty", "branch", "timestamp"))
+
+
+def persistent(fields: frozenset[str] | None) -> bool:
+    """Check if a version resolved with `fields` can be reused in the same state.
+
+    The state of the repository doesn't tell whether the work tree is dirty.
+    """
+    return fields is not None and "dirty" not in fields
+
+
+# the names a format (or a Jinja template) can use, and the fields behind them
+_NAMES = {
+    **{field: (field,) for field in FIELDS},
+    "branch_escaped": ("branch",),
+    "major": ("base",),
+    "minor": ("base",),
+    "patch": ("base",),
+}
+
+# stands for `{{ version }}`, which renders what the default or `format` serializes
+_SERIALIZED = "str(version)"
+
+
+def format_fields(format: str) -> set[str]:
+    """Return the fields the placeholders of a `format` use."""
+    fields: set[str] = set()
+    for _, name, _, _ in string.Formatter().parse(format):
+        if name is not None:
+            fields.update(_NAMES.get(name, ()))
+    return fields
+
+
+def _is_name(node: Any, name: str) -> bool:
+    from jinja2 import nodes
+
+    return isinstance(node, nodes.Name) and node.name == name and node.ctx == "load"
+
+
+def _is_env(node: Any) -> bool:
+    return _is_name(node, "env")
+
+
+def _version_fields(ast: Any) -> set[str]:
+    from jinja2 import nodes
+
+    # `version.base` and `{{ version }}` use some fields, while anything else done
+    # with the version (e.g. `version.bump()`) could use any of them
+    fields: set[str] = set()
+    explained: set[int] = set()
+    for node in ast.find_all(nodes.Getattr):
+        if _is_name(node.node, "version") and node.attr in FIELDS:
+            fields.add(node.attr)
+            explained.add(id(node.node))
+    for output in ast.find_all(nodes.Output):
+        for node in output.nodes:
+            if _is_name(node, "version"):
+                fields.add(_SERIALIZED)
+                explained.add(id(node))
+    for node in ast.find_all(nodes.Name):
+        if _is_name(node, "version") and id(node) not in explained:
+            fields.update(FIELDS)
+    return fields
+
+
+def _env_names(ast: Any) -> tuple[set[str], bool]:
+    from jinja2 import nodes
+
+    env: set[str] = set()
+    named: set[int] = set()
+    # `env.NAME`, `env["NAME"]` and `env.get("NAME", ...)`
+    for node in ast.find_all((nodes.Getattr, nodes.Getitem, nodes.Call)):
+        if isinstance(node, nodes.Call):
+            target = node.node
+            if not (
+                isinstance(target, nodes.Getattr)
+                and _is_env(target.node)
+                and target.attr == "get"
+                and node.args
+                and isinstance(node.args[0], nodes.Const)
+            ):
+                continue
+            env.add(str(node.args[0].value))
+            named.add(id(target.node))
+        elif isinstance(node, nodes.Getattr):
+            if _is_env(node.node) and node.attr != "get":
+                env.add(node.attr)
+                named.add(id(node.node))
+        elif _is_env(node.node) and isinstance(node.arg, nodes.Const):
+            env.add(str(node.arg.value))
+            named.add(id(node.node))
+
+    uses = [node for node in ast.find_all(nodes.Name) if _is_env(node)]
+    return env, all(id(node) in named for node in uses)
+
+
+def template_dependencies(template: str) -> tuple[set[str], set[str], bool]:
+    """Return the fields and environment variables a Jinja template reads.
+
+    The last item is false if it reads environment variables that can't be named.
+    """
+    from jinja2 import meta
+
+    from .template import _environment
+
+    ast = _environment.parse(template)
+    fields = _version_fields(ast)
+    for name in meta.find_undeclared_variables(ast):
+        fields.update(_NAMES.get(name, ()))
+
+    env, exact = _env_names(ast)
+    return fields, env, exact
+
+
+def _serialized_fields(config: schemas.UvDynamicVersioning) -> set[str]:
+    if config.format:
+        return format_fields(config.format)
+
+    fields = {"base", "stage", "revision", "epoch", "distance"}
+    if config.metadata is not False:
+        fields.add("commit")
+        if config.dirty:
+            fields.add("dirty")
+        if config.tagged_metadata:
+            fields.add("tagged_metadata")
+    return fields
+
+
+def template_fields(
+    templates: Iterable[str], config: schemas.UvDynamicVersioning
+) -> frozenset[str]:
+    """Return the fields any of several Jinja templates use with `config`."""
+    fields: set[str] = set()
+    for template in templates:
+        fields |= template_dependencies(template)[0]
+    if _SERIALIZED in fields:
+        fields.remove(_SERIALIZED)
+        fields |= _serialized_fields(config)
+    return frozenset(fields)
+
+
+@functools.lru_cache(maxsize=64)
+def required_fields(config: schemas.UvDynamicVersioning) -> frozenset[str]:
+    """Work out which fields the version of `config` is serialized from.
+
+    Takes `format-jinja`, `format`, the options of the default serialization
+    (`metadata`, `dirty`, `tagged-metadata`) and `bump` into account. `style`
+    only changes how the same fields are written.
+    """
+    if config.format_jinja:
+        fields = template_fields([config.format_jinja], config)
+    else:
+        fields = frozenset(_serialized_fields(config))
+
+    # a bump only happens with a distance, and changes the base
+    if config.bump_config.enable and fields:
+        fields |= {"base", "distance"}
+    return fields
@@ -2,15 +2,13 @@ from functools import cached_property
 from typing import cast
 
 from . import schemas
-from .main import parse, read, validate
+from .registry import get_project
 
 
 class BasePlugin:
     @cached_property
     def project(self) -> schemas.Project:
-        text = read(cast(str, self.root))  # type: ignore
-        parsed = parse(text)
-        return validate(parsed)
+        return get_project(cast(str, self.root))  # type: ignore
 
     @property
     def project_config(self) -> schemas.UvDynamicVersioning:
@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+import dataclasses
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+
+from . import schemas
+from .gitreader import SharedRepositories
+from .main import get_version, load
+
+
+def find_roots(roots: Iterable[str], pattern: str | None = None) -> list[Path]:
+    """Collect project roots, adding every directory matching `pattern` with a `pyproject.toml`."""
+    found = [Path(root) for root in roots]
+    if pattern is not None:
+        found.extend(
+            path
+            for path in sorted(Path().glob(pattern))
+            if (path / "pyproject.toml").is_file()
+        )
+    return list(dict.fromkeys(found))
+
+
+def resolve(
+    root: Path, git_backend: schemas.GitBackend | None = None
+) -> dict[str, str]:
+    project = load(str(root))
+    config = project.tool.uv_dynamic_versioning or schemas.UvDynamicVersioning()
+    if git_backend is not None:
+        config = dataclasses.replace(config, git_backend=git_backend)
+    version, _ = get_version(config, root=root, fields=())
+    return {"root": str(root), "version": version}
+
+
+def run(
+    roots: Iterable[Path],
+    *,
+    jobs: int | None = None,
+    git_backend: schemas.GitBackend | None = None,
+) -> Iterator[dict[str, str]]:
+    """Resolve the version of each project, yielding results as they complete.
+
+    With `git_backend`, it overrides the projects' own. Only projects using the
+    Python reader share one scan of each repository; the others (e.g. with the
+    default `cli` backend) run their own Git queries.
+    """
+    with SharedRepositories() as shared, ThreadPoolExecutor(jobs) as executor:
+        futures = {
+            executor.submit(shared.run, resolve, root, git_backend): root
+            for root in roots
+        }
+        for future in as_completed(futures):
+            try:
+                yield future.result()
+            except Exception as e:
+                # one broken project must not end the stream for the others
+                yield {"root": str(futures[future]), "error": str(e)}
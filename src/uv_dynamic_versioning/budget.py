@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+import contextlib
+import contextvars
+import functools
+import shlex
+import subprocess
+import threading
+import time
+from collections.abc import Callable, Sequence
+from pathlib import Path
+from typing import Any, TypeVar
+
+from . import commands
+
+T = TypeVar("T")
+
+
+class VcsTimeoutError(RuntimeError):
+    """Raised when resolving the version takes longer than `vcs-timeout`."""
+
+
+class _Budget:
+    """The time left for one resolution, and the commands to kill once it runs out."""
+
+    def __init__(self, seconds: float):
+        self.seconds = seconds
+        self.deadline = time.monotonic() + seconds
+        self.expired = False
+        self.processes: set[subprocess.Popen] = set()
+        self.lock = threading.Lock()
+
+    def remaining(self) -> float:
+        return max(0.0, self.deadline - time.monotonic())
+
+    def error(self) -> VcsTimeoutError:
+        return VcsTimeoutError(f"The VCS did not respond within {self.seconds} seconds")
+
+    def expire(self) -> None:
+        with self.lock:
+            self.expired = True
+            processes = list(self.processes)
+        for process in processes:
+            with contextlib.suppress(OSError):
+                process.kill()
+
+
+def _run(
+    budget: _Budget,
+    command: str,
+    where: Path | None,
+    codes: Sequence[int],
+    shell: bool,
+    env: dict | None,
+    stderr: bool,
+) -> tuple[int, str]:
+    # the same as `dunamai._run_cmd`, but with a process that can be killed
+    with budget.lock:
+        if budget.expired:
+            raise budget.error()
+        process = subprocess.Popen(
+            shlex.split(command),
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT if stderr else subprocess.DEVNULL,
+            cwd=str(where) if where is not None else None,
+            shell=shell,
+            env=env,
+        )
+        budget.processes.add(process)
+
+    try:
+        stdout, _ = process.communicate(timeout=budget.remaining())
+    except subprocess.TimeoutExpired:
+        budget.expire()
+        process.communicate()
+        raise budget.error() from None
+    finally:
+        with budget.lock:
+            budget.processes.discard(process)
+    if budget.expired:  # killed because another command ran out of time
+        raise budget.error()
+
+    return commands.checked(command, codes, process.returncode, stdout)
+
+
+def call(seconds: float, function: Callable[..., T], *args: Any) -> T:
+    """Call `function` with at most `seconds` for everything it does.
+
+    Raises `VcsTimeoutError` once they run out, killing the commands it still runs.
+    The call itself is abandoned in its (daemon) thread, since reads stalled in
+    the kernel (e.g. on a hung network mount) can't be interrupted.
+    """
+    budget = _Budget(seconds)
+    context = contextvars.copy_context()
+    context.run(commands.use, functools.partial(_run, budget))
+
+    outcome: dict[str, Any] = {}
+
+    def target() -> None:
+        try:
+            outcome["result"] = context.run(function, *args)
+        except BaseException as e:
+            outcome["error"] = e
+
+    thread = threading.Thread(target=target, name="uv-vcs", daemon=True)
+    thread.start()
+    thread.join(budget.remaining())
+    if thread.is_alive():
+        budget.expire()
+        raise budget.error()
+    if "error" in outcome:
+        raise outcome["error"]
+    return outcome["result"]
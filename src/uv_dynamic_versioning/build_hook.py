@@ -0,0 +1,32 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Any
+
+from hatchling.builders.hooks.plugin.interface import BuildHookInterface
+
+from .base import BasePlugin
+from .registry import resolve_version
+from .versionfile import stamp
+
+
+class VersionFileBuildHook(BasePlugin, BuildHookInterface):
+    """
+    Hatch build hook to write the version to `version-file`
+    """
+
+    PLUGIN_NAME = "uv-dynamic-versioning"
+
+    def initialize(self, version: str, build_data: dict[str, Any]) -> None:
+        version_file = self.project_config.version_file
+        if version_file is None:
+            raise ValueError(
+                "Cannot use this build hook without [tool.uv-dynamic-versioning.version-file]."
+            )
+
+        resolved, _ = resolve_version(self.root, self.project_config)
+        # an unchanged file is left alone, so that its bytecode and anything
+        # keyed on its mtime (e.g. uv's cache-keys) stay valid
+        stamp(version_file, resolved, Path(self.root))
+        # the file is usually ignored by Git, which would exclude it from builds
+        build_data["artifacts"].append(version_file.path)
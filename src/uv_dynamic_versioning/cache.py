@@ -0,0 +1,220 @@
+from __future__ import annotations
+
+import contextlib
+import hashlib
+import json
+import os
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+from dunamai import Concern, Vcs, Version
+
+from . import schemas
+from .gitreader import common_dir, find_git_dir
+
+MAX_ENTRIES = 64
+MAX_AGE = 7 * 24 * 60 * 60
+
+
+def _cache_dir_from_env() -> Path | None:
+    value = os.environ.get("UV_DYNAMIC_VERSIONING_CACHE_DIR")
+    return Path(value) if value else None
+
+
+def _stat_signature(path: Path) -> list[int] | None:
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+    return [stat.st_mtime_ns, stat.st_size]
+
+
+def git_state(git_dir: Path) -> dict[str, Any]:
+    """Collect the parts of a repository that a VCS based version depends on."""
+    common = common_dir(git_dir)
+
+    refs = []
+    for directory, _, files in os.walk(common / "refs"):
+        for name in files:
+            path = Path(directory) / name
+            refs.append([path.relative_to(common).as_posix(), _stat_signature(path)])
+    refs.sort()
+
+    return {
+        "HEAD": (git_dir / "HEAD").read_text(encoding="utf-8").strip(),
+        "refs": refs,
+        "packed-refs": _stat_signature(common / "packed-refs"),
+        "index": _stat_signature(git_dir / "index"),
+        "shallow": _stat_signature(common / "shallow"),
+    }
+
+
+def cache_key(
+    config: schemas.UvDynamicVersioning, git_dir: Path, root: Path | None = None
+) -> str:
+    data = {
+        "cwd": str(root.resolve() if root else Path.cwd()),
+        "config": config.fingerprint(),
+        "git": git_state(git_dir),
+    }
+    return hashlib.sha256(json.dumps(data, sort_keys=True).encode()).hexdigest()
+
+
+def dump_version(version: Version) -> dict[str, Any]:
+    return {
+        "base": version.base,
+        "stage": version.stage,
+        "revision": version.revision,
+        "distance": version.distance,
+        "commit": version.commit,
+        "dirty": version.dirty,
+        "tagged_metadata": version.tagged_metadata,
+        "epoch": version.epoch,
+        "branch": version.branch,
+        "timestamp": version.timestamp.isoformat() if version.timestamp else None,
+        "concerns": sorted(concern.name for concern in version.concerns),
+        "vcs": version.vcs.value,
+        "matched_tag": version._matched_tag,
+        "newer_unmatched_tags": version._newer_unmatched_tags,
+    }
+
+
+def load_version(data: dict[str, Any]) -> Version:
+    stage = data.get("stage")
+    timestamp = data.get("timestamp")
+    version = Version(
+        data["base"],
+        stage=(stage, data.get("revision")) if stage is not None else None,
+        distance=data.get("distance", 0),
+        commit=data.get("commit"),
+        dirty=data.get("dirty"),
+        tagged_metadata=data.get("tagged_metadata"),
+        epoch=data.get("epoch"),
+        branch=data.get("branch"),
+        timestamp=datetime.fromisoformat(timestamp) if timestamp else None,
+        concerns={Concern[name] for name in data.get("concerns", [])},
+        vcs=Vcs(data.get("vcs", Vcs.Any.value)),
+    )
+    version._matched_tag = data.get("matched_tag")
+    version._newer_unmatched_tags = data.get("newer_unmatched_tags")
+    return version
+
+
+class VersionCache:
+    """On-disk cache of VCS based versions keyed on the state of a Git repository."""
+
+    def __init__(
+        self, git_dir: Path, directory: Path | None = None, root: Path | None = None
+    ):
+        self.git_dir = git_dir
+        self.root = root
+        self.directory = (
+            directory or _cache_dir_from_env() or git_dir / "uv-dynamic-versioning"
+        )
+
+    @classmethod
+    def for_config(
+        cls, config: schemas.UvDynamicVersioning, root: Path | None = None
+    ) -> VersionCache | None:
+        if not config.cache or config.vcs not in (Vcs.Any, Vcs.Git):
+            return None
+
+        git_dir = find_git_dir(root)
+        if git_dir is None:
+            return None
+
+        return cls(git_dir, root=root)
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"version-{key}.json"
+
+    def get(
+        self,
+        config: schemas.UvDynamicVersioning,
+        fields: frozenset[str] | None = None,
+    ) -> Version | None:
+        try:
+            path = self._path(cache_key(config, self.git_dir, self.root))
+            entry = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+
+        return self._load(entry, fields)
+
+    @staticmethod
+    def _load(entry: dict[str, Any], fields: frozenset[str] | None) -> Version | None:
+        if time.time() - entry.get("created", 0) > MAX_AGE:
+            return None
+
+        # entries resolved with only some of the fields can't serve the others
+        resolved = entry.get("fields")
+        if resolved is not None and (fields is None or not fields <= set(resolved)):
+            return None
+
+        try:
+            return load_version(entry["version"])
+        except (KeyError, TypeError, ValueError):
+            return None
+
+    def latest(
+        self,
+        config: schemas.UvDynamicVersioning,
+        fields: frozenset[str] | None = None,
+    ) -> Version | None:
+        """Return the version last stored for `config`, whatever the repository's state."""
+        fingerprint = config.fingerprint()
+        paths = []
+        for path in self.directory.glob("version-*.json"):
+            with contextlib.suppress(OSError):
+                paths.append((path.stat().st_mtime, path))
+
+        for _, path in sorted(paths, reverse=True):
+            try:
+                entry = json.loads(path.read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                continue
+            if entry.get("config") == fingerprint:
+                version = self._load(entry, fields)
+                if version is not None:
+                    return version
+        return None
+
+    def set(
+        self,
+        config: schemas.UvDynamicVersioning,
+        version: Version,
+        fields: frozenset[str] | None = None,
+    ) -> None:
+        entry = {
+            "created": time.time(),
+            "config": config.fingerprint(),
+            "fields": sorted(fields) if fields is not None else None,
+            "serialized": version.serialize(),
+            "version": dump_version(version),
+        }
+        # the cache is an optimization, so failing to write it must not fail a build
+        with contextlib.suppress(OSError):
+            self.directory.mkdir(parents=True, exist_ok=True)
+            path = self._path(cache_key(config, self.git_dir, self.root))
+            with tempfile.NamedTemporaryFile(
+                "w", encoding="utf-8", dir=self.directory, delete=False
+            ) as f:
+                json.dump(entry, f)
+            os.replace(f.name, path)
+            self.evict()
+
+    def evict(self) -> None:
+        """Drop entries older than `MAX_AGE` and keep at most `MAX_ENTRIES`."""
+        entries = []
+        for path in self.directory.glob("version-*.json"):
+            with contextlib.suppress(OSError):
+                entries.append((path.stat().st_mtime, path))
+        entries.sort(reverse=True)
+
+        now = time.time()
+        for index, (mtime, path) in enumerate(entries):
+            if index >= MAX_ENTRIES or now - mtime > MAX_AGE:
+                path.unlink(missing_ok=True)
@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from dunamai import Version
+
+from . import schemas
+from .analysis import required_fields, template_dependencies
+from .main import get_version
+
+BYPASS_ENV = "UV_DYNAMIC_VERSIONING_BYPASS"
+
+
+@dataclass(frozen=True, slots=True)
+class Dependencies:
+    """The inputs a configuration's version can change with."""
+
+    fields: frozenset[str]
+    env: frozenset[str]
+    files: tuple[str, ...] = ()
+    # False if a template reads environment variables that can't be named
+    exact: bool = True
+
+    @property
+    def git(self) -> dict[str, bool] | None:
+        """Return the `git` cache key uv needs to notice a change, if any."""
+        if self.files or not self.fields:
+            return None
+        # even a version made of the tag alone needs the commit: checking out
+        # another one changes which tags are reachable from HEAD
+        return {"commit": True, "tags": True}
+
+    def uv_cache_keys(self) -> list[dict[str, Any]]:
+        """Return the `tool.uv.cache-keys` covering these inputs."""
+        keys: list[dict[str, Any]] = [{"file": "pyproject.toml"}]
+        keys += [{"file": source} for source in self.files]
+        if self.git is not None:
+            keys.append({"git": self.git})
+        keys += [{"env": name} for name in sorted(self.env)]
+        return keys
+
+
+def analyze(config: schemas.UvDynamicVersioning) -> Dependencies:
+    """Work out which inputs the version of `config` depends on, without resolving it."""
+    env = {BYPASS_ENV}
+    exact = True
+    if config.format_jinja:
+        _, template_env, exact = template_dependencies(config.format_jinja)
+        env |= template_env
+
+    files = tuple(config.from_file.sources) if config.from_file else ()
+    return Dependencies(required_fields(config), frozenset(env), files, exact)
+
+
+def _value(version: Version, field: str) -> Any:
+    value = getattr(version, field)
+    return value.isoformat() if field == "timestamp" and value is not None else value
+
+
+def inputs(
+    config: schemas.UvDynamicVersioning,
+    dependencies: Dependencies | None = None,
+    root: Path | None = None,
+) -> dict[str, Any]:
+    """Resolve the current value of every input the version depends on."""
+    dependencies = dependencies or analyze(config)
+    _, version = get_version(config, root=root, fields=dependencies.fields)
+    return {
+        "config": config.fingerprint(),
+        "fields": {
+            field: _value(version, field) for field in sorted(dependencies.fields)
+        },
+        "env": {name: os.environ.get(name) for name in sorted(dependencies.env)},
+    }
+
+
+def fingerprint(values: dict[str, Any]) -> str:
+    data = json.dumps(values, sort_keys=True)
+    return hashlib.sha256(data.encode()).hexdigest()
+
+
+def _toml(value: Any) -> str:
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, dict):
+        items = ", ".join(f"{key} = {_toml(item)}" for key, item in value.items())
+        return f"{{ {items} }}"
+    return json.dumps(value)
+
+
+def dumps_uv_cache_keys(dependencies: Dependencies) -> str:
+    """Render `uv_cache_keys()` as the line to put under `[tool.uv]`."""
+    keys = ", ".join(_toml(key) for key in dependencies.uv_cache_keys())
+    return f"cache-keys = [{keys}]"
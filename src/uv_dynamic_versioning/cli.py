@@ -1,6 +1,302 @@
-from .version_source import DynamicVersionSource
+from __future__ import annotations
 
+import argparse
+import contextlib
+import json
+import sys
+from collections.abc import Sequence
+from pathlib import Path
+from typing import Any
 
-def main() -> None:
-    source = DynamicVersionSource(root=".", config={})
-    print(source.get_version_data()["version"])  # noqa: T201
+from dunamai import Style
+
+from . import schemas
+from .main import get_version, load
+
+
+def _config() -> schemas.UvDynamicVersioning:
+    # resolve without hatchling's plugin machinery, which the CLI doesn't need
+    project = load(".")
+    return project.tool.uv_dynamic_versioning or schemas.UvDynamicVersioning()
+
+
+def _describe(config: schemas.UvDynamicVersioning) -> dict[str, Any]:
+    """Resolve the version once, and serialize it in every way pipelines ask for."""
+    serialized, version = get_version(config)
+    timestamp = version.timestamp
+    result: dict[str, Any] = {
+        "version": serialized,
+        # `format` would override the style, while the other options still apply
+        "styles": {
+            style.value: version.serialize(style=style, format=None) for style in Style
+        },
+        "fields": {
+            "base": version.base,
+            "stage": version.stage,
+            "revision": version.revision,
+            "epoch": version.epoch,
+            "distance": version.distance,
+            "commit": version.commit,
+            "dirty": version.dirty,
+            "branch": version.branch,
+            "tagged_metadata": version.tagged_metadata,
+            "timestamp": timestamp.isoformat() if timestamp is not None else None,
+        },
+        "templates": {},
+    }
+    if config.templates:
+        from .template import TemplateRenderer
+
+        renderer = TemplateRenderer(version=version, config=config)
+        result["templates"] = {
+            name: renderer.render(template) for name, template in config.templates
+        }
+    return result
+
+
+def _version(args: argparse.Namespace) -> int:
+    config = _config()
+    if args.json:
+        print(json.dumps(_describe(config), indent=2))  # noqa: T201
+        return 0
+
+    version, _ = get_version(config, fields=())
+    print(version)  # noqa: T201
+    return 0
+
+
+def _batch(args: argparse.Namespace) -> int:
+    from .batch import find_roots, run
+
+    roots = find_roots(args.roots, args.glob)
+    if not roots:
+        raise SystemExit("error: no project roots given")
+
+    failed = False
+    git_backend = schemas.GitBackend(args.git_backend) if args.git_backend else None
+    for result in run(roots, jobs=args.jobs, git_backend=git_backend):
+        failed = failed or "error" in result
+        print(json.dumps(result), flush=True)  # noqa: T201
+    return 1 if failed else 0
+
+
+def _manifest(args: argparse.Namespace) -> int:
+    from .manifest import dumps, generate
+
+    config = _config()
+    output = args.output or config.tag_manifest
+    if output is None:
+        raise SystemExit("error: set tag-manifest or pass --output")
+
+    path = Path(output)
+    content = dumps(generate(config))
+    # rewriting an unchanged manifest would only dirty the work tree
+    if not path.is_file() or path.read_text(encoding="utf-8") != content:
+        path.write_text(content, encoding="utf-8")
+    print(path)  # noqa: T201
+    return 0
+
+
+def _cache_key(args: argparse.Namespace) -> int:
+    from .cachekey import analyze, dumps_uv_cache_keys, fingerprint, inputs
+    from .versionfile import write
+
+    config = _config()
+    dependencies = analyze(config)
+    if not dependencies.exact:
+        print(  # noqa: T201
+            "warning: format-jinja reads environment variables that can't be "
+            "determined, so they are not part of the key",
+            file=sys.stderr,
+        )
+
+    if args.uv:
+        print(dumps_uv_cache_keys(dependencies))  # noqa: T201
+        return 0
+
+    values = inputs(config, dependencies)
+    key = fingerprint(values)
+    if args.output:
+        # only a changed key may touch the file, since uv compares its mtime
+        write(Path(args.output), f"{key}\n")
+        print(args.output)  # noqa: T201
+        return 0
+
+    print(json.dumps({"fingerprint": key, "inputs": values}, indent=2))  # noqa: T201
+    return 0
+
+
+def _check(args: argparse.Namespace) -> int:
+    from .styles import check_versions
+
+    styles = [Style(style) for style in args.style] if args.style else list(Style)
+    lines = (line.strip() for line in sys.stdin)
+    failed = False
+    for checked in check_versions((line for line in lines if line), styles):
+        failed = failed or not all(checked.styles.values())
+        result = {
+            "version": checked.version,
+            "styles": {style.value: valid for style, valid in checked.styles.items()},
+            "key": checked.key,
+        }
+        print(json.dumps(result))  # noqa: T201
+    # without `--style`, no style is required, so this is only a report
+    return 1 if failed and args.style else 0
+
+
+def _stats(args: argparse.Namespace) -> int:
+    from . import trace
+
+    path = args.file or trace.trace_path()
+    if path is None:
+        raise SystemExit(f"error: pass a trace file or set {trace.TRACE_ENV}")
+
+    summary = trace.summarize(trace.read_entries(Path(path)))
+    print(f"{'phase':<32} {'count':>7} {'p50 (ms)':>10} {'p95 (ms)':>10}")  # noqa: T201
+    for phase, stats in summary.items():
+        print(  # noqa: T201
+            f"{phase:<32} {stats['count']:>7} "
+            f"{stats['p50'] * 1000:>10.2f} {stats['p95'] * 1000:>10.2f}"
+        )
+    return 0
+
+
+def _daemon(args: argparse.Namespace) -> int:
+    from .daemon import serve, socket_path
+
+    print(socket_path(Path()), flush=True)  # noqa: T201
+    serve(Path(), idle_timeout=args.idle_timeout, poll_interval=args.poll_interval)
+    return 0
+
+
+def _watch(args: argparse.Namespace) -> int:
+    from .watch import watch
+
+    config = _config()
+    version_file = config.version_file
+    if args.output:
+        template = version_file.template if version_file else None
+        version_file = schemas.VersionFile(args.output, template)
+    if version_file is None:
+        raise SystemExit("error: set version-file or pass --output")
+
+    output = version_file.path
+    with contextlib.suppress(KeyboardInterrupt):
+        for result in watch(
+            config, version_file, poll_interval=args.poll_interval, poll=args.poll
+        ):
+            if "error" in result:
+                print(f"error: {result['error']}", file=sys.stderr, flush=True)  # noqa: T201
+            else:
+                print(f"{output}: {result['version']}", flush=True)  # noqa: T201
+    return 0
+
+
+def _parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="uv-dynamic-versioning")
+    parser.add_argument(
+        "--json",
+        action="store_true",
+        help="print the version in every style, its fields and the named templates",
+    )
+    parser.set_defaults(func=_version)
+    subparsers = parser.add_subparsers()
+
+    batch = subparsers.add_parser(
+        "batch",
+        help="resolve the versions of many projects as NDJSON",
+        description="Resolve the versions of many projects as NDJSON. Projects "
+        "using the python git-backend share one read of each repository's tags "
+        "and commits; those using the git CLI (the default) query Git on their own.",
+    )
+    batch.add_argument("roots", nargs="*", help="project directories")
+    batch.add_argument("--glob", help="also resolve directories matching this pattern")
+    batch.add_argument("--jobs", type=int, help="number of worker threads")
+    batch.add_argument(
+        "--git-backend",
+        choices=[backend.value for backend in schemas.GitBackend],
+        help="query Git this way for every project, instead of each one's "
+        "git-backend (python shares one read of each repository)",
+    )
+    batch.set_defaults(func=_batch)
+
+    manifest = subparsers.add_parser(
+        "manifest", help="write the tag manifest used to resolve shallow clones"
+    )
+    manifest.add_argument(
+        "--output", help="path of the manifest (default: tag-manifest)"
+    )
+    manifest.set_defaults(func=_manifest)
+
+    cache_key = subparsers.add_parser(
+        "cache-key", help="fingerprint the inputs the version depends on"
+    )
+    cache_key.add_argument(
+        "--output", help="write the fingerprint to this file if it changed"
+    )
+    cache_key.add_argument(
+        "--uv",
+        action="store_true",
+        help="print the cache-keys setting for uv instead",
+    )
+    cache_key.set_defaults(func=_cache_key)
+
+    check = subparsers.add_parser(
+        "check", help="check the versions read from stdin, one per line, as NDJSON"
+    )
+    check.add_argument(
+        "--style",
+        action="append",
+        choices=[style.value for style in Style],
+        help="check only this style, and exit with 1 if a version doesn't conform",
+    )
+    check.set_defaults(func=_check)
+
+    stats = subparsers.add_parser(
+        "stats", help="summarize the time spent in each phase of traced builds"
+    )
+    stats.add_argument(
+        "file", nargs="?", help="trace file (default: $UV_DYNAMIC_VERSIONING_TRACE)"
+    )
+    stats.set_defaults(func=_stats)
+
+    daemon = subparsers.add_parser(
+        "daemon", help="serve the version of this project to builds from memory"
+    )
+    daemon.add_argument(
+        "--idle-timeout",
+        type=float,
+        default=3600,
+        help="exit after this many seconds without queries (default: 3600)",
+    )
+    daemon.add_argument(
+        "--poll-interval",
+        type=float,
+        default=1.0,
+        help="seconds between checks of the repository for changes (default: 1)",
+    )
+    daemon.set_defaults(func=_daemon)
+
+    watch = subparsers.add_parser(
+        "watch", help="rewrite the version file whenever the version changes"
+    )
+    watch.add_argument("--output", help="path of the file (default: version-file)")
+    watch.add_argument(
+        "--poll",
+        action="store_true",
+        help="check the repository periodically instead of using inotify",
+    )
+    watch.add_argument(
+        "--poll-interval",
+        type=float,
+        default=1.0,
+        help="seconds between checks when polling (default: 1)",
+    )
+    watch.set_defaults(func=_watch)
+
+    return parser
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    args = _parser().parse_args(argv)
+    return args.func(args)
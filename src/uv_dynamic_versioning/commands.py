@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import contextlib
+import contextvars
+import threading
+from collections.abc import Callable, Iterator, Sequence
+from pathlib import Path
+
+from . import trace
+
+# the signature of `dunamai._run_cmd`
+Runner = Callable[
+    [str, Path | None, Sequence[int], bool, dict | None, bool], tuple[int, str]
+]
+
+_install_lock = threading.Lock()
+# what `dunamai._run_cmd` was before it was first replaced, and how many
+# resolutions still need it replaced
+_original: Runner | None = None
+_installs = 0
+
+# how the commands of the calling context run, e.g. so that they can be killed
+_runner: contextvars.ContextVar[Runner | None] = contextvars.ContextVar(
+    "uv_dynamic_versioning_runner", default=None
+)
+
+
+@contextlib.contextmanager
+def installed() -> Iterator[None]:
+    """Route the commands Dunamai runs through `run` while in the block.
+
+    Other users of Dunamai in the process get its own `_run_cmd` back once the
+    last block exits; meanwhile, `run` runs their commands the same way.
+    """
+    import dunamai
+
+    global _original, _installs
+    with _install_lock:
+        if _installs == 0:
+            _original = dunamai._run_cmd
+            dunamai._run_cmd = run
+        _installs += 1
+    try:
+        yield
+    finally:
+        with _install_lock:
+            _installs -= 1
+            # unless someone else replaced it since
+            if _installs == 0 and dunamai._run_cmd is run:
+                dunamai._run_cmd = _original
+
+
+def use(runner: Runner) -> None:
+    """Run the commands of the current context with `runner`."""
+    _runner.set(runner)
+
+
+def run(
+    command: str,
+    where: Path | None,
+    codes: Sequence[int] = (0,),
+    shell: bool = False,
+    env: dict | None = None,
+    stderr: bool = True,
+) -> tuple[int, str]:
+    """Run `command` like `dunamai._run_cmd`, with the runner of the current context."""
+    runner = _runner.get()
+    if runner is None:
+        if _original is None:
+            import dunamai
+
+            runner = dunamai._run_cmd
+        else:
+            runner = _original
+    with trace.command_span(command):
+        return runner(command, where, codes, shell, env, stderr)
+
+
+def checked(
+    command: str, codes: Sequence[int], code: int, stdout: bytes
+) -> tuple[int, str]:
+    """Return the result of a command like `dunamai._run_cmd` does."""
+    output = stdout.decode().strip()
+    if codes and code not in codes:
+        raise RuntimeError(
+            f"The command '{command}' returned code {code}. Output:\n{output}"
+        )
+    return code, output
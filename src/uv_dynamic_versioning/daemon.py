@@ -0,0 +1,239 @@
+from __future__ import annotations
+
+import contextlib
+import dataclasses
+import json
+import os
+import socket
+import stat
+import time
+import zlib
+from enum import Enum
+from pathlib import Path
+from typing import Any
+
+from dunamai import Version
+
+from . import schemas
+
+# builds fall back to resolving the version themselves when the daemon is this slow
+TIMEOUT = 0.1
+
+
+def _uid() -> int:
+    return os.getuid() if hasattr(os, "getuid") else 0
+
+
+def socket_path(root: Path) -> Path:
+    """Return where the daemon for the project at `root` listens."""
+    # keep this cheap: every build checks it, and most find no daemon there
+    base = os.environ.get("XDG_RUNTIME_DIR") or os.environ.get("TMPDIR") or "/tmp"
+    name = str(root.resolve())
+    # the base may be shared with other users, so the socket is in a directory
+    # only its owner can write to (see `_is_private`)
+    directory = Path(base) / f"uv-dynamic-versioning-{_uid()}"
+    return directory / f"{zlib.crc32(name.encode()):08x}.sock"
+
+
+def _is_private(directory: Path) -> bool:
+    """Check that only the current user can create or replace files in `directory`."""
+    try:
+        st = directory.lstat()
+    except OSError:
+        return False
+    return (
+        stat.S_ISDIR(st.st_mode)
+        and st.st_uid == _uid()
+        and stat.S_IMODE(st.st_mode) & 0o077 == 0
+    )
+
+
+def _is_own_socket(path: Path) -> bool:
+    """Check that `path` is a socket created by the current user, in a private directory."""
+    try:
+        st = path.lstat()
+    except OSError:
+        return False
+    return (
+        stat.S_ISSOCK(st.st_mode) and st.st_uid == _uid() and _is_private(path.parent)
+    )
+
+
+def _encode(value: Any) -> Any:
+    if isinstance(value, Enum):
+        return value.value
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def query(
+    config: schemas.UvDynamicVersioning,
+    root: Path | None = None,
+    fields: frozenset[str] | None = None,
+) -> Version | None:
+    """Ask the daemon for the VCS based version, or return None if it can't answer."""
+    if not hasattr(socket, "AF_UNIX"):
+        return None
+
+    root = (root or Path.cwd()).resolve()
+    path = socket_path(root)
+    # anyone else could answer with any version they like
+    if not _is_own_socket(path):
+        return None
+
+    request = {
+        "root": str(root),
+        "config": dataclasses.asdict(config),
+        "fields": sorted(fields) if fields is not None else None,
+    }
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+            client.settimeout(TIMEOUT)
+            client.connect(str(path))
+            client.sendall(json.dumps(request, default=_encode).encode() + b"\n")
+            with client.makefile("rb") as f:
+                response = json.loads(f.readline())
+    except (OSError, ValueError):
+        return None
+
+    from .cache import load_version
+
+    try:
+        return load_version(response["version"])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+_Key = tuple[schemas.UvDynamicVersioning, frozenset[str] | None]
+
+
+class VersionDaemon:
+    """Resolve versions for one project, keeping them until its repository changes."""
+
+    def __init__(self, root: Path):
+        from .gitreader import find_git_dir
+
+        self.root = root.resolve()
+        self.git_dir = find_git_dir(self.root)
+        if self.git_dir is None:
+            raise RuntimeError("This does not appear to be a Git project")
+        self.last_request = time.monotonic()
+        self._versions: dict[_Key, tuple[dict[str, Any], Version]] = {}
+
+    def _state(self) -> dict[str, Any]:
+        from .cache import git_state
+
+        return git_state(self.git_dir)
+
+    def resolve(
+        self,
+        config: schemas.UvDynamicVersioning,
+        fields: frozenset[str] | None = None,
+    ) -> Version:
+        from .analysis import persistent
+        from .main import _get_version
+
+        if not persistent(fields):
+            # the dirty flag can change without the repository's state changing
+            return _get_version(config, self.root, False, fields)
+
+        state = self._state()
+        cached = self._versions.get((config, fields))
+        if cached is not None and cached[0] == state:
+            return cached[1]
+
+        version = _get_version(config, self.root, False, fields)
+        self._versions[(config, fields)] = (state, version)
+        return version
+
+    def refresh(self) -> None:
+        """Re-resolve every known configuration if the repository changed."""
+        state = self._state()
+        for (config, fields), (known, _) in list(self._versions.items()):
+            if known != state:
+                with contextlib.suppress(RuntimeError, ValueError):
+                    self.resolve(config, fields)
+
+    def handle(self, request: Any) -> dict[str, Any]:
+        from .cache import dump_version
+
+        self.last_request = time.monotonic()
+        if not isinstance(request, dict):
+            return {"error": "the request must be an object"}
+        root, config, fields = (request.get(k) for k in ("root", "config", "fields"))
+        if not isinstance(root, str) or not isinstance(config, dict):
+            return {"error": "the request must have a 'root' and a 'config'"}
+        if fields is not None and not (
+            isinstance(fields, list) and all(isinstance(f, str) for f in fields)
+        ):
+            return {"error": "the request's 'fields' must be a list of strings"}
+        if Path(root) != self.root:
+            return {"error": f"this daemon serves '{self.root}'"}
+        try:
+            parsed = schemas.UvDynamicVersioning.from_dict(config)
+            resolved = self.resolve(
+                parsed, frozenset(fields) if fields is not None else None
+            )
+            return {"version": dump_version(resolved)}
+        except (RuntimeError, ValueError, TypeError) as e:
+            return {"error": str(e)}
+
+
+def serve(
+    root: Path, *, idle_timeout: float = 3600, poll_interval: float = 1.0
+) -> None:
+    """Answer version queries for the project at `root` until idle for `idle_timeout`."""
+    import socketserver
+    import threading
+
+    daemon = VersionDaemon(root)
+    path = socket_path(daemon.root)
+    lock = threading.Lock()
+
+    class Handler(socketserver.StreamRequestHandler):
+        def handle(self) -> None:
+            try:
+                request = json.loads(self.rfile.readline())
+            except ValueError:
+                return
+            with lock:
+                response = daemon.handle(request)
+            self.wfile.write(json.dumps(response).encode() + b"\n")
+
+    with contextlib.suppress(FileExistsError):
+        path.parent.mkdir(mode=0o700)
+    if not _is_private(path.parent):
+        raise RuntimeError(
+            f"'{path.parent}' must be a directory that only the current user can access"
+        )
+
+    if os.path.lexists(path):
+        if not _is_own_socket(path):
+            raise RuntimeError(f"'{path}' is not a socket of the current user")
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+            try:
+                probe.connect(str(path))
+            except OSError:
+                path.unlink()  # left behind by a daemon that didn't exit cleanly
+            else:
+                raise RuntimeError(f"A daemon is already listening on '{path}'")
+
+    previous_umask = os.umask(0o077)
+    try:
+        server = socketserver.ThreadingUnixStreamServer(str(path), Handler)
+    finally:
+        os.umask(previous_umask)
+
+    def watch() -> None:
+        # keep versions warm, so a query right after a commit doesn't pay for it
+        while time.monotonic() - daemon.last_request < idle_timeout:
+            time.sleep(poll_interval)
+            with lock:
+                daemon.refresh()
+        server.shutdown()
+
+    threading.Thread(target=watch, daemon=True).start()
+    try:
+        with server:
+            server.serve_forever()
+    finally:
+        path.unlink(missing_ok=True)
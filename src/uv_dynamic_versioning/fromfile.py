@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import functools
+import glob
+import os
+import re
+from collections.abc import Iterator
+from pathlib import Path
+
+from . import schemas
+
+_MISSING = object()
+
+_results: dict[tuple[str, str | None], tuple[tuple[int, int], str | None]] = {}
+
+
+@functools.cache
+def _compile(pattern: str) -> re.Pattern[str]:
+    return re.compile(pattern, re.MULTILINE)
+
+
+def _candidates(source: str, base: Path) -> Iterator[Path]:
+    if glob.has_magic(source):
+        yield from (Path(match) for match in sorted(glob.glob(str(base / source))))
+    else:
+        yield base / source
+
+
+def _search(path: Path, pattern: str | None) -> str | None:
+    # `pattern` is meant for source files (e.g. `__init__.py`), whose non-version
+    # content can be non-ASCII, so don't let the locale encoding decide either.
+    # The whole file is read, since a match can depend on any later content
+    # (e.g. `$` or a greedy `(?s)` group).
+    content = path.read_text(encoding="utf-8").strip()
+    if pattern is None:
+        return content or None
+
+    result = _compile(pattern).search(content)
+    return str(result.group(1)) if result is not None else None
+
+
+def _cached_search(path: Path, pattern: str | None) -> object:
+    """Search `path`, reusing the result for as long as its mtime and size are the same.
+
+    Returns `_MISSING` if there is no such file.
+    """
+    key = (os.path.abspath(path), pattern)
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        _results.pop(key, None)
+        return _MISSING
+    signature = (stat.st_mtime_ns, stat.st_size)
+
+    cached = _results.get(key)
+    if cached is not None and cached[0] == signature:
+        return cached[1]
+
+    result = _search(path, pattern)
+    _results[key] = (signature, result)
+    return result
+
+
+def read_version(from_file: schemas.FromFile, root: Path | None = None) -> str | None:
+    """Read the version from the first of the `from-file` sources that contains one.
+
+    Sources are tried in order, and the files matching a glob in lexical order.
+    """
+    sources = from_file.sources
+    pattern = from_file.pattern
+    base = root or Path()
+
+    found = False
+    for source in sources:
+        for path in _candidates(source, base):
+            result = _cached_search(path, pattern)
+            if result is _MISSING:
+                continue
+            found = True
+            if result is not None:
+                return str(result)
+
+    if len(sources) == 1 and not glob.has_magic(sources[0]):
+        if not found:
+            raise FileNotFoundError(f"File '{sources[0]}' does not exist")
+        if pattern is not None:
+            raise ValueError(
+                f"File '{sources[0]}' did not contain a match for '{pattern}'"
+            )
+        return None
+
+    if not found:
+        raise ValueError(f"None of the files {sources} exist")
+    if pattern is not None:
+        raise ValueError(
+            f"None of the files {sources} contained a match for '{pattern}'"
+        )
+    return None
@@ -0,0 +1,277 @@
+from __future__ import annotations
+
+import contextlib
+import contextvars
+import functools
+import os
+import shutil
+import threading
+from collections.abc import Callable, Sequence
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Any
+
+import dunamai
+
+# private helpers, which is why `dunamai` is pinned to a minor version and
+# `main` falls back to `Version.from_vcs` if they can't be imported
+from dunamai import (
+    Concern,
+    Pattern,
+    Vcs,
+    Version,
+    _detect_vcs,
+    _detect_vcs_from_archival,
+    _git_log,
+    _GitRefInfo,
+    _match_version_pattern,
+    _parse_git_timestamp_iso_strict,
+)
+
+from . import commands, schemas
+from .analysis import FIELDS
+from .gitreader import UnsupportedRepository, find_repository
+
+# enough for every query of one resolution, with room for a few resolutions at once
+POOL_SIZE = 8
+
+# `--decorate-refs`, used to look up the topological order of tags, is the newest
+# option Dunamai relies on; older versions are left to its sequential path
+_MINIMUM_GIT_VERSION = [2, 16]
+
+_pool: ThreadPoolExecutor | None = None
+_pool_lock = threading.Lock()
+
+
+def _executor() -> ThreadPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ThreadPoolExecutor(POOL_SIZE, thread_name_prefix="uv-git")
+        return _pool
+
+
+def _submit(function: Callable[..., Any], *args: Any) -> Future:
+    # the context carries the `aio` resolution (and trace) a command belongs to
+    return _executor().submit(contextvars.copy_context().run, function, *args)
+
+
+class _Deferred:
+    """A query run when its result is first asked for, like `Future` but sequential."""
+
+    def __init__(self, function: Callable[..., Any], *args: Any):
+        self.function = function
+        self.args = args
+
+    def result(self) -> Any:
+        return self.function(*self.args)
+
+
+def _run(
+    command: str, where: Path | None, codes: Sequence[int], env: dict | None
+) -> tuple[int, str]:
+    return commands.run(command, where, codes=codes, env=env)
+
+
+def _detect_git(path: Path | None) -> None:
+    """Check for a Git repository like `dunamai._detect_vcs`, without `git status`."""
+    if not shutil.which("git"):
+        raise RuntimeError("Unable to find 'git' program")
+    code, msg = _run("git rev-parse --git-dir", path, (), None)
+    if code != 0:
+        if "detected dubious ownership" in msg:
+            raise RuntimeError(
+                "Detected Git repository, but failed because of dubious ownership"
+            )
+        raise RuntimeError("This does not appear to be a Git project")
+
+
+@functools.cache
+def _git_version() -> list[int]:
+    return dunamai._get_git_version()
+
+
+def from_git(  # noqa: C901
+    pattern: str | Pattern = Pattern.Default,
+    latest_tag: bool = False,
+    tag_branch: str | None = None,
+    full_commit: bool = False,
+    strict: bool = False,
+    pattern_prefix: str | None = None,
+    ignore_untracked: bool = False,
+    commit_length: int | None = None,
+    highest_tag: bool = False,
+    path: Path | None = None,
+    vcs: Vcs = Vcs.Git,
+    fields: frozenset[str] | None = None,
+    concurrent: bool = True,
+) -> Version:
+    """Determine a version like `dunamai.Version.from_git`, running the commands that
+    don't depend on each other concurrently (unless `concurrent` is false).
+
+    Only the queries for `fields` (all by default) run: `dirty`, `branch` and
+    `timestamp` are left unset, and `distance` 0, if they aren't included.
+    Results are consumed in Dunamai's order, so that the same errors are raised.
+    Raises `UnsupportedRepository` where Dunamai has to be used instead.
+    """
+    if _detect_vcs_from_archival(path) is not None:
+        raise UnsupportedRepository("Archived repositories are read by Dunamai")
+    if vcs == Vcs.Any and find_repository(path) is None:
+        raise UnsupportedRepository("Not in a Git repository")
+    git_version = _git_version()
+    if git_version < _MINIMUM_GIT_VERSION:
+        raise UnsupportedRepository(f"Git {git_version} is too old")
+
+    vcs = Vcs.Git
+    full_commit = full_commit or commit_length is not None
+    env = {k: v for k, v in os.environ.items() if not k.startswith("GIT_TRACE")}
+    tag_branch = tag_branch or "HEAD"
+    log = _git_log(git_version)
+
+    submit = _submit if concurrent else _Deferred
+    wanted = set(FIELDS if fields is None else fields)
+
+    def run(command: str, codes: Sequence[int] = (0,)) -> Future | _Deferred:
+        return submit(_run, command, path, codes, env)
+
+    # `git status` is what Dunamai checks with, but it's as slow as the dirty check
+    detected = (
+        submit(_detect_vcs, vcs, path)
+        if "dirty" in wanted
+        else submit(_detect_git, path)
+    )
+    shallow = run("git rev-parse --is-shallow-repository")
+    symbolic_ref = (
+        run("git symbolic-ref --short HEAD", (0, 128)) if "branch" in wanted else None
+    )
+    head = run(
+        '{} -n 1 --format="format:{}"'.format(log, "%H" if full_commit else "%h"),
+        (0, 128),
+    )
+    committed = (
+        run(f'{log} -n 1 --pretty=format:"%cI"') if "timestamp" in wanted else None
+    )
+    describe = status = None
+    if "dirty" in wanted:
+        describe = run("git describe --always --dirty")
+        # speculative, since it's only needed if `describe` finds the tree clean
+        if not ignore_untracked:
+            status = run("git status --porcelain")
+    refs = run(
+        f'git for-each-ref "refs/tags/**" --merged {tag_branch}'
+        ' --format "%(refname)'
+        "@{%(objectname)"
+        "@{%(creatordate:iso-strict)"
+        "@{%(*committerdate:iso-strict)"
+        "@{%(taggerdate:iso-strict)"
+        '"'
+    )
+    topo_order = submit(
+        _GitRefInfo.from_git_tag_topo_order, tag_branch, git_version, path
+    )
+
+    detected.result()
+    concerns: set[Concern] = set()
+    if shallow.result()[1].strip() == "true":
+        concerns.add(Concern.ShallowRepository)
+    if strict and concerns:
+        raise RuntimeError("\n".join(x.message() for x in concerns))
+
+    branch = None
+    if symbolic_ref is not None:
+        code, msg = symbolic_ref.result()
+        branch = None if code == 128 else msg
+
+    code, msg = head.result()
+    if code == 128:
+        return Version._fallback(
+            strict, distance=0, dirty=True, branch=branch, concerns=concerns, vcs=vcs
+        )
+    commit = msg[:commit_length]
+    timestamp = None
+    if committed is not None:
+        timestamp = _parse_git_timestamp_iso_strict(committed.result()[1])
+
+    dirty = None
+    if describe is not None:
+        dirty = describe.result()[1].endswith("-dirty")
+        if not dirty and status is not None and status.result()[1].strip() != "":
+            dirty = True
+
+    msg = refs.result()[1]
+    matched_pattern = None
+    if msg:
+        lookup = topo_order.result()
+        detailed_tags = [
+            _GitRefInfo(*parts).with_tag_topo_lookup(lookup)
+            for parts in (line.split("@{") for line in msg.strip().splitlines())
+            if len(parts) == 5
+        ]
+        tags = [
+            t.ref()
+            for t in sorted(detailed_tags, key=lambda x: x.sort_key(), reverse=True)
+        ]
+        matched_pattern = _match_version_pattern(
+            pattern, tags, latest_tag, highest_tag, strict, pattern_prefix
+        )
+
+    if matched_pattern is None:
+        distance = 0
+        if "distance" in wanted:
+            with contextlib.suppress(Exception):
+                distance = int(_run("git rev-list --count HEAD", path, (0,), env)[1])
+        return Version._fallback(
+            strict,
+            distance=distance,
+            commit=commit,
+            dirty=dirty,
+            branch=branch,
+            timestamp=timestamp,
+            concerns=concerns,
+            vcs=vcs,
+        )
+    tag, base, stage, unmatched, tagged_metadata, epoch = matched_pattern
+
+    distance = 0
+    if "distance" in wanted:
+        command = f"git rev-list --count refs/tags/{tag}..HEAD"
+        distance = int(_run(command, path, (0,), env)[1])
+    version = Version(
+        base,
+        stage=stage,
+        distance=distance,
+        commit=commit,
+        dirty=dirty,
+        tagged_metadata=tagged_metadata,
+        epoch=epoch,
+        branch=branch,
+        timestamp=timestamp,
+        concerns=concerns,
+        vcs=vcs,
+    )
+    version._matched_tag = tag
+    version._newer_unmatched_tags = unmatched
+    return version
+
+
+def from_config(
+    config: schemas.UvDynamicVersioning,
+    path: Path | None = None,
+    fields: frozenset[str] | None = None,
+    concurrent: bool = True,
+) -> Version:
+    return from_git(
+        pattern=config.pattern,
+        latest_tag=config.latest_tag,
+        tag_branch=config.tag_branch,
+        full_commit=config.full_commit,
+        strict=config.strict,
+        pattern_prefix=config.pattern_prefix,
+        ignore_untracked=config.ignore_untracked,
+        commit_length=config.commit_length,
+        highest_tag=config.highest_tag,
+        path=path,
+        vcs=config.vcs,
+        fields=fields,
+        concurrent=concurrent,
+    )
@@ -0,0 +1,1356 @@
+"""Read the state of a Git repository without running `git`.
+
+This answers the same questions as dunamai's `Version.from_git` directly from
+the `.git` directory. Anything this reader doesn't understand raises
+`UnsupportedRepository`, and callers are expected to fall back to the `git` CLI.
+"""
+
+from __future__ import annotations
+
+import bisect
+import contextlib
+import contextvars
+import hashlib
+import mmap
+import os
+import re
+import stat
+import struct
+import sys
+import threading
+import zlib
+from collections.abc import Callable, Iterable, Iterator
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, TypeVar
+
+from dunamai import (
+    Concern,
+    Pattern,
+    Vcs,
+    Version,
+    _detect_vcs_from_archival,
+    _match_version_pattern,
+)
+
+from . import schemas
+
+OBJ_COMMIT = 1
+OBJ_TREE = 2
+OBJ_BLOB = 3
+OBJ_TAG = 4
+OBJ_OFS_DELTA = 6
+OBJ_REF_DELTA = 7
+
+_TYPE_NAMES = {
+    b"commit": OBJ_COMMIT,
+    b"tree": OBJ_TREE,
+    b"blob": OBJ_BLOB,
+    b"tag": OBJ_TAG,
+}
+
+_MODE_GITLINK = 0o160000
+_MODE_SYMLINK = 0o120000
+
+_OTHER_VCS_MARKERS = (
+    ".hg",
+    "_darcs",
+    ".svn",
+    ".bzr",
+    ".fslckout",
+    "_FOSSIL_",
+    ".pijul",
+)
+
+_T = TypeVar("_T")
+
+# set only in the context of the resolutions that share repositories
+_shared: contextvars.ContextVar[SharedRepositories | None] = contextvars.ContextVar(
+    "uv_dynamic_versioning_shared_repositories", default=None
+)
+
+
+class UnsupportedRepository(Exception):  # noqa: N818
+    """Raised when a repository uses a feature this reader doesn't implement."""
+
+
+def find_repository(start: Path | None = None) -> tuple[Path, Path] | None:
+    """Find the work tree and the `.git` directory of the repository containing `start`."""
+    start = (start or Path.cwd()).resolve()
+    for directory in (start, *start.parents):
+        candidate = directory / ".git"
+        if candidate.is_dir():
+            return directory, candidate
+
+        if candidate.is_file():
+            # worktrees and submodules use a `gitdir: <path>` pointer file
+            content = candidate.read_text(encoding="utf-8").strip()
+            if content.startswith("gitdir:"):
+                git_dir = directory / content.removeprefix("gitdir:").strip()
+                return directory, git_dir.resolve()
+
+    return None
+
+
+def find_git_dir(start: Path | None = None) -> Path | None:
+    """Find the `.git` directory of the repository containing `start`."""
+    found = find_repository(start)
+    return found[1] if found else None
+
+
+def common_dir(git_dir: Path) -> Path:
+    """Return the directory holding refs and objects shared by all worktrees."""
+    pointer = git_dir / "commondir"
+    if pointer.is_file():
+        return (git_dir / pointer.read_text(encoding="utf-8").strip()).resolve()
+    return git_dir
+
+
+def read_config(path: Path) -> dict[str, str]:
+    """Read the `section.key` entries of a Git config file, ignoring subsections."""
+    result: dict[str, str] = {}
+    try:
+        lines = path.read_text(encoding="utf-8", errors="replace").splitlines()
+    except OSError:
+        return result
+
+    section = ""
+    for raw in lines:
+        line = raw.strip()
+        if not line or line[0] in "#;":
+            continue
+
+        if line.startswith("["):
+            header = line[1 : line.index("]")] if "]" in line else line[1:]
+            # subsections (`[remote "origin"]`) are not needed by this reader
+            section = "" if '"' in header else header.strip().lower()
+            continue
+
+        if not section:
+            continue
+
+        key, separator, value = line.partition("=")
+        value = value.split(" #")[0].split(" ;")[0].strip().strip('"')
+        result[f"{section}.{key.strip().lower()}"] = value if separator else "true"
+
+    return result
+
+
+def _parse_signature(line: bytes) -> datetime:
+    """Parse the date of an `author`/`committer`/`tagger` line."""
+    timestamp, offset = line.rsplit(b" ", 2)[1:]
+    sign = -1 if offset.startswith(b"-") else 1
+    hours, minutes = int(offset[1:3]), int(offset[3:5])
+    tz = timezone(sign * timedelta(hours=hours, minutes=minutes))
+    return datetime.fromtimestamp(int(timestamp), tz)
+
+
+def _parse_headers(data: bytes) -> dict[bytes, list[bytes]]:
+    headers: dict[bytes, list[bytes]] = {}
+    for line in data.split(b"\n\n", 1)[0].split(b"\n"):
+        if line.startswith(b" "):
+            # continuation of a multi-line header such as `gpgsig`
+            continue
+        key, _, value = line.partition(b" ")
+        headers.setdefault(key, []).append(value)
+    return headers
+
+
+class Commit:
+    __slots__ = ("parents", "timestamp", "tree")
+
+    def __init__(self, tree: str, parents: list[str], timestamp: datetime):
+        self.tree = tree
+        self.parents = parents
+        self.timestamp = timestamp
+
+
+class _Pack:
+    def __init__(self, idx_path: Path):
+        with idx_path.open("rb") as f:
+            self.idx = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self.idx[:8] != b"\377tOc\x00\x00\x00\x02":
+            raise UnsupportedRepository(f"Unsupported pack index '{idx_path}'")
+
+        self.fanout = struct.unpack_from(">256I", self.idx, 8)
+        self.count = self.fanout[255]
+        self.names_offset = 8 + 256 * 4
+        self.offsets_offset = self.names_offset + self.count * 24
+        self.large_offsets_offset = self.offsets_offset + self.count * 4
+        self.pack_path = idx_path.with_suffix(".pack")
+        self._pack: mmap.mmap | None = None
+
+    @property
+    def pack(self) -> mmap.mmap:
+        if self._pack is None:
+            with self.pack_path.open("rb") as f:
+                self._pack = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return self._pack
+
+    def close(self) -> None:
+        self.idx.close()
+        if self._pack is not None:
+            self._pack.close()
+            self._pack = None
+
+    def _name(self, index: int) -> bytes:
+        start = self.names_offset + index * 20
+        return self.idx[start : start + 20]
+
+    def _range(self, first_byte: int) -> tuple[int, int]:
+        low = self.fanout[first_byte - 1] if first_byte else 0
+        return low, self.fanout[first_byte]
+
+    def find(self, name: bytes) -> int | None:
+        low, high = self._range(name[0])
+        while low < high:
+            middle = (low + high) // 2
+            current = self._name(middle)
+            if current < name:
+                low = middle + 1
+            elif current > name:
+                high = middle
+            else:
+                return self._offset(middle)
+        return None
+
+    def names_with_prefix(self, prefix: bytes) -> list[bytes]:
+        low, high = self._range(prefix[0])
+        names = []
+        index = bisect.bisect_left(range(low, high), prefix, key=self._name) + low
+        while index < high and self._name(index).startswith(prefix):
+            names.append(self._name(index))
+            index += 1
+        return names
+
+    def _offset(self, index: int) -> int:
+        (offset,) = struct.unpack_from(">I", self.idx, self.offsets_offset + index * 4)
+        if offset & 0x80000000:
+            large = self.large_offsets_offset + (offset & 0x7FFFFFFF) * 8
+            (offset,) = struct.unpack_from(">Q", self.idx, large)
+        return offset
+
+
+def _inflate(buffer: mmap.mmap, start: int) -> bytes:
+    decompressor = zlib.decompressobj()
+    chunks = []
+    position = start
+    # most objects are small, so avoid copying large slices of the pack for them
+    size = 4096
+    while not decompressor.eof:
+        chunk = buffer[position : position + size]
+        if not chunk:
+            break
+        chunks.append(decompressor.decompress(chunk))
+        position += len(chunk)
+        size = 65536
+    return b"".join(chunks)
+
+
+def _apply_delta(base: bytes, delta: bytes) -> bytes:  # noqa: C901
+    def varint(position: int) -> tuple[int, int]:
+        value = shift = 0
+        while True:
+            byte = delta[position]
+            position += 1
+            value |= (byte & 0x7F) << shift
+            shift += 7
+            if not byte & 0x80:
+                return value, position
+
+    _, position = varint(0)
+    _, position = varint(position)
+
+    result = bytearray()
+    while position < len(delta):
+        op = delta[position]
+        position += 1
+        if op & 0x80:
+            offset = size = 0
+            for bit in range(4):
+                if op & (1 << bit):
+                    offset |= delta[position] << (8 * bit)
+                    position += 1
+            for bit in range(3):
+                if op & (1 << (4 + bit)):
+                    size |= delta[position] << (8 * bit)
+                    position += 1
+            result += base[offset : offset + (size or 0x10000)]
+        elif op:
+            result += delta[position : position + op]
+            position += op
+        else:
+            raise UnsupportedRepository("Invalid delta instruction")
+
+    return bytes(result)
+
+
+class Repository:
+    """Read-only access to the refs and objects of a Git repository."""
+
+    def __init__(self, worktree: Path, git_dir: Path):
+        self.worktree = worktree
+        self.git_dir = git_dir
+        self.common_dir = common_dir(git_dir)
+        self.config = read_config(self.common_dir / "config")
+
+        if self.config.get("core.repositoryformatversion", "0") not in ("0", "1"):
+            raise UnsupportedRepository("Unsupported repository format version")
+        if self.config.get("extensions.objectformat", "sha1").lower() != "sha1":
+            raise UnsupportedRepository("Only SHA-1 repositories are supported")
+        if self.config.get("extensions.refstorage", "files").lower() != "files":
+            raise UnsupportedRepository("Only the 'files' ref storage is supported")
+
+        self._object_dirs = self._find_object_dirs()
+        self._packs: list[_Pack] | None = None
+        self._packed_refs: dict[str, tuple[str, str | None]] | None = None
+        self._commits: dict[str, Commit] = {}
+        self._shallow: set[str] | None = None
+        self._lock = threading.RLock()
+        self._memo: dict[Any, Any] = {}
+
+    @classmethod
+    def discover(cls, start: Path | None = None) -> Repository | None:
+        found = find_repository(start)
+        if found is None:
+            return None
+
+        shared = _shared.get()
+        if shared is None:
+            return cls(*found)
+        return shared.get(*found)
+
+    def close(self) -> None:
+        """Release the memory mapped packs, which are mapped again if still used."""
+        with self._lock:
+            packs, self._packs = self._packs or [], None
+        for pack in packs:
+            pack.close()
+
+    def __enter__(self) -> Repository:
+        return self
+
+    def __exit__(self, *args: object) -> None:
+        self.close()
+
+    def _memoize(self, key: Any, compute: Callable[[], _T]) -> _T:
+        with self._lock:
+            if key not in self._memo:
+                self._memo[key] = compute()
+            return self._memo[key]
+
+    def _find_object_dirs(self) -> list[Path]:
+        directories = [self.common_dir / "objects"]
+        alternates = self.common_dir / "objects" / "info" / "alternates"
+        with contextlib.suppress(OSError):
+            for line in alternates.read_text(encoding="utf-8").splitlines():
+                if line and not line.startswith("#"):
+                    directories.append((directories[0] / line).resolve())
+        return directories
+
+    # refs
+
+    @property
+    def packed_refs(self) -> dict[str, tuple[str, str | None]]:
+        if self._packed_refs is None:
+            refs: dict[str, tuple[str, str | None]] = {}
+            last = None
+            with contextlib.suppress(OSError):
+                content = (self.common_dir / "packed-refs").read_text(encoding="utf-8")
+                for line in content.splitlines():
+                    if not line or line.startswith("#"):
+                        continue
+                    if line.startswith("^") and last is not None:
+                        refs[last] = (refs[last][0], line[1:])
+                        continue
+                    sha, _, name = line.partition(" ")
+                    refs[name] = (sha, None)
+                    last = name
+            self._packed_refs = refs
+        return self._packed_refs
+
+    def _ref_path(self, name: str) -> Path:
+        if name == "HEAD" or not name.startswith("refs/"):
+            return self.git_dir / name
+        # refs like `refs/bisect/*` are private to a worktree
+        private = self.git_dir / name
+        if self.git_dir != self.common_dir and private.is_file():
+            return private
+        return self.common_dir / name
+
+    def read_ref(self, name: str) -> str | None:
+        """Return the raw value of a ref, which is either an object id or `ref: <name>`."""
+        try:
+            return self._ref_path(name).read_text(encoding="utf-8").strip()
+        except OSError:
+            packed = self.packed_refs.get(name)
+            return packed[0] if packed else None
+
+    def resolve_ref(self, name: str) -> str | None:
+        for _ in range(10):
+            value = self.read_ref(name)
+            if value is None or not value.startswith("ref:"):
+                return value
+            name = value.removeprefix("ref:").strip()
+        raise UnsupportedRepository(f"Too many levels of symbolic refs for '{name}'")
+
+    def head_branch(self) -> str | None:
+        """Return the short name of the branch checked out, like `git symbolic-ref --short HEAD`."""
+        value = self.read_ref("HEAD")
+        if value is None or not value.startswith("ref:"):
+            return None
+
+        ref = value.removeprefix("ref:").strip()
+        if ref.startswith("refs/heads/"):
+            short = ref.removeprefix("refs/heads/")
+            # git disambiguates a branch named like a tag
+            if self.read_ref(f"refs/tags/{short}") is not None:
+                return f"heads/{short}"
+            return short
+        return ref.removeprefix("refs/")
+
+    def resolve_revision(self, revision: str) -> str | None:
+        if re.fullmatch(r"[0-9a-f]{40}", revision):
+            return revision
+
+        for candidate in (
+            revision,
+            f"refs/{revision}",
+            f"refs/tags/{revision}",
+            f"refs/heads/{revision}",
+            f"refs/remotes/{revision}",
+            f"refs/remotes/{revision}/HEAD",
+        ):
+            if candidate != "HEAD" and not candidate.startswith("refs/"):
+                continue
+            sha = self.resolve_ref(candidate)
+            if sha is not None:
+                return sha
+
+        raise UnsupportedRepository(f"Unable to resolve revision '{revision}'")
+
+    def tags(self) -> dict[str, str]:
+        """Return the object id of every tag, keyed by the full ref name."""
+        return self._memoize("tags", self._read_tags)
+
+    def _read_tags(self) -> dict[str, str]:
+        tags = {
+            name: sha
+            for name, (sha, _) in self.packed_refs.items()
+            if name.startswith("refs/tags/")
+        }
+
+        tags_dir = self.common_dir / "refs" / "tags"
+        for directory, _, files in os.walk(tags_dir):
+            for name in files:
+                if name.endswith(".lock"):
+                    continue
+                path = Path(directory) / name
+                with contextlib.suppress(OSError):
+                    sha = path.read_text(encoding="utf-8").strip()
+                    if re.fullmatch(r"[0-9a-f]{40}", sha):
+                        tags[path.relative_to(self.common_dir).as_posix()] = sha
+
+        return dict(sorted(tags.items()))
+
+    # objects
+
+    @property
+    def packs(self) -> list[_Pack]:
+        if self._packs is None:
+            packs = []
+            for directory in self._object_dirs:
+                packs.extend(_Pack(idx) for idx in sorted(directory.glob("pack/*.idx")))
+            self._packs = packs
+        return self._packs
+
+    def read_object(self, sha: str) -> tuple[int, bytes]:
+        for directory in self._object_dirs:
+            path = directory / sha[:2] / sha[2:]
+            try:
+                raw = zlib.decompress(path.read_bytes())
+            except FileNotFoundError:
+                continue
+            header, _, data = raw.partition(b"\0")
+            kind = header.split(b" ", 1)[0]
+            return _TYPE_NAMES[kind], data
+
+        name = bytes.fromhex(sha)
+        for pack in self.packs:
+            offset = pack.find(name)
+            if offset is not None:
+                return self._read_packed(pack, offset)
+
+        raise KeyError(sha)
+
+    def _read_packed(self, pack: _Pack, offset: int) -> tuple[int, bytes]:
+        buffer = pack.pack
+        byte = buffer[offset]
+        kind = (byte >> 4) & 7
+        position = offset + 1
+        while byte & 0x80:
+            byte = buffer[position]
+            position += 1
+
+        if kind == OBJ_OFS_DELTA:
+            byte = buffer[position]
+            position += 1
+            distance = byte & 0x7F
+            while byte & 0x80:
+                byte = buffer[position]
+                position += 1
+                distance = ((distance + 1) << 7) | (byte & 0x7F)
+            base_kind, base = self._read_packed(pack, offset - distance)
+            return base_kind, _apply_delta(base, _inflate(buffer, position))
+
+        if kind == OBJ_REF_DELTA:
+            base_kind, base = self.read_object(buffer[position : position + 20].hex())
+            return base_kind, _apply_delta(base, _inflate(buffer, position + 20))
+
+        return kind, _inflate(buffer, position)
+
+    def has_object(self, sha: str) -> bool:
+        try:
+            self.read_object(sha)
+        except KeyError:
+            return False
+        return True
+
+    @property
+    def shallow(self) -> set[str]:
+        if self._shallow is None:
+            try:
+                content = (self.common_dir / "shallow").read_text(encoding="utf-8")
+            except OSError:
+                content = ""
+            self._shallow = set(content.split())
+        return self._shallow
+
+    def commit(self, sha: str) -> Commit:
+        commit = self._commits.get(sha)
+        if commit is None:
+            kind, data = self.read_object(sha)
+            if kind != OBJ_COMMIT:
+                raise KeyError(sha)
+            headers = _parse_headers(data)
+            parents = (
+                []
+                if sha in self.shallow
+                else [p.decode() for p in headers.get(b"parent", [])]
+            )
+            commit = Commit(
+                headers[b"tree"][0].decode(),
+                parents,
+                _parse_signature(headers[b"committer"][0]),
+            )
+            self._commits[sha] = commit
+        return commit
+
+    def recorded_parents(self, sha: str) -> list[str]:
+        """Return the parents a commit names, even those cut off by a shallow clone."""
+        kind, data = self.read_object(sha)
+        if kind != OBJ_COMMIT:
+            raise KeyError(sha)
+        return [p.decode() for p in _parse_headers(data).get(b"parent", [])]
+
+    def peel(self, sha: str) -> tuple[str | None, datetime | None]:
+        """Follow tag objects to a commit, returning it with the date of the outermost tag."""
+        return self._memoize(("peel", sha), lambda: self._peel(sha))
+
+    def _peel(self, sha: str) -> tuple[str | None, datetime | None]:
+        tagger_date = None
+        for depth in range(10):
+            try:
+                kind, data = self.read_object(sha)
+            except KeyError:
+                return None, tagger_date
+            if kind == OBJ_COMMIT:
+                return sha, tagger_date
+            if kind != OBJ_TAG:
+                return None, tagger_date
+
+            headers = _parse_headers(data)
+            if depth == 0 and b"tagger" in headers:
+                tagger_date = _parse_signature(headers[b"tagger"][0])
+            sha = headers[b"object"][0].decode()
+
+        return None, tagger_date
+
+    def tree_entries(self, sha: str, prefix: str = "") -> dict[str, tuple[int, str]]:
+        """Flatten a tree object into `{path: (mode, sha)}`."""
+        kind, data = self.read_object(sha)
+        if kind != OBJ_TREE:
+            raise KeyError(sha)
+
+        entries: dict[str, tuple[int, str]] = {}
+        position = 0
+        while position < len(data):
+            space = data.index(b" ", position)
+            nul = data.index(b"\0", space)
+            mode = int(data[position:space], 8)
+            name = data[space + 1 : nul].decode("utf-8", "surrogateescape")
+            child = data[nul + 1 : nul + 21].hex()
+            position = nul + 21
+
+            path = f"{prefix}{name}"
+            if stat.S_ISDIR(mode):
+                entries.update(self.tree_entries(child, f"{path}/"))
+            else:
+                entries[path] = (mode, child)
+        return entries
+
+    def abbreviate(self, sha: str) -> str:
+        """Shorten an object id like `git log --format=%h` does."""
+        setting = self.config.get("core.abbrev", "auto").lower()
+        if setting in ("no", "false"):
+            return sha
+        if setting.isdigit():
+            length = max(4, min(40, int(setting)))
+        else:
+            count = sum(pack.count for pack in self.packs)
+            # see `find_unique_abbrev_r` in git
+            length = max(7, (count.bit_length() + 1) // 2)
+
+        name = bytes.fromhex(sha)
+        candidates = {sha}
+        for pack in self.packs:
+            candidates.update(n.hex() for n in pack.names_with_prefix(name[:1]))
+        for directory in self._object_dirs:
+            with contextlib.suppress(OSError):
+                candidates.update(
+                    sha[:2] + p.name for p in (directory / sha[:2]).iterdir()
+                )
+        candidates.discard(sha)
+
+        while length < 40 and any(c.startswith(sha[:length]) for c in candidates):
+            length += 1
+        return sha[:length]
+
+    # history
+
+    def ancestors(self, sha: str) -> set[str]:
+        return self._memoize(("ancestors", sha), lambda: self._ancestors(sha))
+
+    def _ancestors(self, sha: str) -> set[str]:
+        seen = {sha}
+        stack = [sha]
+        while stack:
+            for parent in self.commit(stack.pop()).parents:
+                if parent in seen:
+                    continue
+                try:
+                    self.commit(parent)
+                except KeyError:
+                    continue
+                seen.add(parent)
+                stack.append(parent)
+        return seen
+
+    def topo_order(self, tip: str) -> dict[str, int]:
+        """Number the ancestors of `tip` in the order of `git log --topo-order <tip>`."""
+        return self._memoize(("topo_order", tip), lambda: self._topo_order(tip))
+
+    def _topo_order(self, tip: str) -> dict[str, int]:
+        commits = self.ancestors(tip)
+        indegree = dict.fromkeys(commits, 1)
+        for sha in commits:
+            for parent in self.commit(sha).parents:
+                if parent in indegree:
+                    indegree[parent] += 1
+
+        order: dict[str, int] = {}
+        # git emits the most recently queued commit first
+        stack = [tip]
+        while stack:
+            sha = stack.pop()
+            for parent in self.commit(sha).parents:
+                if indegree.get(parent, 0) == 0:
+                    continue
+                indegree[parent] -= 1
+                if indegree[parent] == 1:
+                    stack.append(parent)
+            indegree[sha] = 0
+            order[sha] = len(order)
+        return order
+
+
+# index and working tree
+
+
+class IndexEntry:
+    __slots__ = ("flags", "mode", "mtime", "path", "sha", "size", "stage")
+
+    def __init__(
+        self,
+        path: str,
+        mode: int,
+        sha: str,
+        size: int,
+        mtime: tuple[int, int],
+        stage: int,
+        flags: int,
+    ):
+        self.path = path
+        self.mode = mode
+        self.sha = sha
+        self.size = size
+        self.mtime = mtime
+        self.stage = stage
+        self.flags = flags
+
+
+_SKIP_WORKTREE = 0x4000
+_INTENT_TO_ADD = 0x2000
+
+
+def read_index(path: Path) -> tuple[list[IndexEntry], str | None]:  # noqa: C901
+    """Read the entries of an index file and the tree id cached for its root, if valid."""
+    try:
+        data = path.read_bytes()
+    except FileNotFoundError:
+        return [], None
+
+    signature, version, count = struct.unpack_from(">4sII", data, 0)
+    if signature != b"DIRC" or version not in (2, 3, 4):
+        raise UnsupportedRepository(f"Unsupported index version {version}")
+
+    entries = []
+    position = 12
+    previous = b""
+    for _ in range(count):
+        (_, _, mtime_s, mtime_ns, _, _, mode, _, _, size) = struct.unpack_from(
+            ">10I", data, position
+        )
+        sha = data[position + 40 : position + 60].hex()
+        (flags,) = struct.unpack_from(">H", data, position + 60)
+        header_end = position + 62
+        extended = 0
+        if flags & 0x4000:
+            (extended,) = struct.unpack_from(">H", data, header_end)
+            header_end += 2
+
+        if version == 4:
+            # the path is stored as "drop N bytes of the previous path, then append"
+            byte = data[header_end]
+            header_end += 1
+            strip = byte & 0x7F
+            while byte & 0x80:
+                byte = data[header_end]
+                header_end += 1
+                strip = ((strip + 1) << 7) | (byte & 0x7F)
+            nul = data.index(b"\0", header_end)
+            name = previous[: len(previous) - strip] + data[header_end:nul]
+            position = nul + 1
+        else:
+            nul = data.index(b"\0", header_end)
+            name = data[header_end:nul]
+            # entries are NUL padded to a multiple of eight bytes
+            position += (nul - position + 8) & ~7
+        previous = name
+
+        if stat.S_ISDIR(mode):
+            raise UnsupportedRepository("Sparse indexes are not supported")
+
+        entries.append(
+            IndexEntry(
+                name.decode("utf-8", "surrogateescape"),
+                mode,
+                sha,
+                size,
+                (mtime_s, mtime_ns),
+                (flags >> 12) & 3,
+                extended,
+            )
+        )
+
+    root_tree = None
+    end = len(data) - 20
+    while position + 8 <= end:
+        signature, length = struct.unpack_from(">4sI", data, position)
+        body = data[position + 8 : position + 8 + length]
+        if signature == b"link":
+            raise UnsupportedRepository("Split indexes are not supported")
+        if signature == b"TREE" and body.startswith(b"\0"):
+            # root entry: "\0<entry count> <subtrees>\n<tree id>", count is -1 if invalid
+            line_end = body.index(b"\n")
+            entry_count = int(body[1:line_end].split(b" ")[0])
+            if entry_count >= 0:
+                root_tree = body[line_end + 1 : line_end + 21].hex()
+        position += 8 + length
+
+    return entries, root_tree
+
+
+def _blob_id(data: bytes) -> str:
+    return hashlib.sha1(
+        b"blob %d\0" % len(data) + data, usedforsecurity=False
+    ).hexdigest()
+
+
+def _translate_ignore_pattern(line: str) -> tuple[re.Pattern, bool, bool] | None:  # noqa: C901
+    """Translate a gitignore line into `(regex, negated, directory_only)`."""
+    if not line.endswith("\\ "):
+        line = line.rstrip(" ")
+    if not line or line.startswith("#"):
+        return None
+
+    negated = line.startswith("!")
+    if negated or line.startswith("\\!") or line.startswith("\\#"):
+        line = line[1:]
+
+    directory_only = line.endswith("/")
+    line = line.rstrip("/")
+    anchored = "/" in line
+    line = line.lstrip("/")
+    if not line:
+        return None
+
+    parts = []
+    index = 0
+    while index < len(line):
+        char = line[index]
+        if line.startswith("**/", index) and (index == 0 or line[index - 1] == "/"):
+            parts.append("(?:.*/)?")
+            index += 3
+            continue
+        if line.startswith("/**", index) and index + 3 == len(line):
+            parts.append("/.*")
+            break
+        if char == "*":
+            parts.append("[^/]*")
+        elif char == "?":
+            parts.append("[^/]")
+        elif char == "[":
+            end = line.find("]", index + 2)
+            if end == -1:
+                parts.append(re.escape(char))
+            else:
+                body = line[index + 1 : end]
+                if body.startswith("!"):
+                    body = "^" + body[1:]
+                parts.append(f"[{body.replace(chr(92), chr(92) * 2)}]")
+                index = end
+        elif char == "\\" and index + 1 < len(line):
+            index += 1
+            parts.append(re.escape(line[index]))
+        else:
+            parts.append(re.escape(char))
+        index += 1
+
+    prefix = "" if anchored else "(?:.*/)?"
+    try:
+        regex = re.compile(f"^{prefix}{''.join(parts)}$", re.DOTALL)
+    except re.error:
+        return None
+    return regex, negated, directory_only
+
+
+class _IgnoreRules:
+    def __init__(self):
+        self.rules: list[tuple[str, re.Pattern, bool, bool]] = []
+
+    def extend(self, base: str, lines: list[str]) -> _IgnoreRules:
+        extended = _IgnoreRules()
+        extended.rules = list(self.rules)
+        for line in lines:
+            translated = _translate_ignore_pattern(line)
+            if translated is not None:
+                extended.rules.append((base, *translated))
+        return extended
+
+    def ignored(self, path: str, is_dir: bool) -> bool:
+        ignored = False
+        for base, regex, negated, directory_only in self.rules:
+            if directory_only and not is_dir:
+                continue
+            if base:
+                if not path.startswith(base):
+                    continue
+                relative = path[len(base) :]
+            else:
+                relative = path
+            if regex.match(relative):
+                ignored = not negated
+        return ignored
+
+
+def _read_lines(path: Path) -> list[str]:
+    try:
+        return path.read_text(encoding="utf-8", errors="replace").splitlines()
+    except OSError:
+        return []
+
+
+def _global_config() -> dict[str, str]:
+    config: dict[str, str] = {}
+    xdg = os.environ.get("XDG_CONFIG_HOME") or str(Path.home() / ".config")
+    config.update(read_config(Path(xdg) / "git" / "config"))
+    config.update(read_config(Path.home() / ".gitconfig"))
+    return config
+
+
+def _excludes_file(config: dict[str, str]) -> Path:
+    value = config.get("core.excludesfile")
+    if value:
+        return Path(value).expanduser()
+    xdg = os.environ.get("XDG_CONFIG_HOME") or str(Path.home() / ".config")
+    return Path(xdg) / "git" / "ignore"
+
+
+class WorkTree:
+    """Compare HEAD, the index and the working tree like `git status` does."""
+
+    def __init__(self, repo: Repository, excluded: frozenset[str] = frozenset()):
+        self.repo = repo
+        self.config = {**_global_config(), **repo.config}
+        self.entries, self.root_tree = read_index(repo.git_dir / "index")
+        # paths (relative to the work tree) whose changes are ignored
+        self.excluded = excluded
+        if excluded:
+            self.entries = [e for e in self.entries if e.path not in excluded]
+
+    def has_staged_changes(self, head: str | None) -> bool:
+        if head is None:
+            return bool(self.entries)
+
+        tree = self.repo.commit(head).tree
+        if self.root_tree is not None and not self.excluded:
+            return self.root_tree != tree
+
+        expected = self.repo.tree_entries(tree)
+        for path in self.excluded:
+            expected.pop(path, None)
+        actual = {e.path: (e.mode, e.sha) for e in self.entries if e.stage == 0}
+        return len(actual) != len(self.entries) or actual != expected
+
+    def has_unstaged_changes(self) -> bool:
+        try:
+            index_mtime = (self.repo.git_dir / "index").stat().st_mtime_ns
+        except OSError:
+            index_mtime = 0
+        trust_filemode = self.config.get("core.filemode", "true").lower() != "false"
+
+        for entry in self.entries:
+            if entry.flags & _SKIP_WORKTREE:
+                continue
+            if entry.stage or entry.flags & _INTENT_TO_ADD:
+                return True
+            path = self.repo.worktree / entry.path
+            if entry.mode == _MODE_GITLINK:
+                if self._submodule_changed(path, entry.sha):
+                    return True
+                continue
+            try:
+                st = path.lstat()
+            except OSError:
+                return True
+            if self._file_changed(entry, path, st, index_mtime, trust_filemode):
+                return True
+        return False
+
+    def _submodule_changed(self, path: Path, sha: str) -> bool:
+        found = find_repository(path)
+        if found is None or found[0] != path.resolve():
+            # an uninitialized submodule is not a change
+            return False
+        with Repository(*found) as submodule:
+            return submodule.resolve_ref("HEAD") != sha
+
+    @staticmethod
+    def _file_changed(
+        entry: IndexEntry,
+        path: Path,
+        st: os.stat_result,
+        index_mtime: int,
+        trust_filemode: bool,
+    ) -> bool:
+        if entry.mode == _MODE_SYMLINK:
+            if not stat.S_ISLNK(st.st_mode):
+                return True
+        elif not stat.S_ISREG(st.st_mode) or (
+            trust_filemode and bool(st.st_mode & 0o100) != (entry.mode & 0o777 == 0o755)
+        ):
+            return True
+
+        # like git, an entry without a size has no stat data to trust, e.g. one
+        # written by `git read-tree`, so its content decides
+        if st.st_size & 0xFFFFFFFF != entry.size and entry.size:
+            return True
+
+        mtime_ns = entry.mtime[0] * 1_000_000_000 + entry.mtime[1]
+        file_mtime_ns = st.st_mtime_ns
+        if not entry.mtime[1]:
+            # git built without nanosecond support only records seconds
+            file_mtime_ns -= file_mtime_ns % 1_000_000_000
+        # entries written in the same instant as the index are "racily clean",
+        # so only trust the stat data when the file is older than the index
+        if file_mtime_ns == mtime_ns and mtime_ns < index_mtime:
+            return False
+
+        if entry.mode == _MODE_SYMLINK:
+            content = os.fsencode(os.readlink(path))
+        else:
+            content = path.read_bytes()
+        return _blob_id(content) != entry.sha
+
+    def has_untracked_files(self) -> bool:
+        if self.config.get("status.showuntrackedfiles", "normal").lower() in (
+            "no",
+            "false",
+        ):
+            return False
+
+        tracked = {e.path for e in self.entries} | self.excluded
+        gitlinks = {e.path for e in self.entries if e.mode == _MODE_GITLINK}
+        rules = _IgnoreRules().extend("", _read_lines(_excludes_file(self.config)))
+        rules = rules.extend("", _read_lines(self.repo.common_dir / "info" / "exclude"))
+        return self._scan(self.repo.worktree, "", rules, tracked, gitlinks)
+
+    def _scan(
+        self,
+        directory: Path,
+        prefix: str,
+        rules: _IgnoreRules,
+        tracked: set[str],
+        gitlinks: set[str],
+    ) -> bool:
+        rules = rules.extend(prefix, _read_lines(directory / ".gitignore"))
+        try:
+            children = list(os.scandir(directory))
+        except OSError:
+            return False
+
+        for child in children:
+            path = f"{prefix}{child.name}"
+            if not prefix and child.name == ".git":
+                continue
+            is_dir = child.is_dir(follow_symlinks=False)
+            if path in tracked or path in gitlinks:
+                continue
+            if rules.ignored(path, is_dir):
+                continue
+            if not is_dir:
+                return True
+            if (Path(child.path) / ".git").exists():
+                # a nested repository is reported as a single untracked entry
+                return True
+            if self._scan(Path(child.path), f"{path}/", rules, tracked, gitlinks):
+                return True
+        return False
+
+
+# version resolution
+
+
+class SharedRepositories:
+    """One snapshot of each repository, reused by every resolution run with `run`."""
+
+    def __init__(self) -> None:
+        self._repositories: dict[Path, Repository] = {}
+        self._lock = threading.Lock()
+
+    def get(self, worktree: Path, git_dir: Path) -> Repository:
+        with self._lock:
+            repo = self._repositories.get(git_dir)
+            if repo is None:
+                repo = self._repositories[git_dir] = Repository(worktree, git_dir)
+            return repo
+
+    def run(self, function: Callable[..., _T], *args: Any) -> _T:
+        """Call `function`, sharing these repositories with what it resolves."""
+        token = _shared.set(self)
+        try:
+            return function(*args)
+        finally:
+            _shared.reset(token)
+
+    def close(self) -> None:
+        with self._lock:
+            repositories, self._repositories = self._repositories, {}
+        for repo in repositories.values():
+            repo.close()
+
+    def __enter__(self) -> SharedRepositories:
+        return self
+
+    def __exit__(self, *args: object) -> None:
+        self.close()
+
+
+@contextlib.contextmanager
+def shared_repositories() -> Iterator[SharedRepositories]:
+    """Reuse one snapshot of each repository for every resolution in this block.
+
+    Only resolutions in the block's context share them: use `SharedRepositories.run`
+    for other threads, or where the block is in a generator.
+    """
+    with SharedRepositories() as shared:
+        token = _shared.set(shared)
+        try:
+            yield shared
+        finally:
+            _shared.reset(token)
+
+
+@contextlib.contextmanager
+def discovered(start: Path | None = None) -> Iterator[Repository | None]:
+    """Discover the repository at `start`, closed at the end of the block unless shared."""
+    repo = Repository.discover(start)
+    try:
+        yield repo
+    finally:
+        if repo is not None and _shared.get() is None:
+            repo.close()
+
+
+def _check_supported(worktree: Path, vcs: Vcs, path: Path | None) -> None:
+    if os.environ.get("GIT_DIR") or os.environ.get("GIT_WORK_TREE"):
+        raise UnsupportedRepository("GIT_DIR and GIT_WORK_TREE are not supported")
+
+    if _detect_vcs_from_archival(path) is not None:
+        raise UnsupportedRepository("Archives are handled by dunamai")
+
+    if vcs == Vcs.Any:
+        start = (path or Path.cwd()).resolve()
+        for directory in (start, *start.parents):
+            if any((directory / marker).exists() for marker in _OTHER_VCS_MARKERS):
+                raise UnsupportedRepository("Another VCS might take precedence")
+            if directory == worktree:
+                break
+
+
+def is_dirty(
+    repo: Repository,
+    head: str | None,
+    ignore_untracked: bool,
+    excluded: frozenset[str] = frozenset(),
+) -> bool:
+    """Check the work tree for changes like `git status`, ignoring `excluded` paths."""
+
+    def compute() -> bool:
+        worktree = WorkTree(repo, excluded)
+        if worktree.has_staged_changes(head) or worktree.has_unstaged_changes():
+            return True
+        return not ignore_untracked and worktree.has_untracked_files()
+
+    return repo._memoize(("dirty", head, ignore_untracked, excluded), compute)
+
+
+def excluded_paths(
+    repo: Repository, paths: Iterable[str], root: Path | None = None
+) -> frozenset[str]:
+    """Convert paths relative to `root` (the current directory by default) to
+    paths relative to the work tree, dropping those outside of it."""
+    base = (root or Path.cwd()).resolve()
+    worktree = repo.worktree.resolve()
+    excluded = set()
+    for path in paths:
+        with contextlib.suppress(ValueError):
+            excluded.add((base / path).resolve().relative_to(worktree).as_posix())
+    return frozenset(excluded)
+
+
+def from_git(
+    pattern: str | Pattern = Pattern.Default,
+    latest_tag: bool = False,
+    tag_branch: str | None = None,
+    full_commit: bool = False,
+    strict: bool = False,
+    pattern_prefix: str | None = None,
+    ignore_untracked: bool = False,
+    commit_length: int | None = None,
+    highest_tag: bool = False,
+    path: Path | None = None,
+    vcs: Vcs = Vcs.Git,
+    tag_index: bool = False,
+    fields: frozenset[str] | None = None,
+    exclude: Iterable[str] = (),
+) -> Version:
+    """Determine a version based on Git tags, like `dunamai.Version.from_git`.
+
+    Unless `fields` (all by default) includes `dirty`, the work tree isn't checked
+    and `dirty` is left unset. Changes to the files in `exclude` (relative to
+    `path`) don't make it dirty.
+    """
+    with discovered(path) as repo:
+        if repo is None:
+            if vcs == Vcs.Any:
+                raise UnsupportedRepository("Not in a Git repository")
+            raise RuntimeError("This does not appear to be a Git project")
+        _check_supported(repo.worktree, vcs, path)
+
+        return _from_repository(
+            repo,
+            pattern=pattern,
+            latest_tag=latest_tag,
+            tag_branch=tag_branch,
+            full_commit=full_commit,
+            strict=strict,
+            pattern_prefix=pattern_prefix,
+            ignore_untracked=ignore_untracked,
+            commit_length=commit_length,
+            highest_tag=highest_tag,
+            vcs=vcs,
+            tag_index=tag_index,
+            fields=fields,
+            excluded=excluded_paths(repo, exclude, path),
+        )
+
+
+def _from_repository(  # noqa: C901
+    repo: Repository,
+    *,
+    pattern: str | Pattern = Pattern.Default,
+    latest_tag: bool = False,
+    tag_branch: str | None = None,
+    full_commit: bool = False,
+    strict: bool = False,
+    pattern_prefix: str | None = None,
+    ignore_untracked: bool = False,
+    commit_length: int | None = None,
+    highest_tag: bool = False,
+    vcs: Vcs = Vcs.Git,
+    tag_index: bool = False,
+    fields: frozenset[str] | None = None,
+    excluded: frozenset[str] = frozenset(),
+) -> Version:
+    vcs = Vcs.Git
+    full_commit = full_commit or commit_length is not None
+
+    concerns: set[Concern] = set()
+    if repo.shallow:
+        concerns.add(Concern.ShallowRepository)
+    if strict and concerns:
+        raise RuntimeError("\n".join(x.message() for x in concerns))
+
+    branch = repo.head_branch()
+    head = repo.resolve_ref("HEAD")
+    if head is None or not repo.has_object(head):
+        return Version._fallback(
+            strict, distance=0, dirty=True, branch=branch, concerns=concerns, vcs=vcs
+        )
+
+    commit = (head if full_commit else repo.abbreviate(head))[:commit_length]
+    timestamp = repo.commit(head).timestamp
+    dirty = (
+        is_dirty(repo, head, ignore_untracked, excluded)
+        if fields is None or "dirty" in fields
+        else None
+    )
+
+    head_ancestors = repo.ancestors(head)
+    tip = (
+        head if tag_branch is None else repo.peel(repo.resolve_revision(tag_branch))[0]
+    )
+    if tip is None:
+        raise UnsupportedRepository(f"'{tag_branch}' is not a commit")
+    tip_ancestors = head_ancestors if tip == head else repo.ancestors(tip)
+
+    index = None
+    if tag_index and (highest_tag or latest_tag):
+        from . import tagindex
+
+        index = tagindex.TagIndex.open(repo, pattern, pattern_prefix).update(repo)
+        targets = {ref: (entry.commit, entry.date) for ref, entry in index.items()}
+    else:
+        targets = {ref: repo.peel(sha) for ref, sha in repo.tags().items()}
+
+    detailed_tags = []
+    tagged_commits = {}
+    for ref, (peeled, tagger_date) in targets.items():
+        if peeled is None or peeled not in tip_ancestors:
+            continue
+        tagged_commits[ref] = peeled
+        date = tagger_date or repo.commit(peeled).timestamp
+        detailed_tags.append((ref, date))
+
+    def fallback() -> Version:
+        return Version._fallback(
+            strict,
+            distance=len(head_ancestors),
+            commit=commit,
+            dirty=dirty,
+            branch=branch,
+            timestamp=timestamp,
+            concerns=concerns,
+            vcs=vcs,
+        )
+
+    if not detailed_tags:
+        return fallback()
+
+    def sort_key(item: tuple[str, datetime]) -> tuple[int, datetime]:
+        ref, date = item
+        return (-repo.topo_order(tip).get(tagged_commits[ref], sys.maxsize), date)
+
+    group = None
+    if index is not None and highest_tag:
+        group = tagindex.highest(index, (ref for ref, _ in detailed_tags))
+
+    if group is not None and (group or not strict):
+        if not group:
+            return fallback()
+
+        # only the highest ranked tags have to be put in order, not all of them
+        dates = dict(detailed_tags)
+        ranked = sorted(
+            ((ref, dates[ref]) for ref in group), key=sort_key, reverse=True
+        )
+        selected = tagindex.select(index, [ref for ref, _ in ranked])
+        tags = [selected.removeprefix("refs/tags/")]
+        matched_pattern = _match_version_pattern(
+            pattern, tags, False, False, strict, pattern_prefix
+        )
+    else:
+        tags = [
+            ref.removeprefix("refs/tags/")
+            for ref, _ in sorted(detailed_tags, key=sort_key, reverse=True)
+        ]
+        matched_pattern = _match_version_pattern(
+            pattern, tags, latest_tag, highest_tag, strict, pattern_prefix
+        )
+    if matched_pattern is None:
+        return fallback()
+
+    tag, base, stage, unmatched, tagged_metadata, epoch = matched_pattern
+    distance = len(head_ancestors - repo.ancestors(tagged_commits[f"refs/tags/{tag}"]))
+
+    version = Version(
+        base,
+        stage=stage,
+        distance=distance,
+        commit=commit,
+        dirty=dirty,
+        tagged_metadata=tagged_metadata,
+        epoch=epoch,
+        branch=branch,
+        timestamp=timestamp,
+        concerns=concerns,
+        vcs=vcs,
+    )
+    version._matched_tag = tag
+    version._newer_unmatched_tags = unmatched
+    return version
+
+
+def from_config(
+    config: schemas.UvDynamicVersioning,
+    path: Path | None = None,
+    fields: frozenset[str] | None = None,
+) -> Version:
+    return from_git(
+        pattern=config.pattern,
+        latest_tag=config.latest_tag,
+        tag_branch=config.tag_branch,
+        full_commit=config.full_commit,
+        strict=config.strict,
+        pattern_prefix=config.pattern_prefix,
+        ignore_untracked=config.ignore_untracked,
+        commit_length=config.commit_length,
+        highest_tag=config.highest_tag,
+        path=path,
+        vcs=config.vcs,
+        tag_index=config.tag_index,
+        fields=fields,
+        exclude=[config.version_file.path] if config.version_file else (),
+    )
@@ -1,14 +1,35 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
 from hatchling.plugin import hookimpl
 
-from .metadata_hook import DependenciesMetadataHook
-from .version_source import DynamicVersionSource
+if TYPE_CHECKING:
+    from .build_hook import VersionFileBuildHook
+    from .metadata_hook import DependenciesMetadataHook
+    from .version_source import DynamicVersionSource
+
+
+# hatch only calls the hooks of the plugin types a build uses, so import each
+# plugin on demand instead of loading all of them (and jinja2) whenever hatch starts
 
 
 @hookimpl
-def hatch_register_version_source():
+def hatch_register_version_source() -> type[DynamicVersionSource]:
+    from .version_source import DynamicVersionSource
+
     return DynamicVersionSource
 
 
 @hookimpl
 def hatch_register_metadata_hook() -> type[DependenciesMetadataHook]:
+    from .metadata_hook import DependenciesMetadataHook
+
     return DependenciesMetadataHook
+
+
+@hookimpl
+def hatch_register_build_hook() -> type[VersionFileBuildHook]:
+    from .build_hook import VersionFileBuildHook
+
+    return VersionFileBuildHook
@@ -1,15 +1,28 @@
 from __future__ import annotations
 
+import contextlib
 import os
 import re
+from collections.abc import Callable, Iterable, Mapping
 from functools import partial
 from pathlib import Path
+from typing import TYPE_CHECKING, Any, TypeVar
 
-import tomlkit
-from dunamai import _VALID_PEP440, _VALID_PVP, _VALID_SEMVER, Style, Version
+from dunamai import _VALID_PEP440, _VALID_PVP, _VALID_SEMVER, Style, Vcs, Version
 
-from . import schemas
-from .template import render_template
+from . import commands, schemas, trace
+
+if TYPE_CHECKING:
+    from .cache import VersionCache
+
+try:
+    import tomllib
+except ModuleNotFoundError:  # Python < 3.11
+    tomllib = None  # type: ignore[assignment]
+
+T = TypeVar("T")
+
+_projects: dict[Path, tuple[tuple[int, int], schemas.Project]] = {}
 
 
 def read(root: str):
@@ -18,51 +31,83 @@ def read(root: str):
     return pyproject.read_text(encoding="utf-8")
 
 
-def parse(text: str):
+def parse(text: str) -> Mapping[str, Any]:
+    # only `[tool.uv-dynamic-versioning]` is read, so there is no need for
+    # tomlkit's style preserving (and much slower) round-trip parser
+    if tomllib is not None:
+        return tomllib.loads(text)
+
+    import tomlkit
+
     return tomlkit.parse(text)
 
 
-def validate(project: tomlkit.TOMLDocument):
-    return schemas.Project.from_dict(project.unwrap())
+def validate(project: Mapping[str, Any]) -> schemas.Project:
+    unwrap = getattr(project, "unwrap", None)
+    return schemas.Project.from_dict(unwrap() if unwrap else dict(project))
+
+
+def load(root: str) -> schemas.Project:
+    """Read, parse and validate `pyproject.toml`, memoized on its mtime and size."""
+    pyproject = (Path(root) / "pyproject.toml").resolve()
+    stat = pyproject.stat()
+    signature = (stat.st_mtime_ns, stat.st_size)
+
+    cached = _projects.get(pyproject)
+    if cached is not None and cached[0] == signature:
+        trace.record("cache-hit", cache="project")
+        return cached[1]
+
+    with trace.span("read"):
+        text = read(root)
+    with trace.span("parse"):
+        data = parse(text)
+    with trace.span("validate"):
+        project = validate(data)
+    _projects[pyproject] = (signature, project)
+    return project
 
 
 def _get_bypassed_version() -> str | None:
     return os.environ.get("UV_DYNAMIC_VERSIONING_BYPASS")
 
 
-def check_version_style(version: str, style: Style = Style.Pep440) -> None:
-    """Check if a version is valid for a style."""
-    name, pattern = {
-        Style.Pep440: ("PEP 440", _VALID_PEP440),
-        Style.SemVer: ("Semantic Versioning", _VALID_SEMVER),
-        Style.Pvp: ("PVP", _VALID_PVP),
-    }[style]
-    failure_message = f"Version '{version}' does not conform to the {name} style"
-    if not re.search(pattern, version):
-        raise ValueError(failure_message)
+_STYLES = {
+    Style.Pep440: ("PEP 440", re.compile(_VALID_PEP440)),
+    Style.SemVer: ("Semantic Versioning", re.compile(_VALID_SEMVER)),
+    Style.Pvp: ("PVP", re.compile(_VALID_PVP)),
+}
+_SEMVER_SEPARATOR = re.compile(r"[.-]")
+_LEADING_ZERO = re.compile(r"^0[0-9]+$")
+
+
+def conforms_to_style(version: str, style: Style = Style.Pep440) -> bool:
+    """Check if a version is valid for a style, without raising."""
+    if not _STYLES[style][1].search(version):
+        return False
 
     if style == Style.SemVer:
-        parts = re.split(r"[.-]", version.split("+", 1)[0])
-        if any(re.search(r"^0[0-9]+$", x) for x in parts):
-            raise ValueError(failure_message)
+        parts = _SEMVER_SEPARATOR.split(version.split("+", 1)[0])
+        return not any(_LEADING_ZERO.search(x) for x in parts)
+    return True
+
+
+def check_version_style(version: str, style: Style = Style.Pep440) -> None:
+    """Check if a version is valid for a style."""
+    if not conforms_to_style(version, style):
+        name = _STYLES[style][0]
+        raise ValueError(f"Version '{version}' does not conform to the {name} style")
 
 
-def _get_from_file_version(config: schemas.UvDynamicVersioning) -> str | None:
+def _get_from_file_version(
+    config: schemas.UvDynamicVersioning, root: Path | None = None
+) -> str | None:
     if config.from_file is None:
         return None
 
-    source, pattern = (config.from_file.source, config.from_file.pattern)
-    # `pattern` is meant for source files (e.g. `__init__.py`), whose non-version
-    # content can be non-ASCII, so don't let the locale encoding decide either.
-    content = Path(source).read_text(encoding="utf-8").strip()
+    from .fromfile import read_version
 
-    if pattern is None:
-        return content
-
-    result = re.search(pattern, content, re.MULTILINE)
-    if result is None:
-        raise ValueError(f"File '{source}' did not contain a match for '{pattern}'")
-    return str(result.group(1))
+    return read_version(config.from_file, root)
 
 
 def _patch_version_serialize(
@@ -84,8 +129,201 @@ def _patch_version_serialize(
     return version
 
 
-def _get_version(config: schemas.UvDynamicVersioning) -> Version:
+def _get_version(
+    config: schemas.UvDynamicVersioning,
+    root: Path | None = None,
+    daemon: bool = False,
+    fields: frozenset[str] | None = None,
+) -> Version:
+    from .analysis import persistent
+
+    # the daemon keeps versions while the repository's state is the same
+    if daemon and persistent(fields):
+        from . import daemon as version_daemon
+
+        answered = version_daemon.query(config, root, fields)
+        trace.record("cache-hit" if answered else "cache-miss", cache="daemon")
+        if answered is not None:
+            return answered
+
+    try:
+        version = _within_timeout(config, _query_vcs, config, root, fields)
+    except RuntimeError as e:
+        # not cached again, since it's not the version of the current state
+        if (last := _on_timeout(e, config, root, fields)) is not None:
+            return last
+        if fallback_version := config.fallback_version:
+            return Version(fallback_version)
+        raise e
+
+    return version
+
+
+def _version_cache(
+    config: schemas.UvDynamicVersioning,
+    root: Path | None,
+    fields: frozenset[str] | None,
+) -> VersionCache | None:
+    if not config.cache:
+        return None
+
+    # optional features are imported on demand to keep startup cheap
+    from .analysis import persistent
+    from .cache import VersionCache
+
+    # a dirty flag would be served from before the work tree changed
+    if not persistent(fields):
+        return None
+    return VersionCache.for_config(config, root)
+
+
+def _query_vcs(
+    config: schemas.UvDynamicVersioning,
+    root: Path | None = None,
+    fields: frozenset[str] | None = None,
+) -> Version:
+    """Return the cached version for the repository's state, or query the VCS."""
+    cache = _version_cache(config, root, fields)
+    if cache is not None:
+        cached = cache.get(config, fields)
+        trace.record("cache-hit" if cached else "cache-miss", cache="version")
+        if cached is not None:
+            return cached
+
+    with trace.span("vcs"):
+        version = _get_vcs_version(config, root, fields)
+
+    if cache is not None:
+        cache.set(config, version, fields)
+
+    return version
+
+
+def _last_cached_version(
+    config: schemas.UvDynamicVersioning,
+    root: Path | None = None,
+    fields: frozenset[str] | None = None,
+) -> Version | None:
+    cache = _version_cache(config, root, fields)
+    return cache.latest(config, fields) if cache is not None else None
+
+
+def _within_timeout(
+    config: schemas.UvDynamicVersioning, function: Callable[..., T], *args: Any
+) -> T:
+    """Call `function`, killing the commands it runs once `vcs-timeout` runs out.
+
+    The cache is read within the timeout too, since it's in the repository.
+    """
+    if config.vcs_timeout is None:
+        return function(*args)
+
+    from .budget import call
+
+    return call(config.vcs_timeout, function, *args)
+
+
+def _on_timeout(
+    error: RuntimeError,
+    config: schemas.UvDynamicVersioning,
+    root: Path | None,
+    fields: frozenset[str] | None,
+) -> Version | None:
+    """Warn that the VCS timed out, and return the last cached version, if any."""
+    if config.vcs_timeout is None:
+        return None
+
+    from .budget import VcsTimeoutError
+
+    if not isinstance(error, VcsTimeoutError):
+        return None
+
+    # a stalled file system may stall the cache as well, so it gets as long again
     try:
+        last = _within_timeout(config, _last_cached_version, config, root, fields)
+    except VcsTimeoutError:
+        last = None
+    if last is not None or config.fallback_version:
+        import warnings
+
+        instead = "the last cached version" if last else "fallback-version"
+        warnings.warn(f"{error}, using {instead} instead", stacklevel=4)
+    return last
+
+
+def _needed_fields(
+    config: schemas.UvDynamicVersioning, fields: Iterable[str] | None
+) -> frozenset[str] | None:
+    """Add the fields the version is serialized from to those the caller needs."""
+    if fields is None:
+        return None
+
+    from .analysis import OPTIONAL_FIELDS, required_fields
+
+    fields = frozenset(fields)
+    if fields >= OPTIONAL_FIELDS:
+        return None
+    return fields | required_fields(config)
+
+
+def _get_vcs_version(
+    config: schemas.UvDynamicVersioning,
+    root: Path | None = None,
+    fields: frozenset[str] | None = None,
+) -> Version:
+    if config.tag_manifest is not None and config.vcs in (Vcs.Any, Vcs.Git):
+        from . import gitreader, manifest
+
+        with contextlib.suppress(gitreader.UnsupportedRepository):
+            version = manifest.from_manifest(config, root)
+            if version is not None:
+                return version
+
+    # the tag index is maintained by the Python reader, so it implies that backend
+    use_reader = config.git_backend == schemas.GitBackend.Python or config.tag_index
+    if use_reader and config.vcs in (Vcs.Any, Vcs.Git):
+        from . import gitreader
+
+        # fall back to the `git` CLI for anything the reader doesn't support
+        with contextlib.suppress(gitreader.UnsupportedRepository):
+            # which leaves the version file out of the dirty check by itself
+            return gitreader.from_config(config, root, fields)
+
+    version = _get_cli_version(config, root, fields)
+
+    # builds stamping the version into a tracked file must not make themselves dirty
+    if version.dirty and config.version_file is not None and version.vcs == Vcs.Git:
+        from .versionfile import is_dirty_besides
+
+        version.dirty = is_dirty_besides(
+            config.version_file, root, config.ignore_untracked
+        )
+
+    return version
+
+
+def _get_cli_version(
+    config: schemas.UvDynamicVersioning,
+    root: Path | None = None,
+    fields: frozenset[str] | None = None,
+) -> Version:
+    with commands.installed():
+        concurrent = config.git_backend == schemas.GitBackend.CliConcurrent
+        # Dunamai runs every query, so skipping some takes this project's own CLI path
+        if (concurrent or fields is not None) and config.vcs in (Vcs.Any, Vcs.Git):
+            from . import gitreader
+
+            try:
+                from . import gitquery
+            except ImportError:
+                # it's built on private helpers of the Dunamai version pinned, which
+                # another one may not have
+                gitquery = None  # type: ignore[assignment]
+
+            if gitquery is not None:
+                with contextlib.suppress(gitreader.UnsupportedRepository):
+                    return gitquery.from_config(config, root, fields, concurrent)
+
         return Version.from_vcs(
             config.vcs,
             latest_tag=config.latest_tag,
@@ -98,38 +336,62 @@ def _get_version(config: schemas.UvDynamicVersioning) -> Version:
             pattern_prefix=config.pattern_prefix,
             commit_length=config.commit_length,
             highest_tag=config.highest_tag,
+            path=root,
         )
-    except RuntimeError as e:
-        if fallback_version := config.fallback_version:
-            return Version(fallback_version)
-        raise e
 
 
-def get_version(config: schemas.UvDynamicVersioning) -> tuple[str, Version]:
+def get_version(
+    config: schemas.UvDynamicVersioning,
+    *,
+    root: Path | None = None,
+    daemon: bool = False,
+    fields: Iterable[str] | None = None,
+) -> tuple[str, Version]:
+    """Resolve the version of the project at `root`, the current directory by default.
+
+    With `daemon`, ask a running `uv-dynamic-versioning daemon` for the VCS based
+    version first.
+
+    With `fields`, only the `Version` fields in it and those the version is
+    serialized from are guaranteed to be resolved, which skips the VCS queries
+    for the others (e.g. checking a large work tree for changes).
+    """
     bypassed = _get_bypassed_version()
     if bypassed:
         parsed = Version.parse(bypassed, pattern=config.pattern)
         return bypassed, _patch_version_serialize(parsed, config)
 
-    from_file = _get_from_file_version(config)
+    with trace.span("from-file"):
+        from_file = _get_from_file_version(config, root)
     if from_file:
         parsed = Version.parse(from_file, pattern=config.pattern)
         return from_file, _patch_version_serialize(parsed, config)
 
-    got = _get_version(config)
+    got = _get_version(config, root, daemon, _needed_fields(config, fields))
+    return _serialize(config, got)
+
+
+def _serialize(
+    config: schemas.UvDynamicVersioning, got: Version
+) -> tuple[str, Version]:
+    """Apply `bump`, `format` and `format-jinja` to a VCS based version."""
     version = _patch_version_serialize(got, config)
 
     if config.format_jinja:
+        from .template import render_template
+
         updated = (
             version.bump(index=config.bump_config.index)
             if config.bump_config.enable and version.distance > 0
             else version
         )
-        serialized = render_template(
-            config.format_jinja, version=updated, config=config
-        )
+        with trace.span("render-template"):
+            serialized = render_template(
+                config.format_jinja, version=updated, config=config
+            )
         if config.style:
-            check_version_style(serialized, config.style)
+            with trace.span("check-version-style"):
+                check_version_style(serialized, config.style)
     else:
         updated = (
             version.bump(smart=True, index=config.bump_config.index)
@@ -0,0 +1,241 @@
+from __future__ import annotations
+
+import json
+import re
+import sys
+from pathlib import Path
+from typing import Any
+
+from dunamai import Pattern, Vcs, Version, _match_version_pattern
+
+from . import schemas
+from .gitreader import (
+    Repository,
+    _check_supported,
+    discovered,
+    excluded_paths,
+    is_dirty,
+)
+
+# bump when the layout of the manifest changes
+MANIFEST_VERSION = 1
+
+
+def _ancestor_counts(repo: Repository, tip: str, wanted: set[str]) -> dict[str, int]:
+    """Count the ancestors (inclusive) of each commit in `wanted`, like `git rev-list --count`."""
+    order = repo.topo_order(tip)
+    children: dict[str, int] = {}
+    for sha in order:
+        for parent in repo.commit(sha).parents:
+            children[parent] = children.get(parent, 0) + 1
+
+    # one bit per commit, visiting parents before their children, and dropping
+    # a commit's set as soon as its last child has been visited
+    masks: dict[str, int] = {}
+    counts = {}
+    for sha in sorted(order, key=order.__getitem__, reverse=True):
+        mask = 1 << order[sha]
+        for parent in repo.commit(sha).parents:
+            mask |= masks[parent]
+            children[parent] -= 1
+            if not children[parent]:
+                del masks[parent]
+        if sha in wanted:
+            counts[sha] = mask.bit_count()
+        if children.get(sha):
+            masks[sha] = mask
+    return counts
+
+
+def generate(
+    config: schemas.UvDynamicVersioning, root: Path | None = None
+) -> dict[str, Any]:
+    """Describe the tags reachable from `HEAD` that match the configured pattern."""
+    with discovered(root) as repo:
+        if repo is None:
+            raise RuntimeError("This does not appear to be a Git project")
+        return _generate(repo, config)
+
+
+def _generate(repo: Repository, config: schemas.UvDynamicVersioning) -> dict[str, Any]:
+    if repo.shallow:
+        raise RuntimeError("A tag manifest has to be generated from a full clone")
+
+    head = repo.resolve_ref("HEAD")
+    if head is None or not repo.has_object(head):
+        raise RuntimeError("HEAD does not point to a commit")
+
+    regex = Pattern.parse(config.pattern, config.pattern_prefix)
+    head_ancestors = repo.ancestors(head)
+    order = repo.topo_order(head)
+
+    tags = []
+    for ref, sha in repo.tags().items():
+        name = ref.removeprefix("refs/tags/")
+        commit, tagger_date = repo.peel(sha)
+        if commit is None or commit not in head_ancestors:
+            continue
+        if re.search(regex, name) is None:
+            continue
+        date = tagger_date or repo.commit(commit).timestamp
+        tags.append(((-order.get(commit, sys.maxsize), date), name, commit))
+    # newest first, in the order `from_git` considers tags
+    tags.sort(key=lambda tag: tag[0], reverse=True)
+
+    counts = _ancestor_counts(repo, head, {head, *(commit for _, _, commit in tags)})
+    return {
+        "version": MANIFEST_VERSION,
+        "pattern": regex,
+        "commit": head,
+        "depth": counts[head],
+        "tags": [
+            [name, commit, counts[head] - counts[commit]] for _, name, commit in tags
+        ],
+    }
+
+
+def dumps(manifest: dict[str, Any]) -> str:
+    """Serialize a manifest with one tag per line, to keep its diffs readable."""
+    lines = [
+        f"  {json.dumps(key)}: {json.dumps(value)},"
+        for key, value in manifest.items()
+        if key != "tags"
+    ]
+    tags = ",\n".join(f"    {json.dumps(tag)}" for tag in manifest["tags"])
+    lines.append(f'  "tags": [\n{tags}\n  ]' if tags else '  "tags": []')
+    return "{\n" + "\n".join(lines) + "\n}\n"
+
+
+def _load(path: Path, regex: str) -> dict[str, Any] | None:
+    try:
+        manifest = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    if manifest.get("version") != MANIFEST_VERSION or manifest.get("pattern") != regex:
+        return None
+    return manifest
+
+
+def _new_commits(repo: Repository, head: str, base: str) -> set[str] | None:
+    """Collect the commits reachable from `head` without going through `base`.
+
+    Returns None unless every path from `head` leads to `base` within the
+    commits available, or the parents recorded by commits at the shallow boundary.
+    """
+    new: set[str] = set()
+    stack = [head]
+    while stack:
+        sha = stack.pop()
+        if sha == base or sha in new:
+            continue
+        new.add(sha)
+
+        try:
+            if sha in repo.shallow:
+                if any(parent != base for parent in repo.recorded_parents(sha)):
+                    return None
+                continue
+            parents = repo.commit(sha).parents
+        except KeyError:
+            return None
+
+        if not parents:
+            return None
+        stack.extend(parents)
+    return new
+
+
+def from_manifest(
+    config: schemas.UvDynamicVersioning, root: Path | None = None
+) -> Version | None:
+    """Determine a version in a shallow clone from the configured tag manifest.
+
+    Returns None when not in a shallow clone, or when the manifest can't be
+    used for `HEAD`, so that the version is determined from Git as usual.
+    """
+    if config.tag_manifest is None:
+        return None
+
+    with discovered(root) as repo:
+        if repo is None or not repo.shallow:
+            return None
+        _check_supported(repo.worktree, config.vcs, root)
+        return _from_manifest(repo, config, root)
+
+
+def _from_manifest(
+    repo: Repository, config: schemas.UvDynamicVersioning, root: Path | None
+) -> Version | None:
+    regex = Pattern.parse(config.pattern, config.pattern_prefix)
+    path = root / config.tag_manifest if root else Path(config.tag_manifest)
+    manifest = _load(path, regex)
+    head = repo.resolve_ref("HEAD")
+    if manifest is None or head is None or not repo.has_object(head):
+        return None
+
+    new = _new_commits(repo, head, manifest["commit"])
+    if new is None:
+        return None
+
+    # tags on commits made after the manifest, which a shallow clone may have fetched
+    order = repo.topo_order(head)
+    local = []
+    for ref, sha in repo.tags().items():
+        commit, tagger_date = repo.peel(sha)
+        if commit is None or commit not in new:
+            continue
+        date = tagger_date or repo.commit(commit).timestamp
+        local.append(((-order.get(commit, sys.maxsize), date), ref, commit))
+    local.sort(key=lambda tag: tag[0], reverse=True)
+
+    distances = {
+        ref.removeprefix("refs/tags/"): len(new - repo.ancestors(commit))
+        for _, ref, commit in local
+    }
+    for name, _, distance in manifest["tags"]:
+        distances.setdefault(name, len(new) + distance)
+
+    matched_pattern = _match_version_pattern(
+        config.pattern,
+        list(distances),
+        config.latest_tag,
+        config.highest_tag,
+        config.strict,
+        config.pattern_prefix,
+    )
+
+    full_commit = config.full_commit or config.commit_length is not None
+    commit = (head if full_commit else repo.abbreviate(head))[: config.commit_length]
+    version_files = [config.version_file.path] if config.version_file else []
+    excluded = excluded_paths(repo, version_files, root)
+    dirty = is_dirty(repo, head, config.ignore_untracked, excluded)
+    branch = repo.head_branch()
+    timestamp = repo.commit(head).timestamp
+
+    if matched_pattern is None:
+        return Version._fallback(
+            config.strict,
+            distance=len(new) + manifest["depth"],
+            commit=commit,
+            dirty=dirty,
+            branch=branch,
+            timestamp=timestamp,
+            vcs=Vcs.Git,
+        )
+
+    tag, base, stage, unmatched, tagged_metadata, epoch = matched_pattern
+    version = Version(
+        base,
+        stage=stage,
+        distance=distances[tag],
+        commit=commit,
+        dirty=dirty,
+        tagged_metadata=tagged_metadata,
+        epoch=epoch,
+        branch=branch,
+        timestamp=timestamp,
+        vcs=Vcs.Git,
+    )
+    version._matched_tag = tag
+    version._newer_unmatched_tags = unmatched
+    return version
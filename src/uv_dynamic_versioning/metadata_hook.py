@@ -6,9 +6,10 @@ from dunamai import Version
 from hatchling.metadata.plugin.interface import MetadataHookInterface
 
 from . import schemas
+from .analysis import template_fields
 from .base import BasePlugin
-from .main import get_version
-from .template import render_template
+from .registry import resolve_version
+from .template import TemplateRenderer
 
 
 class DependenciesMetadataHook(BasePlugin, MetadataHookInterface):
@@ -24,29 +25,37 @@ class DependenciesMetadataHook(BasePlugin, MetadataHookInterface):
 
     @cached_property
     def version(self) -> Version:
-        _, version = get_version(self.project_config)
+        _, version = resolve_version(
+            self.root,
+            self.project_config,
+            template_fields(self.plugin_config.templates(), self.project_config),
+        )
         return version
 
+    @cached_property
+    def renderer(self) -> TemplateRenderer:
+        context = {}
+        if self.project_config.workspace:
+            from .workspace import versions
+
+            context["workspace"] = versions(self.root)
+        return TemplateRenderer(
+            version=self.version, config=self.project_config, context=context
+        )
+
     def render_dependencies(self) -> list[str] | None:
         if self.plugin_config.dependencies is None:
             return None
 
-        return [
-            render_template(dep, version=self.version, config=self.project_config)
-            for dep in self.plugin_config.dependencies
-        ]
+        return self.renderer.render_all(self.plugin_config.dependencies)
 
     def render_optional_dependencies(self) -> dict[str, list[str]] | None:
         if self.plugin_config.optional_dependencies is None:
             return None
 
-        return {
-            name: [
-                render_template(dep, version=self.version, config=self.project_config)
-                for dep in deps
-            ]
-            for name, deps in self.plugin_config.optional_dependencies.items()
-        }
+        return self.renderer.render_mapping(
+            dict(self.plugin_config.optional_dependencies)
+        )
 
     def update(self, metadata: dict) -> None:
         # check dynamic
@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import os
+import sys
+import threading
+from collections.abc import Iterable
+from pathlib import Path
+
+from dunamai import Version
+
+from . import schemas, trace
+from .analysis import required_fields
+from .main import _get_bypassed_version, get_version, load
+
+# hatch instantiates the version source and the metadata hook separately, so share
+# what they resolve to parse `pyproject.toml` and query the VCS once per build
+_lock = threading.RLock()
+# each version is stored with the fields it was resolved with (see `get_version`)
+_versions: dict[
+    tuple[str, schemas.UvDynamicVersioning, str | None],
+    tuple[frozenset[str], tuple[str, Version]],
+] = {}
+
+
+def _normalize_root(root: str | os.PathLike) -> str:
+    return str(Path(root).resolve())
+
+
+def get_project(root: str | os.PathLike) -> schemas.Project:
+    return load(_normalize_root(root))
+
+
+def resolve_version(
+    root: str | os.PathLike,
+    config: schemas.UvDynamicVersioning,
+    fields: Iterable[str] = (),
+) -> tuple[str, Version]:
+    """Resolve the version once per build, with at least the `Version` fields given."""
+    key = (_normalize_root(root), config, _get_bypassed_version())
+    # `get_version` resolves the fields the version itself uses in any case
+    needed = frozenset(fields) | required_fields(config)
+    with _lock:
+        cached = _versions.get(key)
+        if cached is not None and needed <= cached[0]:
+            trace.record("cache-hit", cache="registry")
+            return cached[1]
+
+        if cached is not None:
+            # keep what earlier callers needed, in case they resolve again
+            needed |= cached[0]
+        resolved = None
+        if config.workspace:
+            from . import workspace
+
+            # the members' builds share one pass over the workspace
+            resolved = workspace.member_version(key[0], config, needed)
+        if resolved is None:
+            resolved = get_version(
+                config, root=Path(key[0]), daemon=True, fields=needed
+            )
+        _versions[key] = (needed, resolved)
+        return resolved
+
+
+def invalidate(root: str | os.PathLike | None = None) -> None:
+    """Forget resolved versions, for `root` only if given."""
+    with _lock:
+        if root is None:
+            _versions.clear()
+            if "uv_dynamic_versioning.workspace" in sys.modules:
+                sys.modules["uv_dynamic_versioning.workspace"].invalidate()
+            return
+
+        key = _normalize_root(root)
+        for version_key in [k for k in _versions if k[0] == key]:
+            del _versions[version_key]
@@ -1,18 +1,28 @@
 from __future__ import annotations
 
+import dataclasses
+import functools
+from collections.abc import Callable, Mapping
 from dataclasses import dataclass, is_dataclass
-from functools import cached_property
-from typing import Any
+from enum import Enum
+from typing import Any, NamedTuple
 
 from dunamai import Style, Vcs
 
+_NONE = type(None)
+
+
+@functools.cache
+def _field_names(cls) -> frozenset[str]:
+    return frozenset(f.name for f in dataclasses.fields(cls))
+
 
 def _normalize(cls, data: dict[str, Any]):
     """Filter dict keys to match dataclass fields and handle kebab-case to snake_case conversion with validation."""
     if not is_dataclass(cls):
         raise TypeError(f"{cls.__name__} is not a dataclass")
 
-    fields = {f.name: f.type for f in cls.__dataclass_fields__.values()}
+    fields = _field_names(cls)
     result = {}
     for k, v in data.items():
         key = k.replace("-", "_")
@@ -22,23 +32,70 @@ def _normalize(cls, data: dict[str, Any]):
     return result
 
 
-@dataclass
+class _Rule(NamedTuple):
+    """How to validate a field: the types it accepts as is, and how to convert others.
+
+    `convert` returns the converted value or raises ValueError with `error`.
+    """
+
+    types: tuple[type, ...]
+    error: str
+    convert: Callable[[Any, str], Any] | None = None
+
+
+def _validate(instance: Any, rules: Mapping[str, _Rule]) -> None:
+    """Check every field of a frozen dataclass in one pass, converting where needed."""
+    for name, (types, error, convert) in rules.items():
+        value = getattr(instance, name)
+        if isinstance(value, types):
+            continue
+        if convert is None:
+            raise ValueError(error.format(value=value))
+        object.__setattr__(instance, name, convert(value, error))
+
+
+def _enum(cls: type[Enum]) -> Callable[[Any, str], Any]:
+    def convert(value: Any, error: str) -> Any:
+        try:
+            return cls(value)
+        except ValueError:
+            raise ValueError(error.format(value=value)) from None
+
+    return convert
+
+
+def _nested(cls: type) -> Callable[[Any, str], Any]:
+    def convert(value: Any, error: str) -> Any:
+        if not isinstance(value, dict):
+            raise ValueError(error.format(value=value))
+        return cls.from_dict(value)
+
+    return convert
+
+
+def _strings(value: Any, error: str) -> tuple[str, ...]:
+    # lists become tuples, which keeps the configuration hashable
+    if not isinstance(value, (list, tuple)) or not all(
+        isinstance(item, str) for item in value
+    ):
+        raise ValueError(error.format(value=value))
+    return tuple(value)
+
+
+class GitBackend(Enum):
+    Cli = "cli"
+    CliConcurrent = "cli-concurrent"
+    Python = "python"
+
+
+@dataclass(frozen=True, slots=True)
 class BumpConfig:
     enable: bool = False
     index: int = -1
 
-    def _validate_enable(self):
-        if not isinstance(self.enable, bool):
-            raise ValueError("bump-config: enable must be a boolean")
-
-    def _validate_index(self):
-        if not isinstance(self.index, int):
-            raise ValueError("bump-config: index must be an integer")
-
     def __post_init__(self):
         """Validate the bump configuration."""
-        self._validate_enable()
-        self._validate_index()
+        _validate(self, _BUMP_CONFIG_RULES)
 
     @classmethod
     def from_dict(cls, data: dict) -> BumpConfig:
@@ -47,22 +104,25 @@ class BumpConfig:
         return cls(**validated_data)
 
 
-@dataclass
-class FromFile:
-    source: str
-    pattern: str | None = None
+_BUMP_CONFIG_RULES = {
+    "enable": _Rule((bool,), "bump-config: enable must be a boolean"),
+    "index": _Rule((int,), "bump-config: index must be an integer"),
+}
 
-    def _validate_source(self):
-        if not isinstance(self.source, str):
-            raise ValueError("source must be a string")
 
-    def _validate_pattern(self):
-        if self.pattern is not None and not isinstance(self.pattern, str):
-            raise ValueError("pattern must be a string or None")
+@dataclass(frozen=True, slots=True)
+class FromFile:
+    source: str | tuple[str, ...]
+    pattern: str | None = None
 
     def __post_init__(self):
-        self._validate_source()
-        self._validate_pattern()
+        _validate(self, _FROM_FILE_RULES)
+        if not self.sources:
+            raise ValueError("source must be a non-empty list of strings")
+
+    @property
+    def sources(self) -> list[str]:
+        return [self.source] if isinstance(self.source, str) else list(self.source)
 
     @classmethod
     def from_dict(cls, data: dict) -> FromFile:
@@ -71,22 +131,41 @@ class FromFile:
         return cls(**validated_data)
 
 
-@dataclass
+_FROM_FILE_RULES = {
+    # tuples are converted too, to check their items
+    "source": _Rule((str,), "source must be a string or a list of strings", _strings),
+    "pattern": _Rule((str, _NONE), "pattern must be a string or None"),
+}
+
+
+@dataclass(frozen=True, slots=True)
+class VersionFile:
+    path: str
+    template: str | None = None
+
+    def __post_init__(self):
+        _validate(self, _VERSION_FILE_RULES)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> VersionFile:
+        """Create VersionFile from dictionary with validation."""
+        validated_data = _normalize(cls, data)
+        return cls(**validated_data)
+
+
+_VERSION_FILE_RULES = {
+    "path": _Rule((str,), "version-file: path must be a string"),
+    "template": _Rule((str, _NONE), "version-file: template must be a string or None"),
+}
+
+
+@dataclass(frozen=True, slots=True)
 class FormatJinjaImport:
     module: str
     item: str | None = None
 
-    def _validate_module(self):
-        if not isinstance(self.module, str):
-            raise ValueError("module must be a string")
-
-    def _validate_item(self):
-        if self.item is not None and not isinstance(self.item, str):
-            raise ValueError("item must be a string or None")
-
     def __post_init__(self):
-        self._validate_module()
-        self._validate_item()
+        _validate(self, _FORMAT_JINJA_IMPORT_RULES)
 
     @classmethod
     def from_dict(cls, data: dict) -> FormatJinjaImport:
@@ -94,7 +173,49 @@ class FormatJinjaImport:
         return cls(**validated_data)
 
 
-@dataclass
+_FORMAT_JINJA_IMPORT_RULES = {
+    "module": _Rule((str,), "module must be a string"),
+    "item": _Rule((str, _NONE), "item must be a string or None"),
+}
+
+
+def _format_jinja_imports(value: Any, error: str) -> tuple[FormatJinjaImport, ...]:
+    if not isinstance(value, (list, tuple)):
+        raise ValueError(error)
+
+    imports = tuple(
+        FormatJinjaImport.from_dict(item) if isinstance(item, dict) else item
+        for item in value
+    )
+    if not all(isinstance(item, FormatJinjaImport) for item in imports):
+        raise ValueError(
+            "format-jinja-imports must contain only FormatJinjaImport instances"
+        )
+    return imports
+
+
+def _templates(value: Any, error: str) -> tuple[tuple[str, str], ...]:
+    # a table becomes (name, template) pairs, which keeps the configuration hashable
+    if isinstance(value, dict):
+        value = tuple(value.items())
+    if not isinstance(value, (list, tuple)) or not all(
+        isinstance(item, tuple)
+        and len(item) == 2
+        and all(isinstance(part, str) for part in item)
+        for item in value
+    ):
+        raise ValueError(error)
+    return tuple(value)
+
+
+def _seconds(value: Any, error: str) -> float:
+    # booleans are integers too, but `true` can't mean a number of seconds
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or value <= 0:
+        raise ValueError(error)
+    return value
+
+
+@dataclass(frozen=True, slots=True)
 class UvDynamicVersioning:
     vcs: Vcs = Vcs.Any
     metadata: bool | None = None
@@ -104,7 +225,7 @@ class UvDynamicVersioning:
     pattern_prefix: str | None = None
     format: str | None = None
     format_jinja: str | None = None
-    format_jinja_imports: list[FormatJinjaImport] | None = None
+    format_jinja_imports: tuple[FormatJinjaImport, ...] | None = None
     style: Style | None = None
     latest_tag: bool = False
     strict: bool = False
@@ -119,136 +240,20 @@ class UvDynamicVersioning:
     fallback_version: str | None = None
     from_file: FromFile | None = None
     highest_tag: bool = False
-
-    def _validate_vcs(self):
-        if not isinstance(self.vcs, Vcs):
-            raise ValueError(f"vcs is invalid - {self.vcs}")
-
-    def _validate_metadata(self):
-        if self.metadata is not None and not isinstance(self.metadata, bool):
-            raise ValueError("metadata must be a boolean or None")
-
-    def _validate_tagged_metadata(self):
-        if not isinstance(self.tagged_metadata, bool):
-            raise ValueError("tagged-metadata must be a boolean")
-
-    def _validate_dirty(self):
-        if not isinstance(self.dirty, bool):
-            raise ValueError("dirty must be a boolean")
-
-    def _validate_latest_tag(self):
-        if not isinstance(self.latest_tag, bool):
-            raise ValueError("latest-tag must be a boolean")
-
-    def _validate_strict(self):
-        if not isinstance(self.strict, bool):
-            raise ValueError("strict must be a boolean")
-
-    def _validate_full_commit(self):
-        if not isinstance(self.full_commit, bool):
-            raise ValueError("full-commit must be a boolean")
-
-    def _validate_ignore_untracked(self):
-        if not isinstance(self.ignore_untracked, bool):
-            raise ValueError("ignore-untracked must be a boolean")
-
-    def _validate_pattern(self):
-        if self.pattern is not None and not isinstance(self.pattern, str):
-            raise ValueError("pattern must be a string")
-
-    def _validate_pattern_prefix(self):
-        if self.pattern_prefix is not None and not isinstance(self.pattern_prefix, str):
-            raise ValueError("pattern-prefix must be a string or None")
-
-    def _validate_format(self):
-        if self.format is not None and not isinstance(self.format, str):
-            raise ValueError("format must be a string or None")
-
-    def _validate_format_jinja(self):
-        if self.format_jinja is not None and not isinstance(self.format_jinja, str):
-            raise ValueError("format-jinja must be a string or None")
-
-    def _validate_format_jinja_imports(self):
-        if self.format_jinja_imports is not None:
-            if not isinstance(self.format_jinja_imports, list):
-                raise ValueError("format-jinja-imports must be a list or None")
-
-            for item in self.format_jinja_imports:
-                if not isinstance(item, FormatJinjaImport):
-                    raise ValueError(
-                        "format-jinja-imports must contain only FormatJinjaImport instances"
-                    )
-
-    def _validate_style(self):
-        if self.style is not None and not isinstance(self.style, Style):
-            raise ValueError(f"style is invalid - {self.style}")
-
-    def _validate_tag_dir(self):
-        if self.tag_dir is not None and not isinstance(self.tag_dir, str):
-            raise ValueError("tag-dir must be a string")
-
-    def _validate_tag_branch(self):
-        if self.tag_branch is not None and not isinstance(self.tag_branch, str):
-            raise ValueError("tag-branch must be a string or None")
-
-    def _validate_commit_length(self):
-        if self.commit_length is not None and not isinstance(self.commit_length, int):
-            raise ValueError("commit-length must be an integer or None")
-
-    def _validate_commit_prefix(self):
-        if self.commit_prefix is not None and not isinstance(self.commit_prefix, str):
-            raise ValueError("commit-prefix must be a string or None")
-
-    def _validate_escape_with(self):
-        if self.escape_with is not None and not isinstance(self.escape_with, str):
-            raise ValueError("escape-with must be a string or None")
-
-    def _validate_bump(self):
-        if isinstance(self.bump, bool) and self.bump:
-            self.bump = BumpConfig(enable=True)
-
-        if isinstance(self.bump, dict):
-            self.bump = BumpConfig.from_dict(self.bump)
-
-        if not isinstance(self.bump, (bool, BumpConfig)):
-            raise ValueError("bump must be a boolean or BumpConfig instance")
-
-    def _validate_fallback_version(self):
-        if self.fallback_version is not None and not isinstance(
-            self.fallback_version, str
-        ):
-            raise ValueError("fallback-version must be a string or None")
-
-    def _validate_highest_tag(self):
-        if not isinstance(self.highest_tag, bool):
-            raise ValueError("highest-tag must be a boolean")
+    cache: bool = False
+    git_backend: GitBackend = GitBackend.Cli
+    tag_index: bool = False
+    tag_manifest: str | None = None
+    version_file: VersionFile | None = None
+    templates: tuple[tuple[str, str], ...] | None = None
+    vcs_timeout: float | None = None
+    workspace: bool = False
 
     def __post_init__(self):
         """Validate the UvDynamicVersioning configuration."""
-        self._validate_vcs()
-        self._validate_metadata()
-        self._validate_tagged_metadata()
-        self._validate_dirty()
-        self._validate_latest_tag()
-        self._validate_strict()
-        self._validate_full_commit()
-        self._validate_ignore_untracked()
-        self._validate_pattern()
-        self._validate_pattern_prefix()
-        self._validate_format()
-        self._validate_format_jinja()
-        self._validate_format_jinja_imports()
-        self._validate_style()
-        self._validate_tag_dir()
-        self._validate_tag_branch()
-        self._validate_commit_length()
-        self._validate_bump()
-        self._validate_fallback_version()
-        self._validate_commit_prefix()
-        self._validate_escape_with()
-        self._validate_highest_tag()
-
-    @cached_property
+        _validate(self, _UV_DYNAMIC_VERSIONING_RULES)
+
+    @property
     def bump_config(self) -> BumpConfig:
         if self.bump is False:
             return BumpConfig()
@@ -258,131 +263,201 @@ class UvDynamicVersioning:
 
         return self.bump
 
+    def fingerprint(self) -> str:
+        """Return a hash of the configuration's content, stable across processes."""
+        return _fingerprint(self)
+
     @classmethod
     def from_dict(cls, data: dict) -> UvDynamicVersioning:
         """Create UvDynamicVersioning from dictionary with validation."""
         validated_data = _normalize(cls, data)
-
-        # Special handling for enum fields
-        if "vcs" in validated_data and isinstance(validated_data["vcs"], str):
-            validated_data["vcs"] = Vcs(validated_data["vcs"])
-
-        if "style" in validated_data and isinstance(validated_data["style"], str):
-            validated_data["style"] = Style(validated_data["style"])
-
-        # Special handling for bump field
-        if "bump" in validated_data and isinstance(validated_data["bump"], dict):
-            validated_data["bump"] = BumpConfig.from_dict(validated_data["bump"])
-
-        if "from_file" in validated_data and isinstance(
-            validated_data["from_file"], dict
-        ):
-            validated_data["from_file"] = FromFile.from_dict(
-                validated_data["from_file"]
-            )
-
-        if "format_jinja_imports" in validated_data and isinstance(
-            validated_data["format_jinja_imports"], list
-        ):
-            validated_data["format_jinja_imports"] = [
-                FormatJinjaImport.from_dict(item)
-                for item in validated_data["format_jinja_imports"]
-                if isinstance(item, dict)
-            ]
-
         return cls(**validated_data)
 
 
-@dataclass
+_UV_DYNAMIC_VERSIONING_RULES = {
+    "vcs": _Rule((Vcs,), "vcs is invalid - {value}", _enum(Vcs)),
+    "metadata": _Rule((bool, _NONE), "metadata must be a boolean or None"),
+    "tagged_metadata": _Rule((bool,), "tagged-metadata must be a boolean"),
+    "dirty": _Rule((bool,), "dirty must be a boolean"),
+    "pattern": _Rule((str, _NONE), "pattern must be a string"),
+    "pattern_prefix": _Rule((str, _NONE), "pattern-prefix must be a string or None"),
+    "format": _Rule((str, _NONE), "format must be a string or None"),
+    "format_jinja": _Rule((str, _NONE), "format-jinja must be a string or None"),
+    "format_jinja_imports": _Rule(
+        (_NONE,), "format-jinja-imports must be a list or None", _format_jinja_imports
+    ),
+    "style": _Rule(
+        (Style, _NONE),
+        "style is invalid - {value}",
+        _enum(Style),
+    ),
+    "latest_tag": _Rule((bool,), "latest-tag must be a boolean"),
+    "strict": _Rule((bool,), "strict must be a boolean"),
+    "tag_dir": _Rule((str, _NONE), "tag-dir must be a string"),
+    "tag_branch": _Rule((str, _NONE), "tag-branch must be a string or None"),
+    "full_commit": _Rule((bool,), "full-commit must be a boolean"),
+    "ignore_untracked": _Rule((bool,), "ignore-untracked must be a boolean"),
+    "commit_length": _Rule((int, _NONE), "commit-length must be an integer or None"),
+    "commit_prefix": _Rule((str, _NONE), "commit-prefix must be a string or None"),
+    "escape_with": _Rule((str, _NONE), "escape-with must be a string or None"),
+    "bump": _Rule(
+        (bool, BumpConfig),
+        "bump must be a boolean or BumpConfig instance",
+        _nested(BumpConfig),
+    ),
+    "fallback_version": _Rule(
+        (str, _NONE), "fallback-version must be a string or None"
+    ),
+    "from_file": _Rule(
+        (FromFile, _NONE),
+        "from-file must be a FromFile instance or None",
+        _nested(FromFile),
+    ),
+    "highest_tag": _Rule((bool,), "highest-tag must be a boolean"),
+    "cache": _Rule((bool,), "cache must be a boolean"),
+    "git_backend": _Rule(
+        (GitBackend,),
+        "git-backend is invalid - {value}",
+        _enum(GitBackend),
+    ),
+    "tag_index": _Rule((bool,), "tag-index must be a boolean"),
+    "tag_manifest": _Rule((str, _NONE), "tag-manifest must be a string"),
+    "version_file": _Rule(
+        (VersionFile, _NONE),
+        "version-file must be a VersionFile instance or None",
+        _nested(VersionFile),
+    ),
+    "templates": _Rule(
+        (_NONE,), "templates must be a table of strings or None", _templates
+    ),
+    "vcs_timeout": _Rule(
+        (_NONE,), "vcs-timeout must be a positive number of seconds or None", _seconds
+    ),
+    "workspace": _Rule((bool,), "workspace must be a boolean"),
+}
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, Enum):
+        return value.value
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+@functools.lru_cache(maxsize=64)
+def _fingerprint(config: UvDynamicVersioning) -> str:
+    # imported here since only caching layers need them
+    import hashlib
+    import json
+
+    data = json.dumps(dataclasses.asdict(config), sort_keys=True, default=_json_default)
+    return hashlib.sha256(data.encode()).hexdigest()
+
+
+@dataclass(frozen=True, slots=True)
 class Tool:
     uv_dynamic_versioning: UvDynamicVersioning | None = None
 
     def __post_init__(self):
         """Validate the Tool configuration."""
-        if self.uv_dynamic_versioning is not None and not isinstance(
-            self.uv_dynamic_versioning, UvDynamicVersioning
-        ):
-            raise ValueError(
-                "uv-dynamic-versioning must be an instance of UvDynamicVersioning"
-            )
+        _validate(self, _TOOL_RULES)
 
     @classmethod
     def from_dict(cls, data: dict) -> Tool:
         """Create Tool from dictionary with validation."""
         validated_data = _normalize(cls, data)
+        return cls(**validated_data)
 
-        if "uv_dynamic_versioning" in validated_data and isinstance(
-            validated_data["uv_dynamic_versioning"], dict
-        ):
-            validated_data["uv_dynamic_versioning"] = UvDynamicVersioning.from_dict(
-                validated_data["uv_dynamic_versioning"]
-            )
 
-        return cls(**validated_data)
+_TOOL_RULES = {
+    "uv_dynamic_versioning": _Rule(
+        (UvDynamicVersioning, _NONE),
+        "uv-dynamic-versioning must be an instance of UvDynamicVersioning",
+        _nested(UvDynamicVersioning),
+    ),
+}
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class Project:
     tool: Tool
 
-    def _validate_tool(self):
-        if not isinstance(self.tool, Tool):
-            raise ValueError("tool must be an instance of Tool")
-
     def __post_init__(self):
         """Validate the Project configuration."""
-        self._validate_tool()
+        _validate(self, _PROJECT_RULES)
 
     @classmethod
     def from_dict(cls, data: dict) -> Project:
         """Create Project from dictionary with validation."""
         validated_data = _normalize(cls, data)
-
-        if "tool" in validated_data and isinstance(validated_data["tool"], dict):
-            validated_data["tool"] = Tool.from_dict(validated_data["tool"])
-        elif "tool" not in validated_data:
+        if "tool" not in validated_data:
             raise ValueError("project must have a 'tool' field")
 
         return cls(**validated_data)
 
 
-@dataclass
-class MetadataHookConfig:
-    dependencies: list[str] | None = None
-    optional_dependencies: dict[str, list[str]] | None = None
+_PROJECT_RULES = {
+    "tool": _Rule((Tool,), "tool must be an instance of Tool", _nested(Tool)),
+}
 
-    def _validate_dependencies(self):
-        if self.dependencies is not None and not isinstance(self.dependencies, list):
-            raise ValueError("dependencies must be a list or None")
 
-        for v in self.dependencies or []:
-            if not isinstance(v, str):
-                raise ValueError("dependencies must be strings")
+def _optional_dependencies(
+    value: Any, error: str
+) -> tuple[tuple[str, tuple[str, ...]], ...]:
+    # a table becomes (extra, dependencies) pairs, which keeps the config hashable
+    if isinstance(value, dict):
+        value = tuple(value.items())
+    if not isinstance(value, tuple) or not all(
+        isinstance(item, tuple) and len(item) == 2 for item in value
+    ):
+        raise ValueError(error)
 
-    def _validate_optional_dependencies(self):
-        if self.optional_dependencies is None:
-            return
+    for key, dependencies in value:
+        if not isinstance(key, str):
+            raise ValueError("optional-dependency keys must be strings")
+        if not isinstance(dependencies, (list, tuple)):
+            raise ValueError("optional-dependency values must be lists of strings")
+        if not all(isinstance(v, str) for v in dependencies):
+            raise ValueError("optional-dependencies must be strings")
+    return tuple((key, tuple(dependencies)) for key, dependencies in value)
 
-        if not isinstance(self.optional_dependencies, dict):
-            raise ValueError("optional-dependencies must be a dict or None")
 
-        for key, value in self.optional_dependencies.items():
-            if not isinstance(key, str):
-                raise ValueError("optional-dependency keys must be strings")
-            if not isinstance(value, list):
-                raise ValueError("optional-dependency values must be lists of strings")
+def _dependencies(value: Any, error: str) -> tuple[str, ...]:
+    if not isinstance(value, (list, tuple)):
+        raise ValueError(error)
+    if not all(isinstance(v, str) for v in value):
+        raise ValueError("dependencies must be strings")
+    return tuple(value)
 
-            for v in value:
-                if not isinstance(v, str):
-                    raise ValueError("optional-dependencies must be strings")
+
+@dataclass(frozen=True, slots=True)
+class MetadataHookConfig:
+    dependencies: tuple[str, ...] | None = None
+    optional_dependencies: tuple[tuple[str, tuple[str, ...]], ...] | None = None
 
     def __post_init__(self):
         """Validate the MetadataHookConfig configuration."""
-        self._validate_dependencies()
-        self._validate_optional_dependencies()
+        _validate(self, _METADATA_HOOK_CONFIG_RULES)
 
     @classmethod
     def from_dict(cls, data: dict) -> MetadataHookConfig:
         """Create MetadataHookConfig from dictionary with validation."""
         validated_data = _normalize(cls, data)
         return cls(**validated_data)
+
+    def templates(self) -> list[str]:
+        """Return every template, of the dependencies and the optional ones."""
+        templates = list(self.dependencies or [])
+        for _, values in self.optional_dependencies or ():
+            templates += values
+        return templates
+
+
+_METADATA_HOOK_CONFIG_RULES = {
+    # lists and tables become tuples, which keeps the configuration hashable
+    "dependencies": _Rule(
+        (_NONE,), "dependencies must be a list or None", _dependencies
+    ),
+    "optional_dependencies": _Rule(
+        (_NONE,), "optional-dependencies must be a dict or None", _optional_dependencies
+    ),
+}
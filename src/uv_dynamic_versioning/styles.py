@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+from collections.abc import Iterable, Iterator, Mapping
+from dataclasses import dataclass
+from typing import Any
+
+from dunamai import Style
+
+from .main import conforms_to_style
+from .tagindex import pep440_key
+
+
+@dataclass(frozen=True, slots=True)
+class CheckedVersion:
+    version: str
+    # whether it's valid for each of the styles checked
+    styles: Mapping[Style, bool]
+    # PEP 440 order, or None if it isn't a PEP 440 version
+    key: list[Any] | None
+
+
+def _key(version: str, pep440: bool | None = None) -> list[Any] | None:
+    # `packaging` also accepts what PEP 440 only normalizes, e.g. `v1.0` or
+    # surrounding whitespace, which `Style.Pep440` rejects
+    if pep440 is None:
+        pep440 = conforms_to_style(version, Style.Pep440)
+    if not pep440:
+        return None
+
+    from packaging.version import InvalidVersion, Version
+
+    # and Dunamai's pattern accepts some that `packaging` rejects, e.g. `1.0+a..b`
+    try:
+        return pep440_key(Version(version))
+    except InvalidVersion:
+        return None
+
+
+def check_versions(
+    versions: Iterable[str], styles: Iterable[Style] = tuple(Style)
+) -> Iterator[CheckedVersion]:
+    """Check each version against `styles`, and compute the key to sort it by.
+
+    Versions are consumed and yielded one at a time, so any number of them can be
+    checked in bounded memory. Keys are comparable with each other, but not with None.
+    """
+    styles = tuple(styles)
+    for version in versions:
+        checked = {style: conforms_to_style(version, style) for style in styles}
+        yield CheckedVersion(version, checked, _key(version, checked.get(Style.Pep440)))
+
+
+def sort_versions(versions: Iterable[str], reverse: bool = False) -> list[str]:
+    """Sort versions in PEP 440 order, with those that aren't PEP 440 versions last."""
+    keyed, unparsed = [], []
+    for version in versions:
+        key = _key(version)
+        if key is None:
+            unparsed.append(version)
+        else:
+            keyed.append((key, version))
+
+    keyed.sort(key=lambda item: item[0], reverse=reverse)
+    return [version for _, version in keyed] + unparsed
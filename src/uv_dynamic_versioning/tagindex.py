@@ -0,0 +1,236 @@
+from __future__ import annotations
+
+import contextlib
+import hashlib
+import json
+import os
+import re
+import tempfile
+from collections.abc import Iterable
+from datetime import datetime
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from dunamai import Pattern, Version
+
+from .cache import _cache_dir_from_env
+from .gitreader import Repository, common_dir
+
+if TYPE_CHECKING:
+    from packaging.version import Version as PackagingVersion
+
+# bump when the layout of the index (or of its sort keys) changes
+INDEX_VERSION = 1
+
+_MINUS, _VALUE, _PLUS = 0, 1, 2
+
+
+def _release_key(release: tuple[int, ...]) -> list[int]:
+    key = list(release)
+    while key and key[-1] == 0:
+        key.pop()
+    return key
+
+
+def _local_key(local: str | None) -> list[Any]:
+    if local is None:
+        return [_MINUS]
+    return [
+        _VALUE,
+        *(
+            [_VALUE, int(p), ""] if p.isdigit() else [_MINUS, 0, p]
+            for p in local.split(".")
+        ),
+    ]
+
+
+def pep440_key(parsed: PackagingVersion) -> list[Any]:
+    """Encode how PEP 440 orders a version, as a JSON serializable list."""
+    # mirrors `packaging.version._cmpkey` with +/- infinity spelled as _PLUS/_MINUS
+    if parsed.pre is None and parsed.post is None and parsed.dev is not None:
+        pre: list[Any] = [_MINUS]
+    elif parsed.pre is None:
+        pre = [_PLUS]
+    else:
+        pre = [_VALUE, *parsed.pre]
+
+    return [
+        parsed.epoch,
+        _release_key(parsed.release),
+        pre,
+        [_MINUS] if parsed.post is None else [_VALUE, parsed.post],
+        [_PLUS] if parsed.dev is None else [_VALUE, parsed.dev],
+        _local_key(parsed.local),
+    ]
+
+
+def sort_key(version: Version) -> list[Any] | None:
+    """Encode how `Version.__lt__` orders a parsed tag, as a JSON serializable list.
+
+    Returns None when it isn't a valid PEP 440 version, since Dunamai then
+    compares versions in a way that isn't a total order.
+    """
+    import packaging.version as pv
+
+    try:
+        parsed = pv.Version(version.serialize(metadata=False))
+    except Exception:
+        return None
+
+    return [
+        *pep440_key(parsed),
+        # then the fields `Version.__lt__` compares after the PEP 440 version
+        version.distance or 0,
+        version.commit or "",
+        bool(version.dirty),
+        version.tagged_metadata or "",
+        version.branch or "",
+        version.timestamp.isoformat() if version.timestamp else "",
+    ]
+
+
+class TagEntry:
+    """What the index knows about one tag ref."""
+
+    __slots__ = ("commit", "date", "identity", "key", "matched", "sha")
+
+    def __init__(
+        self,
+        sha: str,
+        commit: str | None,
+        date: datetime | None,
+        matched: bool,
+        key: list[Any] | None,
+        identity: str | None,
+    ):
+        self.sha = sha
+        self.commit = commit
+        self.date = date
+        self.matched = matched
+        self.key = key
+        self.identity = identity
+
+    def dump(self) -> list[Any]:
+        date = self.date.isoformat() if self.date else None
+        return [self.sha, self.commit, date, self.matched, self.key, self.identity]
+
+    @classmethod
+    def load(cls, data: list[Any]) -> TagEntry:
+        sha, commit, date, matched, key, identity = data
+        return cls(
+            sha,
+            commit,
+            datetime.fromisoformat(date) if date else None,
+            matched,
+            key,
+            identity,
+        )
+
+
+class TagIndex:
+    """Parsed tags of a repository for one pattern, kept in sync with its tag refs.
+
+    Only refs added or changed since the last update are peeled and parsed.
+    """
+
+    def __init__(self, path: Path, pattern: str):
+        self.path = path
+        self.pattern = pattern
+
+    @classmethod
+    def open(
+        cls,
+        repo: Repository,
+        pattern: str | Pattern = Pattern.Default,
+        pattern_prefix: str | None = None,
+    ) -> TagIndex:
+        regex = Pattern.parse(pattern, pattern_prefix)
+        digest = hashlib.sha256(regex.encode()).hexdigest()[:16]
+        directory = _cache_dir_from_env() or (
+            common_dir(repo.git_dir) / "uv-dynamic-versioning"
+        )
+        return cls(directory / f"tags-{digest}.json", regex)
+
+    def _load(self) -> dict[str, TagEntry]:
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+            if data["version"] != INDEX_VERSION or data["pattern"] != self.pattern:
+                return {}
+            return {ref: TagEntry.load(entry) for ref, entry in data["tags"].items()}
+        except (OSError, ValueError, KeyError, TypeError):
+            return {}
+
+    def _save(self, entries: dict[str, TagEntry]) -> None:
+        data = {
+            "version": INDEX_VERSION,
+            "pattern": self.pattern,
+            "tags": {ref: entry.dump() for ref, entry in entries.items()},
+        }
+        # the index is an optimization, so failing to write it must not fail a build
+        with contextlib.suppress(OSError):
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with tempfile.NamedTemporaryFile(
+                "w", encoding="utf-8", dir=self.path.parent, delete=False
+            ) as f:
+                json.dump(data, f, separators=(",", ":"))
+            os.replace(f.name, self.path)
+
+    def _index(self, repo: Repository, ref: str, sha: str) -> TagEntry:
+        commit, tagger_date = repo.peel(sha)
+        name = ref.removeprefix("refs/tags/")
+        if re.search(self.pattern, name) is None:
+            return TagEntry(sha, commit, tagger_date, False, None, None)
+
+        try:
+            parsed = Version.parse(name, self.pattern)
+        except Exception:
+            return TagEntry(sha, commit, tagger_date, True, None, None)
+        return TagEntry(sha, commit, tagger_date, True, sort_key(parsed), repr(parsed))
+
+    def update(self, repo: Repository) -> dict[str, TagEntry]:
+        """Bring the index up to date with the tags of `repo` and return its entries."""
+        tags = repo.tags()
+        entries = self._load()
+        changed = False
+
+        for ref in entries.keys() - tags.keys():
+            del entries[ref]
+            changed = True
+
+        for ref, sha in tags.items():
+            entry = entries.get(ref)
+            if entry is None or entry.sha != sha:
+                entries[ref] = self._index(repo, ref, sha)
+                changed = True
+
+        if changed:
+            self._save(dict(sorted(entries.items())))
+        return entries
+
+
+def highest(entries: dict[str, TagEntry], refs: Iterable[str]) -> list[str] | None:
+    """Return the refs among `refs` ranking highest, or None if they can't be ranked."""
+    best: list[Any] | None = None
+    group: list[str] = []
+    for ref in refs:
+        entry = entries[ref]
+        if not entry.matched:
+            continue
+        if entry.key is None:
+            return None
+        if best is None or entry.key > best:
+            best, group = entry.key, [ref]
+        elif entry.key == best:
+            group.append(ref)
+    return group
+
+
+def select(entries: dict[str, TagEntry], group: list[str]) -> str:
+    """Pick from equally ranked refs, given newest first, the one Dunamai picks."""
+    # `Version.__gt__` is true for equally ranked versions that aren't equal,
+    # so a later tag replaces the selection unless it parses identically
+    selected = group[0]
+    for ref in group[1:]:
+        if entries[ref].identity != entries[selected].identity:
+            selected = ref
+    return selected
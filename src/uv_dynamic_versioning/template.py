@@ -3,8 +3,11 @@ from __future__ import annotations
 import contextlib
 import os
 import re
+from collections.abc import Iterable, Mapping
 from datetime import datetime
+from functools import cached_property, lru_cache
 from importlib import import_module
+from typing import Any
 
 import jinja2
 from dunamai import (
@@ -17,6 +20,22 @@ from dunamai import (
 
 from . import schemas
 
+TEMPLATE_CACHE_SIZE = 512
+
+# `jinja2.Template(...)` lexes, parses and compiles its source on every call,
+# so compile each distinct template once with one shared environment instead
+_environment = jinja2.Environment()
+
+
+@lru_cache(maxsize=TEMPLATE_CACHE_SIZE)
+def compile_template(template: str) -> jinja2.Template:
+    return _environment.from_string(template)
+
+
+def template_cache_info() -> Any:
+    """Return the hit/miss counters of the compiled template cache."""
+    return compile_template.cache_info()
+
 
 def base_part(base: str, index: int) -> int:
     parts = base.split(".")
@@ -42,38 +61,74 @@ def _format_timestamp(value: datetime | None) -> str | None:
     return value.strftime("%Y%m%d%H%M%S")
 
 
+class TemplateRenderer:
+    """Render templates against one version, building the context only once."""
+
+    def __init__(
+        self,
+        *,
+        version: Version,
+        config: schemas.UvDynamicVersioning,
+        context: Mapping[str, Any] | None = None,
+    ):
+        self.version = version
+        self.config = config
+        # variables added by the caller, e.g. the metadata hook's `workspace`
+        self.context = dict(context or {})
+
+    @cached_property
+    def default_context(self) -> dict[str, Any]:
+        version = self.version
+        return {
+            "version": version,
+            "base": version.base,
+            "stage": version.stage,
+            "revision": version.revision,
+            "distance": version.distance,
+            "commit": version.commit,
+            "dirty": version.dirty,
+            "branch": version.branch,
+            "tagged_metadata": version.tagged_metadata,
+            "branch_escaped": _escape_branch(version.branch, self.config.escape_with),
+            "timestamp": _format_timestamp(version.timestamp),
+            "major": base_part(version.base, 0),
+            "minor": base_part(version.base, 1),
+            "patch": base_part(version.base, 2),
+            "env": os.environ,
+            "bump_version": bump_version,
+            "serialize_pep440": serialize_pep440,
+            "serialize_pvp": serialize_pvp,
+            "serialize_semver": serialize_semver,
+            **self.context,
+        }
+
+    @cached_property
+    def custom_context(self) -> dict[str, Any]:
+        custom_context = {}
+        if self.config.format_jinja_imports:
+            for entry in self.config.format_jinja_imports:
+                module = import_module(entry.module)
+                if entry.item is not None:
+                    custom_context[entry.item] = getattr(module, entry.item)
+                else:
+                    custom_context[entry.module] = module
+        return custom_context
+
+    def render(self, template: str) -> str:
+        return compile_template(template).render(
+            **self.default_context, **self.custom_context
+        )
+
+    def render_all(self, templates: Iterable[str]) -> list[str]:
+        return [self.render(template) for template in templates]
+
+    def render_mapping(
+        self, templates: Mapping[str, Iterable[str]]
+    ) -> dict[str, list[str]]:
+        return {name: self.render_all(values) for name, values in templates.items()}
+
+
 def render_template(
     template: str, *, version: Version, config: schemas.UvDynamicVersioning
 ) -> str:
-    default_context = {
-        "version": version,
-        "base": version.base,
-        "stage": version.stage,
-        "revision": version.revision,
-        "distance": version.distance,
-        "commit": version.commit,
-        "dirty": version.dirty,
-        "branch": version.branch,
-        "tagged_metadata": version.tagged_metadata,
-        "branch_escaped": _escape_branch(version.branch, config.escape_with),
-        "timestamp": _format_timestamp(version.timestamp),
-        "major": base_part(version.base, 0),
-        "minor": base_part(version.base, 1),
-        "patch": base_part(version.base, 2),
-        "env": os.environ,
-        "bump_version": bump_version,
-        "serialize_pep440": serialize_pep440,
-        "serialize_pvp": serialize_pvp,
-        "serialize_semver": serialize_semver,
-    }
-
-    custom_context = {}
-    if config.format_jinja_imports:
-        for entry in config.format_jinja_imports:
-            module = import_module(entry.module)
-            if entry.item is not None:
-                custom_context[entry.item] = getattr(module, entry.item)
-            else:
-                custom_context[entry.module] = module
-
-    return jinja2.Template(template).render(**default_context, **custom_context)
+    return TemplateRenderer(version=version, config=config).render(template)
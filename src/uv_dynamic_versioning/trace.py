@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import contextlib
+import math
+import os
+import threading
+import time
+from collections.abc import Iterable, Iterator, Mapping
+from pathlib import Path
+from typing import Any
+
+TRACE_ENV = "UV_DYNAMIC_VERSIONING_TRACE"
+
+_lock = threading.Lock()
+
+
+def trace_path() -> Path | None:
+    value = os.environ.get(TRACE_ENV)
+    return Path(value) if value else None
+
+
+def enabled() -> bool:
+    return bool(os.environ.get(TRACE_ENV))
+
+
+def record(phase: str, duration: float = 0.0, **attributes: Any) -> None:
+    """Append one entry to the trace file, if tracing is enabled."""
+    path = trace_path()
+    if path is None:
+        return
+
+    import json
+
+    entry = {
+        "time": time.time(),
+        "pid": os.getpid(),
+        "phase": phase,
+        "duration": duration,
+        **attributes,
+    }
+    # tracing must never fail a build
+    with _lock, contextlib.suppress(OSError), path.open("a", encoding="utf-8") as f:
+        f.write(json.dumps(entry, default=str) + "\n")
+
+
+@contextlib.contextmanager
+def span(phase: str, **attributes: Any) -> Iterator[None]:
+    """Record the wall time spent in the block as `phase`, if tracing is enabled."""
+    if not enabled():
+        yield
+        return
+
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(phase, time.perf_counter() - start, **attributes)
+
+
+def command_span(command: str) -> contextlib.AbstractContextManager[None]:
+    return span("command " + " ".join(command.split()[:2]), command=command)
+
+
+def read_entries(path: Path) -> Iterator[dict[str, Any]]:
+    import json
+
+    with path.open(encoding="utf-8") as f:
+        for line in f:
+            with contextlib.suppress(ValueError):
+                yield json.loads(line)
+
+
+def percentile(values: list[float], fraction: float) -> float:
+    """Return the nearest-rank percentile of sorted `values`."""
+    rank = math.ceil(fraction * len(values))
+    return values[max(rank, 1) - 1]
+
+
+def summarize(entries: Iterable[Mapping[str, Any]]) -> dict[str, dict[str, float]]:
+    """Compute the count, p50 and p95 of the duration of each phase."""
+    durations: dict[str, list[float]] = {}
+    for entry in entries:
+        durations.setdefault(entry["phase"], []).append(entry["duration"])
+
+    summary = {}
+    for phase, values in sorted(durations.items()):
+        values.sort()
+        summary[phase] = {
+            "count": len(values),
+            "p50": percentile(values, 0.5),
+            "p95": percentile(values, 0.95),
+        }
+    return summary
@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import os
+import shlex
+import tempfile
+from pathlib import Path
+
+from . import commands, schemas
+
+DEFAULT_TEMPLATE = """\
+# This file is generated by uv-dynamic-versioning. Do not edit it.
+__version__ = "{version}"
+"""
+
+
+def render(version: str, template: str | None = None) -> str:
+    return (template or DEFAULT_TEMPLATE).format(version=version)
+
+
+def write(path: Path, content: str) -> bool:
+    """Atomically replace `path` with `content`, unless it already has it.
+
+    Returns whether the file was written.
+    """
+    try:
+        if path.read_text(encoding="utf-8") == content:
+            return False
+        mode = path.stat().st_mode & 0o777
+    except (OSError, ValueError):
+        mode = 0o644
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # readers (e.g. an interpreter importing it) must never see a partial file
+    with tempfile.NamedTemporaryFile(
+        "w", encoding="utf-8", dir=path.parent, delete=False
+    ) as f:
+        f.write(content)
+    try:
+        # temporary files are private, but this one replaces a source file
+        os.chmod(f.name, mode)
+        os.replace(f.name, path)
+    except OSError:
+        os.unlink(f.name)
+        raise
+    return True
+
+
+def stamp(
+    version_file: schemas.VersionFile, version: str, root: Path | None = None
+) -> bool:
+    """Write `version` to the configured file, relative to `root`."""
+    path = root / version_file.path if root else Path(version_file.path)
+    return write(path, render(version, version_file.template))
+
+
+def is_dirty_besides(
+    version_file: schemas.VersionFile,
+    root: Path | None = None,
+    ignore_untracked: bool = False,
+) -> bool:
+    """Check if anything but the version file differs from `HEAD` in a Git repository."""
+    command = ["git", "status", "--porcelain", "-z"]
+    if ignore_untracked:
+        command.append("--untracked-files=no")
+    # `:/` is the whole repository, and the version file is relative to `root`
+    command += ["--", ":/", f":(exclude){version_file.path}"]
+    try:
+        # like Dunamai's commands, so that `vcs-timeout` can kill it
+        code, output = commands.run(shlex.join(command), root, codes=(), stderr=False)
+    except OSError:
+        # `git` isn't installed, which the Python reader doesn't need
+        return _read_dirty_besides(version_file, root, ignore_untracked)
+    if code != 0:
+        # keep the dirty flag Git reported in the first place
+        return True
+    return bool(output)
+
+
+def _read_dirty_besides(
+    version_file: schemas.VersionFile, root: Path | None, ignore_untracked: bool
+) -> bool:
+    from .gitreader import UnsupportedRepository, discovered, excluded_paths, is_dirty
+
+    try:
+        with discovered(root) as repo:
+            if repo is None:
+                return True
+            excluded = excluded_paths(repo, [version_file.path], root)
+            head = repo.resolve_ref("HEAD")
+            return is_dirty(repo, head, ignore_untracked, excluded)
+    except (UnsupportedRepository, OSError, KeyError, ValueError):
+        return True
@@ -0,0 +1,150 @@
+from __future__ import annotations
+
+import contextlib
+import ctypes
+import ctypes.util
+import os
+import select
+import sys
+import time
+from collections.abc import Callable, Iterator
+from pathlib import Path
+
+from . import schemas
+from .cache import git_state
+from .gitreader import common_dir, find_git_dir
+from .main import get_version
+from .versionfile import stamp
+
+# from <sys/inotify.h>
+_IN_MODIFY = 0x002
+_IN_ATTRIB = 0x004
+_IN_CLOSE_WRITE = 0x008
+_IN_MOVED_FROM = 0x040
+_IN_MOVED_TO = 0x080
+_IN_CREATE = 0x100
+_IN_DELETE = 0x200
+_IN_MASK = (
+    _IN_MODIFY
+    | _IN_ATTRIB
+    | _IN_CLOSE_WRITE
+    | _IN_MOVED_FROM
+    | _IN_MOVED_TO
+    | _IN_CREATE
+    | _IN_DELETE
+)
+
+# how long to wait for a burst of events (e.g. a `git checkout`) to settle
+_SETTLE = 0.05
+
+
+class _Inotify:
+    """Wake up when files are created, changed or removed in some directories."""
+
+    def __init__(self):
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self._add_watch = libc.inotify_add_watch
+        self._add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        self.fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno))
+        self._watched: set[Path] = set()
+
+    def add(self, directory: Path) -> None:
+        # Git replaces files with renames, so directories are watched, not files
+        if directory in self._watched:
+            return
+        if self._add_watch(self.fd, os.fsencode(directory), _IN_MASK) >= 0:
+            self._watched.add(directory)
+
+    def wait(self, timeout: float | None) -> None:
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if ready:
+            time.sleep(_SETTLE)
+        with contextlib.suppress(BlockingIOError):
+            while os.read(self.fd, 65536):
+                pass
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+def _directories(git_dir: Path) -> Iterator[Path]:
+    """Yield the directories holding `HEAD`, the refs and the index."""
+    common = common_dir(git_dir)
+    yield git_dir
+    yield common
+    for directory, _, _ in os.walk(common / "refs"):
+        yield Path(directory)
+
+
+def _waiter(git_dir: Path, poll_interval: float, poll: bool) -> Callable[[], None]:
+    if not poll and sys.platform.startswith("linux"):
+        try:
+            inotify = _Inotify()
+        except (OSError, AttributeError):
+            pass
+        else:
+
+            def watch_all() -> None:
+                # refs can be added in new directories (e.g. `refs/heads/feature/`)
+                for directory in _directories(git_dir):
+                    inotify.add(directory)
+
+            def wait() -> None:
+                # still poll now and then, in case an event was missed
+                inotify.wait(max(poll_interval, 60))
+                watch_all()
+
+            # watch before the state is first read, so no change goes unnoticed
+            watch_all()
+            return wait
+
+    return lambda: time.sleep(poll_interval)
+
+
+def changes(
+    git_dir: Path, *, poll_interval: float = 1.0, poll: bool = False
+) -> Iterator[None]:
+    """Yield now, then whenever `HEAD`, the refs or the index of a repository change.
+
+    Uses inotify where available, and otherwise (or with `poll`) checks every
+    `poll_interval` seconds.
+    """
+    wait = _waiter(git_dir, poll_interval, poll)
+    state = None
+    while True:
+        current = git_state(git_dir)
+        if current != state:
+            state = current
+            yield
+        wait()
+
+
+def watch(
+    config: schemas.UvDynamicVersioning,
+    version_file: schemas.VersionFile,
+    root: Path | None = None,
+    *,
+    poll_interval: float = 1.0,
+    poll: bool = False,
+) -> Iterator[dict[str, str]]:
+    """Keep `version_file` up to date.
+
+    Yields `{"version": ...}` for every version written, or `{"error": ...}` when
+    one can't be resolved (e.g. in the middle of a rebase), and keeps watching.
+    """
+    git_dir = find_git_dir(root)
+    if git_dir is None:
+        raise RuntimeError("This does not appear to be a Git project")
+
+    for _ in changes(git_dir, poll_interval=poll_interval, poll=poll):
+        try:
+            version, _ = get_version(config, root=root, fields=())
+            written = stamp(version_file, version, root)
+        except (OSError, RuntimeError, ValueError) as e:
+            yield {"error": str(e)}
+        else:
+            if written:
+                yield {"version": version}
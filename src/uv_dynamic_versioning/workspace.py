@@ -0,0 +1,341 @@
+from __future__ import annotations
+
+import contextlib
+import copy
+import hashlib
+import json
+import os
+import re
+import tempfile
+import threading
+from collections.abc import Iterable, Mapping
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from dunamai import Version
+
+from . import schemas, trace
+from .analysis import persistent, template_fields
+from .cache import _cache_dir_from_env, dump_version, git_state, load_version
+from .gitreader import find_git_dir
+from .main import (
+    _get_bypassed_version,
+    _get_version,
+    _needed_fields,
+    _serialize,
+    get_version,
+    parse,
+    read,
+    validate,
+)
+
+PLUGIN_NAME = "uv-dynamic-versioning"
+
+# members sharing a configuration share a VCS based version, resolved once
+_Group = tuple[schemas.UvDynamicVersioning, Path]
+
+_MISSING = object()
+
+_lock = threading.RLock()
+_documents: dict[Path, tuple[tuple[int, int], Mapping[str, Any]]] = {}
+# the last version of each group, keyed on the state it was resolved in
+_resolved: dict[tuple[Path, _Group], tuple[str, Version]] = {}
+
+
+def normalize_name(name: str) -> str:
+    """Normalize a project name like PEP 503."""
+    return re.sub(r"[-_.]+", "-", name).lower()
+
+
+class Versions(dict):
+    """The versions of a workspace's members, by normalized project name.
+
+    Any spelling of a name finds its member, e.g. `child_project` or `Child.Project`.
+    """
+
+    def __missing__(self, key: str) -> str:
+        normalized = normalize_name(key)
+        if normalized != key and normalized in self:
+            return self[normalized]
+        raise KeyError(key)
+
+
+@dataclass(frozen=True, slots=True)
+class Member:
+    name: str
+    root: Path
+    # the static `project.version`, or None if this plugin resolves it
+    version: str | None = None
+    config: schemas.UvDynamicVersioning | None = None
+    # the `Version` fields the member's metadata hook uses
+    fields: frozenset[str] = frozenset()
+
+
+def _document(root: Path) -> Mapping[str, Any] | None:
+    """Read and parse `pyproject.toml`, memoized on its mtime and size."""
+    pyproject = root / "pyproject.toml"
+    try:
+        stat = pyproject.stat()
+    except OSError:
+        return None
+    signature = (stat.st_mtime_ns, stat.st_size)
+
+    cached = _documents.get(pyproject)
+    if cached is not None and cached[0] == signature:
+        return cached[1]
+
+    data = parse(read(str(root)))
+    _documents[pyproject] = (signature, data)
+    return data
+
+
+def _workspace_table(data: Mapping[str, Any]) -> Mapping[str, Any] | None:
+    return data.get("tool", {}).get("uv", {}).get("workspace")
+
+
+def find_root(start: str | os.PathLike) -> Path | None:
+    """Find the root of the uv workspace `start` belongs to, if any."""
+    start = Path(start).resolve()
+    for directory in (start, *start.parents):
+        data = _document(directory)
+        if data is not None and _workspace_table(data) is not None:
+            return directory
+        # don't look past the repository
+        if (directory / ".git").exists():
+            break
+    return None
+
+
+def _member_roots(root: Path, workspace: Mapping[str, Any]) -> list[Path]:
+    def expand(patterns: Iterable[str]) -> set[Path]:
+        return {
+            path.resolve()
+            for pattern in patterns
+            for path in root.glob(pattern)
+            if (path / "pyproject.toml").is_file()
+        }
+
+    found = expand(workspace.get("members", [])) - expand(workspace.get("exclude", []))
+    # the root is a member too, if it's a project rather than a virtual workspace
+    return [root, *sorted(found - {root})]
+
+
+def _member(root: Path, data: Mapping[str, Any]) -> Member | None:
+    project = data.get("project")
+    if not isinstance(project, Mapping) or "name" not in project:
+        return None
+
+    name = normalize_name(project["name"])
+    if "version" in project:
+        return Member(name, root, version=str(project["version"]))
+
+    hatch = data.get("tool", {}).get("hatch", {})
+    if hatch.get("version", {}).get("source") != PLUGIN_NAME:
+        # versioned by another plugin
+        return None
+
+    config = validate(data).tool.uv_dynamic_versioning or schemas.UvDynamicVersioning()
+    fields: frozenset[str] = frozenset()
+    hook = hatch.get("metadata", {}).get("hooks", {}).get(PLUGIN_NAME)
+    if hook is not None:
+        templates = schemas.MetadataHookConfig.from_dict(dict(hook)).templates()
+        fields = template_fields(templates, config)
+    return Member(name, root, config=config, fields=fields)
+
+
+def members(root: str | os.PathLike) -> list[Member]:
+    """List the members of the workspace at `root` whose version is known."""
+    root = Path(root).resolve()
+    data = _document(root)
+    workspace = _workspace_table(data) if data is not None else None
+    if workspace is None:
+        raise ValueError(f"{root} is not the root of a uv workspace")
+
+    found = []
+    for member_root in _member_roots(root, workspace):
+        document = _document(member_root)
+        member = _member(member_root, document) if document is not None else None
+        if member is not None:
+            found.append(member)
+    return found
+
+
+def _group(member: Member, root: Path) -> _Group:
+    config = member.config
+    assert config is not None
+    # the version file's dirty check and the tag manifest are relative to the project
+    if config.version_file is not None or config.tag_manifest is not None:
+        return (config, member.root)
+    return (config, root)
+
+
+def _groups(root: Path, found: Iterable[Member]) -> dict[_Group, frozenset[str] | None]:
+    """Collect the VCS based versions to resolve, with the fields each one needs."""
+    groups: dict[_Group, frozenset[str] | None] = {}
+    for member in found:
+        if member.config is None or member.config.from_file is not None:
+            continue
+
+        group = _group(member, root)
+        needed = _needed_fields(member.config, member.fields)
+        if group not in groups:
+            groups[group] = needed
+        elif groups[group] is not None and needed is not None:
+            groups[group] = groups[group] | needed  # type: ignore[operator]
+        else:
+            groups[group] = None
+    return groups
+
+
+def _state_key(group: _Group, fields: frozenset[str] | None, git: Any) -> str:
+    config, root = group
+    data = {
+        "git": git,
+        "config": config.fingerprint(),
+        "root": str(root),
+        "fields": sorted(fields) if fields is not None else None,
+    }
+    return hashlib.sha256(json.dumps(data, sort_keys=True).encode()).hexdigest()
+
+
+def _path(root: Path, group: _Group, git_dir: Path) -> Path:
+    directory = _cache_dir_from_env() or git_dir / "uv-dynamic-versioning"
+    config, group_root = group
+    identity = "\0".join((str(root), config.fingerprint(), str(group_root)))
+    name = hashlib.sha256(identity.encode()).hexdigest()[:16]
+    return directory / f"workspace-{name}.json"
+
+
+def _load(path: Path, key: str) -> Version | None:
+    try:
+        entry = json.loads(path.read_text(encoding="utf-8"))
+        if entry.get("key") != key:
+            return None
+        return load_version(entry["version"])
+    except (OSError, KeyError, TypeError, ValueError):
+        return None
+
+
+def _store(path: Path, key: str, version: Version) -> None:
+    entry = {"key": key, "version": dump_version(version)}
+    # sharing the version is an optimization, so failing to write must not fail a build
+    with contextlib.suppress(OSError):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with tempfile.NamedTemporaryFile(
+            "w", encoding="utf-8", dir=path.parent, delete=False
+        ) as f:
+            json.dump(entry, f)
+        os.replace(f.name, path)
+
+
+class _Resolver:
+    """Resolve the VCS based version of a group on demand, at most once per state.
+
+    Versions are kept for the process, and on disk next to `cache`'s entries
+    for the builds of the other members, each of which runs in its own process.
+    """
+
+    def __init__(self, root: Path, found: Iterable[Member]):
+        self.root = root
+        self.groups = _groups(root, found)
+        self.git_dir = find_git_dir(root)
+        self._git: Any = _MISSING
+
+    def _git_state(self) -> Any:
+        # read once for all the groups resolved with this view of the workspace
+        if self._git is _MISSING:
+            self._git = git_state(self.git_dir) if self.git_dir is not None else None
+        return self._git
+
+    def fields(self, group: _Group) -> frozenset[str] | None:
+        return self.groups[group]
+
+    def resolve(self, group: _Group) -> Version:
+        fields = self.groups[group]
+        key = _state_key(group, fields, self._git_state())
+        cached = _resolved.get((self.root, group))
+        if cached is not None and cached[0] == key:
+            trace.record("cache-hit", cache="workspace")
+            return cached[1]
+
+        path = None
+        if self.git_dir is not None and persistent(fields):
+            path = _path(self.root, group, self.git_dir)
+        version = _load(path, key) if path is not None else None
+        trace.record("cache-hit" if version else "cache-miss", cache="workspace")
+        if version is None:
+            config, group_root = group
+            with trace.span("workspace"):
+                version = _get_version(config, group_root, True, fields)
+            if path is not None:
+                _store(path, key, version)
+
+        _resolved[(self.root, group)] = (key, version)
+        return version
+
+
+def _version_of(
+    member: Member, root: Path, resolver: _Resolver | None
+) -> tuple[str, Version]:
+    config = member.config
+    assert config is not None
+    group = _group(member, root) if config.from_file is None else None
+    if resolver is None or group not in resolver.groups:
+        # bypassed, or read from a file, neither of which needs the VCS
+        return get_version(config, root=member.root, fields=())
+
+    # serializing patches the version, which other members may share
+    return _serialize(config, copy.copy(resolver.resolve(group)))
+
+
+def member_version(
+    start: str | os.PathLike,
+    config: schemas.UvDynamicVersioning,
+    fields: frozenset[str],
+) -> tuple[str, Version] | None:
+    """Return the version of the project at `start`, shared with its workspace.
+
+    Only the version of the member's own group is resolved. None if it isn't a
+    member of a workspace, or the shared version doesn't resolve `fields`.
+    """
+    start = Path(start).resolve()
+    root = find_root(start)
+    if root is None or _get_bypassed_version() or config.from_file is not None:
+        return None
+
+    with _lock:
+        found = members(root)
+        member = next((m for m in found if m.root == start), None)
+        if member is None or member.config != config:
+            return None
+
+        resolver = _Resolver(root, found)
+        resolved_fields = resolver.fields(_group(member, root))
+        if resolved_fields is not None and not fields <= resolved_fields:
+            return None
+        return _version_of(member, root, resolver)
+
+
+def versions(start: str | os.PathLike) -> Versions:
+    """Return the version of every member of the workspace `start` belongs to."""
+    root = find_root(start)
+    if root is None:
+        raise ValueError(f"workspace is enabled, but {start} is not in a uv workspace")
+
+    result = Versions()
+    with _lock:
+        found = members(root)
+        resolver = None if _get_bypassed_version() else _Resolver(root, found)
+        for member in found:
+            if member.version is not None:
+                result[member.name] = member.version
+            else:
+                result[member.name] = _version_of(member, root, resolver)[0]
+    return result
+
+
+def invalidate() -> None:
+    """Forget the versions resolved in this process."""
+    with _lock:
+        _resolved.clear()
@@ -4,6 +4,8 @@ from pathlib import Path
 import pytest
 from git import Repo, TagReference
 
+from uv_dynamic_versioning import registry
+
 PROJECT_ROOT = Path().resolve()
 
 
@@ -25,6 +27,14 @@ def clear_tags(repo: Repo):
         repo.create_tag(name, ref)
 
 
+@pytest.fixture(autouse=True)
+def clear_registry():
+    # tests create and delete tags, so versions resolved by a previous test are stale
+    registry.invalidate()
+    yield
+    registry.invalidate()
+
+
 @pytest.fixture
 def semver_tag(repo: Repo):
     tag = repo.create_tag("v1.0.0")
@@ -0,0 +1,56 @@
+import asyncio
+import time
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from uv_dynamic_versioning import aio, schemas
+from uv_dynamic_versioning.main import get_version, load
+
+ROOTS = [
+    Path("tests/fixtures/with-pep440"),
+    Path("tests/fixtures/with-semver"),
+    Path("tests/fixtures/with-bump"),
+]
+
+
+@pytest.mark.usefixtures("semver_tag")
+def test_get_version_runs_commands_on_the_loop():
+    config = schemas.UvDynamicVersioning()
+    with patch(
+        "asyncio.create_subprocess_exec", wraps=asyncio.create_subprocess_exec
+    ) as create_subprocess_exec:
+        assert asyncio.run(aio.get_version(config)) == get_version(config)
+    assert create_subprocess_exec.called
+
+
+@pytest.mark.usefixtures("semver_tag")
+def test_get_versions():
+    results = asyncio.run(aio.get_versions(ROOTS, jobs=2))
+    assert [result[0] for result in results] == [
+        get_version(load(str(root)).tool.uv_dynamic_versioning, root=root)[0]  # type: ignore[arg-type]
+        for root in ROOTS
+    ]
+
+
+def test_get_versions_returns_exceptions(tmp_path: Path):
+    results = asyncio.run(
+        aio.get_versions([ROOTS[0], tmp_path], return_exceptions=True)
+    )
+    assert isinstance(results[0], tuple)
+    assert isinstance(results[1], FileNotFoundError)
+
+
+def test_get_version_timeout():
+    async def slow(command, *args):
+        return await run("sleep 10", *args)
+
+    run = aio._run
+    start = time.monotonic()
+    with (
+        patch("uv_dynamic_versioning.aio._run", slow),
+        pytest.raises(asyncio.TimeoutError),
+    ):
+        asyncio.run(aio.get_version(schemas.UvDynamicVersioning(), timeout=0.2))
+    assert time.monotonic() - start < 5
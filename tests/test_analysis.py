@@ -0,0 +1,41 @@
+import pytest
+
+from uv_dynamic_versioning import schemas
+from uv_dynamic_versioning.analysis import (
+    FIELDS,
+    required_fields,
+    template_dependencies,
+    template_fields,
+)
+
+
+@pytest.mark.parametrize(
+    ("config", "fields"),
+    [
+        (schemas.UvDynamicVersioning(), {"base", "stage", "revision", "epoch", "distance", "commit"}),
+        (schemas.UvDynamicVersioning(dirty=True, style="semver"), {"base", "stage", "revision", "epoch", "distance", "commit", "dirty"}),
+        (schemas.UvDynamicVersioning(metadata=False, dirty=True), {"base", "stage", "revision", "epoch", "distance"}),
+        (schemas.UvDynamicVersioning(format="{base}+{timestamp}"), {"base", "timestamp"}),
+        (schemas.UvDynamicVersioning(format_jinja="{{ base }}", bump=True), {"base", "distance"}),
+        (schemas.UvDynamicVersioning(format_jinja="{{ branch_escaped }}"), {"branch"}),
+    ],
+)  # fmt: skip
+def test_required_fields(config: schemas.UvDynamicVersioning, fields: set[str]):
+    assert required_fields(config) == fields
+
+
+def test_template_fields_of_the_version():
+    config = schemas.UvDynamicVersioning(format="{base}.{distance}")
+    assert template_fields(["foo=={{ version }}"], config) == {"base", "distance"}
+    assert template_fields(["{{ version.commit }}", "{{ major }}"], config) == {
+        "commit",
+        "base",
+    }
+    assert template_fields(["{{ version.bump() }}"], config) == set(FIELDS)
+
+
+def test_template_dependencies_ignores_assigned_names():
+    fields, env, exact = template_dependencies("{% set base = '1' %}{{ base }}")
+    assert fields == set()
+    assert env == set()
+    assert exact
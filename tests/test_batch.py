@@ -0,0 +1,98 @@
+import json
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from uv_dynamic_versioning import batch, gitreader, schemas
+from uv_dynamic_versioning.batch import find_roots, run
+from uv_dynamic_versioning.cli import main
+from uv_dynamic_versioning.gitreader import Repository
+
+ROOTS = [
+    Path("tests/fixtures/with-pep440"),
+    Path("tests/fixtures/with-semver"),
+    Path("tests/fixtures/with-highest-tag"),
+]
+
+
+def test_find_roots_with_glob():
+    roots = find_roots(["tests/fixtures/with-pep440"], "tests/fixtures/with-p*")
+    assert roots == [
+        Path("tests/fixtures/with-pep440"),
+        Path("tests/fixtures/with-pattern"),
+    ]
+
+
+@pytest.mark.usefixtures("semver_tag")
+def test_run_scans_the_repository_once():
+    with patch.object(
+        Repository, "_read_tags", autospec=True, side_effect=Repository._read_tags
+    ) as read_tags:
+        results = list(run(ROOTS, jobs=4, git_backend=schemas.GitBackend.Python))
+
+    assert sorted(result["root"] for result in results) == sorted(map(str, ROOTS))
+    assert all(result["version"] == "1.0.0" for result in results)
+    assert read_tags.call_count == 1
+
+
+@pytest.mark.usefixtures("semver_tag")
+def test_run_with_the_cli_backend_queries_git_per_project():
+    with patch.object(Repository, "_read_tags", side_effect=AssertionError):
+        results = list(run(ROOTS, jobs=4))
+
+    assert sorted(result["root"] for result in results) == sorted(map(str, ROOTS))
+    assert all(result["version"] == "1.0.0" for result in results)
+
+
+@pytest.mark.usefixtures("semver_tag")
+def test_run_reports_errors_per_root(tmp_path: Path):
+    results = {
+        result["root"]: result for result in run([ROOTS[0], tmp_path / "missing"])
+    }
+    assert results[str(ROOTS[0])]["version"] == "1.0.0"
+    assert "error" in results[str(tmp_path / "missing")]
+
+
+@pytest.mark.usefixtures("semver_tag")
+def test_run_keeps_the_configured_git_backend():
+    with patch.object(gitreader, "from_config") as from_config:
+        results = list(run(ROOTS[:1]))
+    assert results[0]["version"] == "1.0.0"
+    from_config.assert_not_called()
+
+
+@pytest.mark.usefixtures("semver_tag")
+def test_run_reports_any_error_per_root():
+    def resolve(root: Path, git_backend: schemas.GitBackend | None) -> dict[str, str]:
+        if root == ROOTS[1]:
+            raise KeyError("broken")
+        return {"root": str(root), "version": "1.0.0"}
+
+    with patch.object(batch, "resolve", side_effect=resolve):
+        results = {result["root"]: result for result in run(ROOTS)}
+    assert results[str(ROOTS[1])] == {"root": str(ROOTS[1]), "error": "'broken'"}
+    assert results[str(ROOTS[2])]["version"] == "1.0.0"
+
+
+@pytest.mark.usefixtures("semver_tag")
+def test_run_shares_repositories_only_with_its_resolutions():
+    results = run(ROOTS, git_backend=schemas.GitBackend.Python)
+    next(results)
+    # the caller isn't handed the snapshot while the generator is suspended
+    assert gitreader._shared.get() is None
+    results.close()
+
+
+@pytest.mark.usefixtures("semver_tag")
+def test_cli_batch(capsys: pytest.CaptureFixture[str]):
+    assert main(["batch", *map(str, ROOTS)]) == 0
+    lines = capsys.readouterr().out.splitlines()
+    assert {json.loads(line)["version"] for line in lines} == {"1.0.0"}
+    assert len(lines) == len(ROOTS)
+
+
+@pytest.mark.usefixtures("semver_tag")
+def test_cli_without_subcommand(capsys: pytest.CaptureFixture[str]):
+    assert main([]) == 0
+    assert capsys.readouterr().out == "1.0.0\n"
@@ -0,0 +1,20 @@
+from pathlib import Path
+
+from benchmarks.repos import Scale
+from benchmarks.run import compare, run
+
+
+def test_compare_reports_regressions_beyond_threshold():
+    baseline = {"small/vcs": 0.1, "small/bump": 0.1, "small/bypass": 0.0001}
+    results = {"small/vcs": 0.2, "small/bump": 0.11, "small/bypass": 0.0005}
+    regressions = compare(results, baseline, threshold=0.25)
+    assert len(regressions) == 1
+    assert regressions[0].startswith("small/vcs:")
+
+
+def test_run_times_every_path(tmp_path: Path):
+    scale = Scale("tiny", commits=5, tags=2, files=3, dirty=True)
+    results = run([scale], tmp_path, repeat=1)
+    assert "tiny/vcs" in results
+    assert "tiny/metadata-hook" in results
+    assert all(elapsed > 0 for elapsed in results.values())
@@ -0,0 +1,121 @@
+import os
+import time
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+from git import Repo
+
+from uv_dynamic_versioning import commands, schemas
+from uv_dynamic_versioning.budget import VcsTimeoutError, call
+from uv_dynamic_versioning.main import get_version
+from uv_dynamic_versioning.versionfile import is_dirty_besides
+
+
+def stall(*args):
+    return commands.run("sleep 10", None)
+
+
+def test_call_returns_or_raises():
+    assert call(5, lambda x: x + 1, 1) == 2
+    with pytest.raises(RuntimeError, match="returned code"):
+        call(5, commands.run, "false", None)
+    # without a budget, commands run as usual
+    assert commands.run("echo ok", None) == (0, "ok")
+
+
+def test_call_kills_commands_when_out_of_time():
+    start = time.monotonic()
+    with pytest.raises(VcsTimeoutError):
+        call(0.2, stall)
+    assert time.monotonic() - start < 5
+
+
+def test_get_version_with_vcs_timeout_and_fallback_version():
+    config = schemas.UvDynamicVersioning(vcs_timeout=0.2, fallback_version="0.1.0")
+    with (
+        patch("uv_dynamic_versioning.main._get_vcs_version", stall),
+        pytest.warns(UserWarning, match="using fallback-version"),
+    ):
+        assert get_version(config)[0] == "0.1.0"
+
+
+def test_get_version_with_vcs_timeout_and_nothing_to_fall_back_on():
+    config = schemas.UvDynamicVersioning(vcs_timeout=0.2)
+    with (
+        patch("uv_dynamic_versioning.main._get_vcs_version", stall),
+        pytest.raises(VcsTimeoutError),
+    ):
+        get_version(config)
+
+
+@pytest.mark.usefixtures("semver_tag")
+def test_get_version_with_vcs_timeout_uses_the_last_cached_version(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch, repo: Repo
+):
+    monkeypatch.setenv("UV_DYNAMIC_VERSIONING_CACHE_DIR", str(tmp_path))
+    config = schemas.UvDynamicVersioning(
+        cache=True, vcs_timeout=5, fallback_version="0.1.0", highest_tag=True
+    )
+    assert get_version(config, fields=())[0] == "1.0.0"
+
+    tag = repo.create_tag("v2.0.0")
+    try:
+        with (
+            patch(
+                "uv_dynamic_versioning.main._get_vcs_version",
+                side_effect=VcsTimeoutError("timed out"),
+            ),
+            pytest.warns(UserWarning, match="the last cached version"),
+        ):
+            assert get_version(config, fields=())[0] == "1.0.0"
+    finally:
+        repo.delete_tag(tag)
+
+
+def test_call_runs_dunamai_commands_with_its_runner():
+    import dunamai
+
+    original = dunamai._run_cmd
+    with commands.installed():
+        with commands.installed():
+            assert dunamai._run_cmd is commands.run
+        assert dunamai._run_cmd is commands.run
+
+        start = time.monotonic()
+        with pytest.raises(VcsTimeoutError):
+            call(0.2, dunamai._run_cmd, "sleep 10", None)
+        assert time.monotonic() - start < 5
+    # other users of Dunamai get it back as it was
+    assert dunamai._run_cmd is original
+
+
+def test_get_version_with_vcs_timeout_bounds_the_cache(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+):
+    monkeypatch.setenv("UV_DYNAMIC_VERSIONING_CACHE_DIR", str(tmp_path))
+    config = schemas.UvDynamicVersioning(
+        cache=True, vcs_timeout=0.2, fallback_version="0.1.0"
+    )
+    start = time.monotonic()
+    with (
+        patch("uv_dynamic_versioning.cache.VersionCache.get", stall),
+        patch("uv_dynamic_versioning.cache.VersionCache.latest", stall),
+        pytest.warns(UserWarning, match="using fallback-version"),
+    ):
+        assert get_version(config, fields=())[0] == "0.1.0"
+    assert time.monotonic() - start < 5
+
+
+def test_call_kills_the_version_file_dirty_check(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+):
+    git = tmp_path / "git"
+    git.write_text("#!/bin/sh\nexec sleep 10\n", encoding="utf-8")
+    git.chmod(0o755)
+    monkeypatch.setenv("PATH", f"{tmp_path}{os.pathsep}{os.environ['PATH']}")
+
+    start = time.monotonic()
+    with pytest.raises(VcsTimeoutError):
+        call(0.2, is_dirty_besides, schemas.VersionFile(path="_version.py"))
+    assert time.monotonic() - start < 5
@@ -0,0 +1,105 @@
+from collections.abc import Generator
+from pathlib import Path
+from unittest.mock import PropertyMock, patch
+
+import pytest
+from git import Repo
+
+from uv_dynamic_versioning import schemas
+from uv_dynamic_versioning.build_hook import VersionFileBuildHook
+from uv_dynamic_versioning.main import get_version
+from uv_dynamic_versioning.versionfile import is_dirty_besides, render
+
+from .utils import dirty
+
+
+@pytest.fixture
+def mock_project_config() -> Generator[PropertyMock, None, None]:
+    with patch(
+        "uv_dynamic_versioning.build_hook.VersionFileBuildHook.project_config",
+        new_callable=PropertyMock,
+    ) as mock:
+        yield mock
+
+
+def build(build_data: dict) -> None:
+    hook = VersionFileBuildHook(".", {}, None, None, "dist", "wheel")  # type: ignore
+    hook.initialize("standard", build_data)
+
+
+@pytest.mark.usefixtures("semver_tag")
+def test_build_hook_writes_version_file(
+    tmp_path: Path, mock_project_config: PropertyMock
+):
+    path = tmp_path / "_version.py"
+    mock_project_config.return_value = schemas.UvDynamicVersioning(
+        version_file=schemas.VersionFile(
+            path=str(path), template='VERSION = "{version}"\n'
+        )
+    )
+
+    build_data: dict = {"artifacts": []}
+    build(build_data)
+    assert path.read_text(encoding="utf-8") == 'VERSION = "1.0.0"\n'
+    assert build_data["artifacts"] == [str(path)]
+
+    mtime = path.stat().st_mtime_ns
+    build({"artifacts": []})
+    assert path.stat().st_mtime_ns == mtime
+
+
+def test_build_hook_requires_version_file(mock_project_config: PropertyMock):
+    mock_project_config.return_value = schemas.UvDynamicVersioning()
+    with pytest.raises(ValueError, match="version-file"):
+        build({"artifacts": []})
+
+
+@pytest.mark.parametrize("git_backend", list(schemas.GitBackend))
+@pytest.mark.usefixtures("semver_tag")
+def test_version_file_is_not_dirty(repo: Repo, git_backend: schemas.GitBackend):
+    path = Path(repo.working_dir) / "_version.py"
+    config = schemas.UvDynamicVersioning(
+        dirty=True,
+        git_backend=git_backend,
+        version_file=schemas.VersionFile(path="_version.py"),
+    )
+    clean = get_version(config)[0]
+    try:
+        path.write_text(render("1.0.0"), encoding="utf-8")
+        assert get_version(config)[0] == clean
+
+        with dirty(repo):
+            assert get_version(config)[0] == "1.0.0+dirty"
+    finally:
+        path.unlink()
+
+
+@pytest.mark.usefixtures("semver_tag")
+def test_version_file_with_python_git_backend_does_not_run_git(repo: Repo):
+    path = Path(repo.working_dir) / "_version.py"
+    config = schemas.UvDynamicVersioning(
+        dirty=True,
+        git_backend=schemas.GitBackend.Python,
+        version_file=schemas.VersionFile(path="_version.py"),
+    )
+    clean = get_version(config)[0]
+    try:
+        path.write_text(render("1.0.0"), encoding="utf-8")
+        with patch("subprocess.run", side_effect=AssertionError):
+            assert get_version(config)[0] == clean
+    finally:
+        path.unlink()
+
+
+def test_version_file_is_not_dirty_without_git(tmp_path: Path):
+    repo = Repo.init(tmp_path)
+    (tmp_path / "README.md").write_text("readme\n", encoding="utf-8")
+    repo.index.add(["README.md"])
+    repo.index.commit("init")
+    (tmp_path / "_version.py").write_text(render("1.0.0"), encoding="utf-8")
+
+    version_file = schemas.VersionFile(path="_version.py")
+    with patch("subprocess.run", side_effect=FileNotFoundError):
+        assert not is_dirty_besides(version_file, tmp_path)
+        (tmp_path / "README.md").write_text("changed\n", encoding="utf-8")
+        assert is_dirty_besides(version_file, tmp_path)
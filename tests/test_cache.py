@@ -0,0 +1,84 @@
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+from dunamai import Version
+from git import Repo
+
+from uv_dynamic_versioning import schemas
+from uv_dynamic_versioning.cache import VersionCache, dump_version, load_version
+from uv_dynamic_versioning.main import get_version
+
+
+@pytest.fixture
+def cache_dir(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    monkeypatch.setenv("UV_DYNAMIC_VERSIONING_CACHE_DIR", str(tmp_path))
+    return tmp_path
+
+
+def test_dump_and_load_version():
+    version = Version("1.0.0", stage=("a", 1), distance=3, commit="abc", dirty=True)
+    version._matched_tag = "v1.0.0a1"
+    loaded = load_version(dump_version(version))
+    assert loaded == version
+    assert loaded._matched_tag == "v1.0.0a1"
+
+
+@pytest.mark.usefixtures("semver_tag")
+def test_get_version_with_warm_cache_does_not_query_vcs(cache_dir: Path):
+    config = schemas.UvDynamicVersioning(cache=True)
+    assert get_version(config, fields=())[0] == "1.0.0"
+    assert len(list(cache_dir.glob("version-*.json"))) == 1
+
+    with patch.object(Version, "from_vcs", side_effect=AssertionError):
+        assert get_version(config, fields=())[0] == "1.0.0"
+
+
+@pytest.mark.usefixtures("semver_tag")
+def test_cache_is_invalidated_by_new_tags(cache_dir: Path, repo: Repo):
+    config = schemas.UvDynamicVersioning(cache=True, highest_tag=True)
+    assert get_version(config, fields=())[0] == "1.0.0"
+
+    tag = repo.create_tag("v2.0.0")
+    try:
+        assert get_version(config, fields=())[0] == "2.0.0"
+    finally:
+        repo.delete_tag(tag)
+
+    assert len(list(cache_dir.glob("version-*.json"))) == 2
+
+
+def test_cache_is_disabled_by_default():
+    assert VersionCache.for_config(schemas.UvDynamicVersioning()) is None
+
+
+@pytest.mark.usefixtures("semver_tag")
+def test_cache_evicts_old_entries(cache_dir: Path, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr("uv_dynamic_versioning.cache.MAX_ENTRIES", 1)
+    get_version(schemas.UvDynamicVersioning(cache=True), fields=())
+    get_version(schemas.UvDynamicVersioning(cache=True, metadata=True), fields=())
+    assert len(list(cache_dir.glob("version-*.json"))) == 1
+
+
+@pytest.mark.usefixtures("semver_tag")
+def test_cache_entries_serve_only_the_fields_resolved(cache_dir: Path):
+    config = schemas.UvDynamicVersioning(cache=True, format="{base}")
+    assert get_version(config, fields=())[1].branch is None
+
+    with patch.object(Version, "from_vcs", side_effect=AssertionError):
+        assert get_version(config, fields=())[0] == "1.0.0"
+    assert get_version(config)[1].branch is not None
+
+
+def test_cache_is_not_used_for_the_dirty_flag(cache_dir: Path, tmp_path: Path):
+    root = tmp_path / "project"
+    repo = Repo.init(root)
+    (root / "README.md").write_text("readme\n", encoding="utf-8")
+    repo.index.add(["README.md"])
+    repo.create_tag("v1.0.0", repo.index.commit("init"))
+
+    config = schemas.UvDynamicVersioning(cache=True, dirty=True)
+    assert get_version(config, root=root, fields=())[0] == "1.0.0"
+    (root / "README.md").write_text("changed\n", encoding="utf-8")
+    assert get_version(config, root=root, fields=())[0] == "1.0.0+dirty"
+    assert not list(cache_dir.glob("version-*.json"))
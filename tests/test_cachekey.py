@@ -0,0 +1,117 @@
+from pathlib import Path
+
+import pytest
+
+from uv_dynamic_versioning import schemas
+from uv_dynamic_versioning.analysis import FIELDS
+from uv_dynamic_versioning.cachekey import (
+    analyze,
+    dumps_uv_cache_keys,
+    fingerprint,
+    inputs,
+)
+from uv_dynamic_versioning.cli import main
+
+
+def test_analyze_default_format():
+    dependencies = analyze(schemas.UvDynamicVersioning())
+    assert dependencies.fields == {
+        "base",
+        "stage",
+        "revision",
+        "epoch",
+        "distance",
+        "commit",
+    }
+    assert dependencies.git == {"commit": True, "tags": True}
+
+
+def test_analyze_default_format_with_options():
+    dependencies = analyze(
+        schemas.UvDynamicVersioning(dirty=True, tagged_metadata=True)
+    )
+    assert {"dirty", "tagged_metadata"} <= dependencies.fields
+
+    dependencies = analyze(schemas.UvDynamicVersioning(metadata=False, dirty=True))
+    assert "commit" not in dependencies.fields
+    assert "dirty" not in dependencies.fields
+
+
+@pytest.mark.parametrize(
+    ("config", "fields"),
+    [
+        (schemas.UvDynamicVersioning(format="{major}.{minor}"), {"base"}),
+        (schemas.UvDynamicVersioning(format="v{base}+{branch_escaped}"), {"base", "branch"}),
+        (schemas.UvDynamicVersioning(format="{base}", bump=True), {"base", "distance"}),
+        (schemas.UvDynamicVersioning(format_jinja="{{ base }}.{{ distance }}"), {"base", "distance"}),
+        (schemas.UvDynamicVersioning(format_jinja="{{ serialize_pep440(version.base) }}"), {"base"}),
+        (schemas.UvDynamicVersioning(format_jinja="{{ version.bump() }}"), set(FIELDS)),
+        (schemas.UvDynamicVersioning(format_jinja="{{ version }}", format="{base}"), {"base"}),
+        (schemas.UvDynamicVersioning(format_jinja="1.0.0"), set()),
+    ],
+)  # fmt: skip
+def test_analyze_format_fields(config: schemas.UvDynamicVersioning, fields: set[str]):
+    assert analyze(config).fields == fields
+
+
+def test_analyze_tags_only():
+    # which tag is the latest depends on the commit checked out
+    dependencies = analyze(schemas.UvDynamicVersioning(format="{base}"))
+    assert dependencies.git == {"commit": True, "tags": True}
+    assert dumps_uv_cache_keys(dependencies) == (
+        'cache-keys = [{ file = "pyproject.toml" }, '
+        "{ git = { commit = true, tags = true } }, "
+        '{ env = "UV_DYNAMIC_VERSIONING_BYPASS" }]'
+    )
+
+
+def test_analyze_without_vcs():
+    dependencies = analyze(schemas.UvDynamicVersioning(format_jinja="1.0.0"))
+    assert dependencies.git is None
+
+
+def test_analyze_from_file():
+    config = schemas.UvDynamicVersioning(
+        from_file=schemas.FromFile(source=["VERSION", "src/*/__init__.py"])
+    )
+    dependencies = analyze(config)
+    assert dependencies.git is None
+    assert {"file": "src/*/__init__.py"} in dependencies.uv_cache_keys()
+
+
+def test_analyze_template_env():
+    template = (
+        '{{ base }}{% if env.CI %}{{ env["BUILD"] }}{{ env.get("RUN") }}{% endif %}'
+    )
+    dependencies = analyze(schemas.UvDynamicVersioning(format_jinja=template))
+    assert dependencies.env == {"UV_DYNAMIC_VERSIONING_BYPASS", "CI", "BUILD", "RUN"}
+    assert dependencies.exact
+
+    template = "{{ base }}{{ env | length }}"
+    assert not analyze(schemas.UvDynamicVersioning(format_jinja=template)).exact
+
+
+@pytest.mark.usefixtures("semver_tag")
+def test_inputs(monkeypatch: pytest.MonkeyPatch):
+    config = schemas.UvDynamicVersioning(
+        format_jinja="{{ base }}{{ env.get('LOCAL', '') }}"
+    )
+    values = inputs(config)
+    assert values["fields"] == {"base": "1.0.0"}
+    assert values["env"] == {"LOCAL": None, "UV_DYNAMIC_VERSIONING_BYPASS": None}
+    assert fingerprint(values) == fingerprint(inputs(config))
+
+    monkeypatch.setenv("LOCAL", "+local")
+    assert fingerprint(inputs(config)) != fingerprint(values)
+
+
+@pytest.mark.usefixtures("semver_tag")
+def test_cli_cache_key_output(tmp_path: Path):
+    path = tmp_path / ".version-key"
+    assert main(["cache-key", "--output", str(path)]) == 0
+    key = path.read_text(encoding="utf-8")
+    assert len(key.strip()) == 64
+    mtime = path.stat().st_mtime_ns
+
+    assert main(["cache-key", "--output", str(path)]) == 0
+    assert path.stat().st_mtime_ns == mtime
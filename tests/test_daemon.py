@@ -0,0 +1,131 @@
+import socket
+import tempfile
+import threading
+import time
+from collections.abc import Iterator
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+from dunamai import Version
+from git import Repo
+
+from uv_dynamic_versioning import schemas
+from uv_dynamic_versioning.daemon import VersionDaemon, query, serve, socket_path
+from uv_dynamic_versioning.main import get_version
+
+
+@pytest.fixture
+def socket_dir(monkeypatch: pytest.MonkeyPatch) -> Iterator[Path]:
+    # Unix socket paths are limited to about 100 characters
+    with tempfile.TemporaryDirectory(dir="/tmp") as directory:
+        monkeypatch.delenv("XDG_RUNTIME_DIR", raising=False)
+        monkeypatch.setenv("TMPDIR", directory)
+        yield Path(directory)
+
+
+@pytest.fixture
+def daemon(socket_dir: Path) -> Iterator[Path]:
+    path = socket_path(Path())
+    thread = threading.Thread(
+        target=serve, args=(Path(),), kwargs={"idle_timeout": 1, "poll_interval": 0.05}
+    )
+    thread.start()
+    deadline = time.monotonic() + 5
+    while not path.exists() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    yield path
+    thread.join()
+    assert not path.exists()
+
+
+@pytest.mark.usefixtures("socket_dir")
+def test_query_without_daemon():
+    assert query(schemas.UvDynamicVersioning()) is None
+
+
+@pytest.mark.usefixtures("semver_tag", "daemon")
+def test_get_version_from_daemon():
+    config = schemas.UvDynamicVersioning()
+    expected = get_version(config, fields=())
+    assert get_version(config, daemon=True, fields=()) == expected
+
+    with patch.object(Version, "from_vcs", side_effect=AssertionError):
+        assert get_version(config, daemon=True, fields=()) == expected
+
+
+@pytest.mark.usefixtures("semver_tag", "daemon")
+def test_daemon_notices_new_tags(repo: Repo):
+    config = schemas.UvDynamicVersioning(highest_tag=True)
+    assert get_version(config, daemon=True, fields=())[0] == "1.0.0"
+
+    tag = repo.create_tag("v2.0.0")
+    try:
+        assert get_version(config, daemon=True, fields=())[0] == "2.0.0"
+    finally:
+        repo.delete_tag(tag)
+
+
+@pytest.mark.usefixtures("daemon")
+def test_daemon_only_serves_its_project(tmp_path: Path):
+    with patch(
+        "uv_dynamic_versioning.daemon.socket_path", return_value=socket_path(Path())
+    ):
+        assert query(schemas.UvDynamicVersioning(), tmp_path) is None
+
+
+def test_query_ignores_sockets_in_shared_directories(socket_dir: Path):
+    path = socket_path(Path())
+    path.parent.mkdir(mode=0o755)
+    path.parent.chmod(0o777)  # not affected by the umask
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as server:
+        server.bind(str(path))
+        server.listen()
+        server.setblocking(False)
+        assert query(schemas.UvDynamicVersioning()) is None
+        with pytest.raises(BlockingIOError):
+            server.accept()
+
+
+def test_query_ignores_files_that_are_not_sockets(socket_dir: Path):
+    path = socket_path(Path())
+    path.parent.mkdir(mode=0o700)
+    path.write_text("")
+    assert query(schemas.UvDynamicVersioning()) is None
+
+
+@pytest.mark.usefixtures("semver_tag")
+def test_serve_refuses_shared_directories(socket_dir: Path):
+    path = socket_path(Path())
+    path.parent.mkdir()
+    path.parent.chmod(0o777)
+    with pytest.raises(RuntimeError):
+        serve(Path(), idle_timeout=0)
+
+
+def test_daemon_resolves_the_dirty_flag_every_time(tmp_path: Path):
+    repo = Repo.init(tmp_path)
+    (tmp_path / "README.md").write_text("readme\n", encoding="utf-8")
+    repo.index.add(["README.md"])
+    repo.create_tag("v1.0.0", repo.index.commit("init"))
+
+    daemon = VersionDaemon(tmp_path)
+    config = schemas.UvDynamicVersioning(dirty=True)
+    fields = frozenset({"base", "dirty"})
+    assert not daemon.resolve(config, fields).dirty
+    (tmp_path / "README.md").write_text("changed\n", encoding="utf-8")
+    assert daemon.resolve(config, fields).dirty
+
+
+@pytest.mark.parametrize(
+    "request_",
+    [
+        [],
+        {},
+        {"root": "."},
+        {"root": ".", "config": []},
+        {"root": ".", "config": {}, "fields": "base"},
+    ],
+)
+def test_daemon_answers_malformed_requests_with_an_error(request_):
+    assert "error" in VersionDaemon(Path()).handle(request_)
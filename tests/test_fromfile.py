@@ -0,0 +1,69 @@
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from uv_dynamic_versioning import schemas
+from uv_dynamic_versioning.fromfile import read_version
+
+
+def test_sources_are_tried_in_order(tmp_path: Path):
+    (tmp_path / "b").mkdir()
+    (tmp_path / "b" / "VERSION").write_text("2.0.0\n")
+    (tmp_path / "c.txt").write_text("3.0.0\n")
+    (tmp_path / "d.txt").write_text("4.0.0\n")
+
+    from_file = schemas.FromFile(source=["a/VERSION", "b/VERSION", "*.txt"])
+    assert read_version(from_file, tmp_path) == "2.0.0"
+
+    from_file = schemas.FromFile(source=["a/VERSION", "*.txt"])
+    assert read_version(from_file, tmp_path) == "3.0.0"
+
+
+def test_sources_without_a_match_are_skipped(tmp_path: Path):
+    (tmp_path / "a.py").write_text("# no version here\n")
+    (tmp_path / "b.py").write_text('__version__ = "1.2.3"\n')
+
+    from_file = schemas.FromFile(
+        source=["a.py", "b.py"], pattern=r'^__version__ = "(.+)"$'
+    )
+    assert read_version(from_file, tmp_path) == "1.2.3"
+
+    from_file = schemas.FromFile(source=["a.py"], pattern=r'^__version__ = "(.+)"$')
+    with pytest.raises(ValueError, match="did not contain a match"):
+        read_version(from_file, tmp_path)
+
+
+def test_missing_sources(tmp_path: Path):
+    with pytest.raises(FileNotFoundError):
+        read_version(schemas.FromFile(source="VERSION"), tmp_path)
+
+    with pytest.raises(ValueError, match="None of the files"):
+        read_version(schemas.FromFile(source=["VERSION", "*.txt"]), tmp_path)
+
+
+def test_pattern_matches_like_a_search_of_the_whole_file(tmp_path: Path):
+    path = tmp_path / "big.py"
+    path.write_text(
+        'version = "1.0.0"\n' + "x = 1\n" * 4 * 1024 + 'version = "2.0.0"\n',
+        encoding="utf-8",
+    )
+
+    # the end of the first 8 KiB read must not pass for the end of the file
+    from_file = schemas.FromFile(source="big.py", pattern=r'version = "(.*)"\Z')
+    assert read_version(from_file, tmp_path) == "2.0.0"
+    from_file = schemas.FromFile(source="big.py", pattern=r'(?s)version = "(.*)"')
+    assert read_version(from_file, tmp_path).endswith('"2.0.0')
+
+
+def test_results_are_reused_until_the_file_changes(tmp_path: Path):
+    path = tmp_path / "VERSION"
+    path.write_text("1.0.0\n")
+    from_file = schemas.FromFile(source="VERSION")
+    assert read_version(from_file, tmp_path) == "1.0.0"
+
+    with patch.object(Path, "open", side_effect=AssertionError):
+        assert read_version(from_file, tmp_path) == "1.0.0"
+
+    path.write_text("1.0.10\n")  # a different size, whatever the mtime resolution
+    assert read_version(from_file, tmp_path) == "1.0.10"
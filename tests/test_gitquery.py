@@ -0,0 +1,138 @@
+import contextlib
+import sys
+from collections.abc import Iterator
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+from dunamai import Vcs, Version
+from git import Repo
+
+import uv_dynamic_versioning
+from uv_dynamic_versioning import schemas
+from uv_dynamic_versioning.commands import run
+from uv_dynamic_versioning.gitquery import from_git
+from uv_dynamic_versioning.gitreader import UnsupportedRepository
+from uv_dynamic_versioning.main import get_version
+
+from .utils import dirty, empty_commit
+
+
+def assert_same_as_cli(**kwargs):
+    expected = Version.from_git(**kwargs)
+    actual = from_git(**kwargs)
+    assert repr(actual) == repr(expected)
+    assert actual._matched_tag == expected._matched_tag
+    assert actual.concerns == expected.concerns
+
+
+@pytest.mark.usefixtures("semver_tag")
+@pytest.mark.parametrize(
+    "kwargs",
+    [
+        {},
+        {"full_commit": True},
+        {"commit_length": 10},
+        {"highest_tag": True},
+        {"latest_tag": True},
+        {"ignore_untracked": True},
+        {"pattern_prefix": "foo-"},
+    ],
+)
+def test_from_git_matches_cli(kwargs: dict):
+    assert_same_as_cli(**kwargs)
+
+
+@pytest.mark.usefixtures("semver_tag")
+def test_from_git_matches_cli_with_distance(repo: Repo):
+    with empty_commit(repo):
+        assert_same_as_cli()
+
+
+@pytest.mark.usefixtures("semver_tag")
+def test_from_git_matches_cli_with_untracked_file(repo: Repo):
+    with dirty(repo):
+        assert_same_as_cli()
+        assert_same_as_cli(ignore_untracked=True)
+
+
+def test_from_git_matches_cli_without_commits(tmp_path: Path):
+    Repo.init(tmp_path)
+    assert_same_as_cli(path=tmp_path)
+    with pytest.raises(RuntimeError):
+        from_git(path=tmp_path, strict=True)
+
+
+def test_from_git_outside_of_a_repository(tmp_path: Path):
+    with pytest.raises(UnsupportedRepository):
+        from_git(path=tmp_path, vcs=Vcs.Any)
+    with pytest.raises(RuntimeError, match="does not appear to be a Git project"):
+        from_git(path=tmp_path)
+    with pytest.raises(RuntimeError, match="does not appear to be a Git project"):
+        from_git(path=tmp_path, fields=frozenset({"base"}))
+
+
+@pytest.mark.usefixtures("prerelease_tag")
+def test_get_version_with_concurrent_git_backend():
+    config = schemas.UvDynamicVersioning.from_dict({"git-backend": "cli-concurrent"})
+    assert get_version(config)[0] == "1.0.0a1"
+
+
+@contextlib.contextmanager
+def recorded_commands() -> Iterator[list[str]]:
+    recorded: list[str] = []
+
+    def record(command: str, *args, **kwargs):
+        recorded.append(command)
+        return run(command, *args, **kwargs)
+
+    with patch("uv_dynamic_versioning.commands.run", record):
+        yield recorded
+
+
+@pytest.mark.usefixtures("semver_tag")
+@pytest.mark.parametrize("concurrent", [True, False])
+def test_from_git_only_queries_the_fields_given(repo: Repo, concurrent: bool):
+    with empty_commit(repo), recorded_commands() as commands:
+        version = from_git(fields=frozenset({"base"}), concurrent=concurrent)
+
+    assert version.base == "1.0.0"
+    assert version.distance == 0
+    assert version.dirty is None
+    assert version.branch is None
+    assert version.timestamp is None
+    assert not [c for c in commands if "status" in c or "describe" in c]
+    assert not [c for c in commands if "rev-list" in c]
+
+
+@pytest.mark.usefixtures("semver_tag")
+def test_get_version_skips_the_dirty_check_when_unused(repo: Repo):
+    config = schemas.UvDynamicVersioning(format="{base}+{distance}")
+    with dirty(repo), empty_commit(repo), recorded_commands() as commands:
+        assert get_version(config, fields=())[0] == "1.0.0+1"
+        assert not [c for c in commands if "status" in c]
+
+        # every field is resolved by default
+        assert get_version(config)[1].dirty
+
+
+@pytest.mark.usefixtures("semver_tag")
+def test_get_version_without_gitquery_uses_dunamai(monkeypatch: pytest.MonkeyPatch):
+    # e.g. a Dunamai without the private helpers it's built on
+    monkeypatch.delattr(uv_dynamic_versioning, "gitquery")
+    config = schemas.UvDynamicVersioning(format="{base}")
+    with (
+        patch.dict(sys.modules, {"uv_dynamic_versioning.gitquery": None}),
+        patch.object(Version, "from_vcs", wraps=Version.from_vcs) as from_vcs,
+    ):
+        assert get_version(config, fields=())[0] == "1.0.0"
+    from_vcs.assert_called_once()
+
+
+@pytest.mark.usefixtures("semver_tag")
+def test_get_version_restores_dunamai():
+    import dunamai
+
+    original = dunamai._run_cmd
+    get_version(schemas.UvDynamicVersioning())
+    assert dunamai._run_cmd is original
@@ -0,0 +1,113 @@
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+from dunamai import Version
+from git import Repo, TagReference
+
+from uv_dynamic_versioning import schemas
+from uv_dynamic_versioning.gitreader import (
+    Repository,
+    UnsupportedRepository,
+    discovered,
+    from_git,
+    shared_repositories,
+)
+from uv_dynamic_versioning.main import get_version
+
+from .utils import dirty, empty_commit
+
+
+def assert_same_as_cli(**kwargs):
+    expected = Version.from_git(**kwargs)
+    actual = from_git(**kwargs)
+    assert repr(actual) == repr(expected)
+    assert actual._matched_tag == expected._matched_tag
+
+
+@pytest.mark.usefixtures("semver_tag")
+@pytest.mark.parametrize(
+    "kwargs",
+    [
+        {},
+        {"full_commit": True},
+        {"commit_length": 10},
+        {"highest_tag": True},
+        {"latest_tag": True},
+        {"ignore_untracked": True},
+    ],
+)
+def test_from_git_matches_cli(kwargs: dict):
+    assert_same_as_cli(**kwargs)
+
+
+@pytest.mark.usefixtures("semver_tag")
+def test_from_git_matches_cli_with_distance(repo: Repo):
+    with empty_commit(repo):
+        assert_same_as_cli()
+
+
+@pytest.mark.usefixtures("semver_tag")
+def test_from_git_matches_cli_with_untracked_file(repo: Repo):
+    with dirty(repo):
+        assert_same_as_cli()
+        assert_same_as_cli(ignore_untracked=True)
+
+
+def test_from_git_peels_annotated_tags(repo: Repo):
+    tag = repo.create_tag("v2.0.0", message="release")
+    try:
+        assert_same_as_cli()
+        assert from_git().base == "2.0.0"
+    finally:
+        repo.delete_tag(tag)
+
+
+def test_repository_reads_tags(semver_tag: TagReference):
+    repository = Repository.discover()
+    assert repository is not None
+    assert repository.tags()["refs/tags/v1.0.0"] == semver_tag.commit.hexsha
+
+
+def test_repository_close_releases_packs(tmp_path: Path):
+    packed = Repo.init(tmp_path)
+    commit = packed.index.commit("init")
+    packed.git.gc()
+
+    with discovered(tmp_path) as repository:
+        assert repository is not None
+        assert repository.commit(commit.hexsha).parents == []
+        packs = repository.packs
+        assert packs
+    assert all(pack.idx.closed and pack._pack is None for pack in packs)
+
+    with shared_repositories():
+        with discovered(tmp_path) as repository:
+            assert repository is not None
+            repository.commit(commit.hexsha)
+            packs = repository.packs
+        # shared repositories stay open for the rest of the block
+        assert not any(pack.idx.closed for pack in packs)
+    assert all(pack.idx.closed for pack in packs)
+
+
+@pytest.mark.usefixtures("semver_tag")
+def test_get_version_with_python_git_backend_does_not_run_git():
+    config = schemas.UvDynamicVersioning.from_dict({"git-backend": "python"})
+    with patch("subprocess.run", side_effect=AssertionError):
+        assert get_version(config)[0] == "1.0.0"
+
+
+@pytest.mark.usefixtures("semver_tag")
+def test_get_version_falls_back_to_cli_when_unsupported():
+    config = schemas.UvDynamicVersioning(git_backend=schemas.GitBackend.Python)
+    with patch(
+        "uv_dynamic_versioning.gitreader.from_config",
+        side_effect=UnsupportedRepository,
+    ):
+        assert get_version(config)[0] == "1.0.0"
+
+
+def test_invalid_git_backend():
+    with pytest.raises(ValueError):
+        schemas.UvDynamicVersioning.from_dict({"git-backend": "invalid"})
@@ -0,0 +1,66 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+# cumulative import time budgets in microseconds, as reported by `-X importtime`
+IMPORT_TIME_BUDGETS = {
+    "uv_dynamic_versioning.hooks": 100_000,
+    "uv_dynamic_versioning.cli": 250_000,
+    "uv_dynamic_versioning.main": 250_000,
+}
+
+# modules that are only needed by some code paths, so must not be loaded eagerly
+LAZY_MODULES = {
+    "uv_dynamic_versioning.hooks": {
+        "dunamai",
+        "jinja2",
+        "tomlkit",
+        "uv_dynamic_versioning.metadata_hook",
+        "uv_dynamic_versioning.version_source",
+    },
+    "uv_dynamic_versioning.cli": {
+        "hatchling",
+        "jinja2",
+        "tomlkit",
+        "uv_dynamic_versioning.gitreader",
+    },
+    "uv_dynamic_versioning.main": {
+        "hatchling",
+        "jinja2",
+        "tomlkit",
+        "uv_dynamic_versioning.gitreader",
+    },
+}
+
+
+def import_times(module: str) -> dict[str, int]:
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+        env={**os.environ, "PYTHONPATH": os.pathsep.join(sys.path)},
+    )
+
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.removeprefix("import time:").split("|")
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+@pytest.mark.parametrize("module", IMPORT_TIME_BUDGETS)
+def test_lazy_modules_are_not_imported(module: str):
+    imported = import_times(module).keys()
+    assert not LAZY_MODULES[module] & imported
+
+
+@pytest.mark.parametrize("module", IMPORT_TIME_BUDGETS)
+def test_import_time_budget(module: str):
+    # take the best of a few runs to keep noisy machines from failing the test
+    elapsed = min(import_times(module)[module] for _ in range(3))
+    assert elapsed <= IMPORT_TIME_BUDGETS[module]
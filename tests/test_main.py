@@ -1,12 +1,13 @@
+import json
 from pathlib import Path
 
 import pytest
 from dunamai import Style, Version
 from git import Repo
 
-from uv_dynamic_versioning import schemas
+from uv_dynamic_versioning import cli, schemas
 from uv_dynamic_versioning.base import BasePlugin
-from uv_dynamic_versioning.main import get_version, read
+from uv_dynamic_versioning.main import get_version, load, read
 
 
 @pytest.mark.usefixtures("semver_tag")
@@ -141,3 +142,34 @@ def test_from_file_decodes_utf8_regardless_of_locale():
     plugin = BasePlugin()
     plugin.root = "tests/fixtures/with-from-file-non-ascii"  # type: ignore[attr-defined]
     assert get_version(plugin.project_config)[0] == "0.0.0"
+
+
+def test_load_is_memoized_until_pyproject_changes(tmp_path: Path):
+    pyproject = tmp_path / "pyproject.toml"
+    pyproject.write_text('[tool.uv-dynamic-versioning]\npattern = "a"\n')
+
+    project = load(str(tmp_path))
+    assert load(str(tmp_path)) is project
+
+    pyproject.write_text('[tool.uv-dynamic-versioning]\npattern = "bb"\n')
+    reloaded = load(str(tmp_path))
+    assert reloaded is not project
+    assert reloaded.tool.uv_dynamic_versioning is not None
+    assert reloaded.tool.uv_dynamic_versioning.pattern == "bb"
+
+
+@pytest.mark.usefixtures("semver_tag")
+def test_cli_json(monkeypatch: pytest.MonkeyPatch, capsys: pytest.CaptureFixture):
+    config = schemas.UvDynamicVersioning(
+        format="v{base}",
+        templates={"docker": "{{ base }}-{{ distance }}"},  # type: ignore[arg-type]
+    )
+    monkeypatch.setattr(cli, "_config", lambda: config)
+
+    assert cli.main(["--json"]) == 0
+    result = json.loads(capsys.readouterr().out)
+    assert result["version"] == "v1.0.0"
+    assert result["styles"] == {"pep440": "1.0.0", "semver": "1.0.0", "pvp": "1.0.0"}
+    assert result["fields"]["base"] == "1.0.0"
+    assert result["fields"]["distance"] == 0
+    assert result["templates"] == {"docker": "1.0.0-0"}
@@ -0,0 +1,95 @@
+from pathlib import Path
+
+import pytest
+from dunamai import Version
+from git import Repo
+
+from uv_dynamic_versioning import schemas
+from uv_dynamic_versioning.cli import main
+from uv_dynamic_versioning.main import get_version
+from uv_dynamic_versioning.manifest import dumps, from_manifest, generate
+
+CONFIG = schemas.UvDynamicVersioning(tag_manifest="tag-manifest.json")
+
+
+def commit(repo: Repo, message: str) -> None:
+    repo.git.commit("--allow-empty", "-m", message)
+
+
+@pytest.fixture
+def origin(tmp_path: Path) -> Repo:
+    repo = Repo.init(tmp_path / "origin", initial_branch="main")
+    with repo.config_writer() as config:
+        config.set_value("user", "name", "test")
+        config.set_value("user", "email", "test@example.com")
+
+    commit(repo, "a")
+    repo.create_tag("v1.0.0")
+    commit(repo, "b")
+    repo.git.checkout("-b", "feature")
+    commit(repo, "c")
+    repo.git.checkout("main")
+    commit(repo, "d")
+    repo.git.merge("--no-ff", "-m", "merge", "feature")
+    repo.create_tag("v1.1.0", message="release")
+    commit(repo, "e")
+
+    root = Path(repo.working_dir)
+    (root / "tag-manifest.json").write_text(dumps(generate(CONFIG, root)))
+    repo.git.add("tag-manifest.json")
+    commit(repo, "manifest")
+    return repo
+
+
+def clone(origin: Repo, path: Path, depth: int) -> Path:
+    Repo.clone_from(f"file://{origin.working_dir}", path, depth=depth)
+    return path
+
+
+@pytest.mark.parametrize(("commits", "depth"), [(0, 1), (0, 3), (2, 3)])
+def test_from_manifest_matches_full_clone(
+    origin: Repo, tmp_path: Path, commits: int, depth: int
+):
+    for n in range(commits):
+        commit(origin, f"after manifest {n}")
+
+    root = clone(origin, tmp_path / "clone", depth)
+    expected = Version.from_git(path=Path(origin.working_dir))
+    actual = from_manifest(CONFIG, root)
+    assert repr(actual) == repr(expected)
+    assert actual is not None
+    assert actual._matched_tag == "v1.1.0"
+
+
+def test_from_manifest_ignores_full_clones(origin: Repo):
+    assert from_manifest(CONFIG, Path(origin.working_dir)) is None
+
+
+def test_from_manifest_ignores_unconnected_history(origin: Repo, tmp_path: Path):
+    commit(origin, "g")
+    root = clone(origin, tmp_path / "clone", 1)
+    assert from_manifest(CONFIG, root) is None
+    # without the manifest, Git only sees the one commit of the shallow clone
+    assert (
+        get_version(CONFIG, root=root)[0]
+        == "0.0.0.post1.dev0+" + (origin.head.commit.hexsha[:7])
+    )
+
+
+def test_generate_requires_a_full_clone(origin: Repo, tmp_path: Path):
+    root = clone(origin, tmp_path / "clone", 1)
+    with pytest.raises(RuntimeError):
+        generate(CONFIG, root)
+
+
+def test_cli_manifest(
+    origin: Repo, monkeypatch: pytest.MonkeyPatch, capsys: pytest.CaptureFixture[str]
+):
+    root = Path(origin.working_dir)
+    monkeypatch.chdir(root)
+    (root / "pyproject.toml").write_text(
+        '[tool.uv-dynamic-versioning]\ntag-manifest = "tag-manifest.json"\n'
+    )
+    assert main(["manifest"]) == 0
+    assert capsys.readouterr().out == "tag-manifest.json\n"
+    assert (root / "tag-manifest.json").read_text() == dumps(generate(CONFIG, root))
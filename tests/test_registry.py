@@ -0,0 +1,74 @@
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+from git import Repo, TagReference
+
+from uv_dynamic_versioning import registry, schemas
+from uv_dynamic_versioning.main import get_version, read
+from uv_dynamic_versioning.metadata_hook import DependenciesMetadataHook
+from uv_dynamic_versioning.version_source import DynamicVersionSource
+
+ROOT = "tests/fixtures/with-pep440/"
+
+
+def test_plugins_share_one_resolution(semver_tag: TagReference):
+    with (
+        patch(
+            "uv_dynamic_versioning.registry.get_version", wraps=get_version
+        ) as mock_get_version,
+        patch("uv_dynamic_versioning.main.read", wraps=read) as mock_read,
+    ):
+        source = DynamicVersionSource(ROOT, {})
+        hook = DependenciesMetadataHook(ROOT, {"dependencies": ["foo=={{ version }}"]})
+
+        assert source.get_version_data()["version"] == "1.0.0"
+        assert hook.render_dependencies() == ["foo==1.0.0"]
+
+    assert mock_get_version.call_count == 1
+    # the project may already be memoized by `main.load` from another test
+    assert mock_read.call_count <= 1
+
+
+@pytest.mark.usefixtures("semver_tag")
+def test_resolve_version_is_keyed_on_bypass(monkeypatch: pytest.MonkeyPatch):
+    config = schemas.UvDynamicVersioning()
+    assert registry.resolve_version(ROOT, config)[0] == "1.0.0"
+
+    monkeypatch.setenv("UV_DYNAMIC_VERSIONING_BYPASS", "2.0.0")
+    assert registry.resolve_version(ROOT, config)[0] == "2.0.0"
+
+
+@pytest.mark.usefixtures("semver_tag")
+def test_invalidate():
+    config = schemas.UvDynamicVersioning()
+    registry.resolve_version(ROOT, config)
+
+    with patch("uv_dynamic_versioning.registry.get_version") as mock_get_version:
+        mock_get_version.return_value = ("2.0.0", None)
+        assert registry.resolve_version(ROOT, config)[0] == "1.0.0"
+
+        registry.invalidate(ROOT)
+        assert registry.resolve_version(ROOT, config)[0] == "2.0.0"
+
+
+@pytest.mark.usefixtures("semver_tag")
+def test_resolve_version_resolves_missing_fields():
+    config = schemas.UvDynamicVersioning(format="{base}")
+    with patch(
+        "uv_dynamic_versioning.registry.get_version", wraps=get_version
+    ) as mock_get_version:
+        assert registry.resolve_version(ROOT, config)[1].branch is None
+        assert registry.resolve_version(ROOT, config, {"branch"})[1].branch
+        assert registry.resolve_version(ROOT, config)[1].branch
+
+    assert mock_get_version.call_count == 2
+
+
+def test_resolve_version_queries_the_root(tmp_path: Path):
+    root = tmp_path / "project"
+    repo = Repo.init(root)
+    repo.create_tag("v3.0.0", repo.index.commit("init"))
+
+    # the current directory is another repository
+    assert registry.resolve_version(root, schemas.UvDynamicVersioning())[0] == "3.0.0"
@@ -1,4 +1,7 @@
+import dataclasses
+
 import pytest
+from dunamai import Vcs
 
 from uv_dynamic_versioning import schemas
 
@@ -63,8 +66,9 @@ def test_project_from_dict_missing_tool():
 def test_metadata_hook_config_valid():
     data = {"dependencies": ["a", "b"], "optional_dependencies": {"extra": ["c", "d"]}}
     config = schemas.MetadataHookConfig.from_dict(data)
-    assert config.dependencies == ["a", "b"]
-    assert config.optional_dependencies == {"extra": ["c", "d"]}
+    assert config.dependencies == ("a", "b")
+    assert config.optional_dependencies == (("extra", ("c", "d")),)
+    assert hash(config) == hash(schemas.MetadataHookConfig.from_dict(data))
 
 
 def test_metadata_hook_config_invalid_dependencies():
@@ -85,3 +89,70 @@ def test_uv_dynamic_versioning_highest_tag():
 def test_uv_dynamic_versioning_invalid_highest_tag():
     with pytest.raises(ValueError):
         schemas.UvDynamicVersioning.from_dict({"highest-tag": "not-a-bool"})
+
+
+def test_uv_dynamic_versioning_version_file():
+    config = schemas.UvDynamicVersioning.from_dict(
+        {"version-file": {"path": "src/foo/_version.py"}}
+    )
+    assert config.version_file == schemas.VersionFile(path="src/foo/_version.py")
+
+
+def test_uv_dynamic_versioning_invalid_version_file():
+    with pytest.raises(ValueError, match="version-file"):
+        schemas.UvDynamicVersioning(version_file="src/foo/_version.py")  # type: ignore
+
+
+def test_from_file_sources():
+    assert schemas.FromFile(source="VERSION").sources == ["VERSION"]
+    assert schemas.FromFile(source=["a", "b/*"]).sources == ["a", "b/*"]
+
+    with pytest.raises(ValueError):
+        schemas.FromFile(source=[])
+
+
+def test_uv_dynamic_versioning_is_frozen_and_hashable():
+    data = {
+        "vcs": "git",
+        "format-jinja-imports": [{"module": "foo"}],
+        "from-file": {"source": ["a", "b"]},
+    }
+    config = schemas.UvDynamicVersioning.from_dict(data)
+    assert config == schemas.UvDynamicVersioning.from_dict(data)
+    assert hash(config) == hash(schemas.UvDynamicVersioning.from_dict(data))
+    assert config.format_jinja_imports == (schemas.FormatJinjaImport(module="foo"),)
+
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        config.dirty = True  # type: ignore[misc]
+
+
+def test_uv_dynamic_versioning_fingerprint():
+    config = schemas.UvDynamicVersioning(vcs=Vcs.Git)
+    assert (
+        config.fingerprint() == schemas.UvDynamicVersioning(vcs=Vcs.Git).fingerprint()
+    )
+    assert config.fingerprint() != schemas.UvDynamicVersioning().fingerprint()
+    assert len(config.fingerprint()) == 64
+
+
+def test_uv_dynamic_versioning_invalid_format_jinja_imports():
+    with pytest.raises(ValueError, match="FormatJinjaImport"):
+        schemas.UvDynamicVersioning.from_dict({"format-jinja-imports": ["foo"]})
+
+
+def test_uv_dynamic_versioning_templates():
+    config = schemas.UvDynamicVersioning.from_dict(
+        {"templates": {"docker": "{{ base }}", "short": "{{ major }}"}}
+    )
+    assert config.templates == (("docker", "{{ base }}"), ("short", "{{ major }}"))
+    assert hash(config) == hash(dataclasses.replace(config))
+
+    with pytest.raises(ValueError, match="templates"):
+        schemas.UvDynamicVersioning.from_dict({"templates": {"docker": 1}})
+
+
+def test_uv_dynamic_versioning_vcs_timeout():
+    assert schemas.UvDynamicVersioning.from_dict({"vcs-timeout": 2}).vcs_timeout == 2
+    for value in ("2s", True, 0, -1.5):
+        with pytest.raises(ValueError, match="vcs-timeout"):
+            schemas.UvDynamicVersioning.from_dict({"vcs-timeout": value})
@@ -0,0 +1,93 @@
+import io
+import json
+
+import pytest
+from dunamai import Style
+
+from uv_dynamic_versioning.cli import main
+from uv_dynamic_versioning.main import check_version_style
+from uv_dynamic_versioning.styles import check_versions, sort_versions
+
+
+@pytest.mark.parametrize(
+    ("version", "pep440", "semver", "pvp"),
+    [
+        ("1.0.0", True, True, True),
+        ("1.0.0rc1.post2.dev3+g1a2b3c4", True, False, False),
+        ("1.0.0-alpha.1+build.5", False, True, False),
+        ("1.02.0", True, False, True),
+        ("1.0-a", False, False, True),
+        ("not a version", False, False, False),
+    ],
+)
+def test_check_versions(version: str, pep440: bool, semver: bool, pvp: bool):
+    (checked,) = check_versions([version])
+    assert checked.styles == {
+        Style.Pep440: pep440,
+        Style.SemVer: semver,
+        Style.Pvp: pvp,
+    }
+
+    for style, valid in checked.styles.items():
+        if valid:
+            check_version_style(version, style)
+        else:
+            with pytest.raises(ValueError):
+                check_version_style(version, style)
+
+
+def test_check_versions_streams():
+    def versions():
+        yield "1.0.0"
+        raise AssertionError("consumed ahead of the caller")
+
+    checked = next(check_versions(versions(), [Style.Pep440]))
+    assert checked.styles == {Style.Pep440: True}
+
+
+def test_sort_versions():
+    versions = ["1.0.0", "foo", "1.0.0rc1", "0.9", "1.0.0.post1", "1!0.1", "1.0.0.dev1"]
+    assert sort_versions(versions) == [
+        "0.9",
+        "1.0.0.dev1",
+        "1.0.0rc1",
+        "1.0.0",
+        "1.0.0.post1",
+        "1!0.1",
+        "foo",
+    ]
+    keys = [checked.key for checked in check_versions(["1.0", "1.0.0"])]
+    assert keys[0] == keys[1]
+
+
+@pytest.mark.parametrize("version", ["v1.0", " 1.0", "1.0-beta"])
+def test_versions_only_normalized_to_pep440_have_no_key(version: str):
+    (checked,) = check_versions([version])
+    assert checked.key is None
+    assert sort_versions([version, "2.0"]) == ["2.0", version]
+
+
+def test_cli_check(monkeypatch: pytest.MonkeyPatch, capsys: pytest.CaptureFixture):
+    monkeypatch.setattr("sys.stdin", io.StringIO("1.0.0\n\n1.0.0-rc.1\n"))
+    assert main(["check"]) == 0
+    results = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert [result["version"] for result in results] == ["1.0.0", "1.0.0-rc.1"]
+    assert results[1]["styles"] == {"pep440": False, "semver": True, "pvp": False}
+
+    monkeypatch.setattr("sys.stdin", io.StringIO("1.0.0\n1.0.0-rc.1\n"))
+    assert main(["check", "--style", "pep440"]) == 1
+
+
+def test_versions_packaging_rejects_have_no_key(
+    monkeypatch: pytest.MonkeyPatch, capsys: pytest.CaptureFixture
+):
+    # valid for Dunamai's PEP 440 pattern, but not for `packaging`
+    (checked,) = check_versions(["1.0.0+a..b"])
+    assert checked.styles[Style.Pep440]
+    assert checked.key is None
+    assert sort_versions(["1.0.0+a..b", "2.0"]) == ["2.0", "1.0.0+a..b"]
+
+    monkeypatch.setattr("sys.stdin", io.StringIO("1.0.0+a..b\n1.0.0\n"))
+    assert main(["check"]) == 0
+    results = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert [result["key"] is None for result in results] == [True, False]
@@ -0,0 +1,92 @@
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+from dunamai import Version
+from git import Repo
+
+from uv_dynamic_versioning import schemas
+from uv_dynamic_versioning.gitreader import Repository, from_git
+from uv_dynamic_versioning.main import get_version
+from uv_dynamic_versioning.tagindex import TagIndex, sort_key
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    monkeypatch.setenv("UV_DYNAMIC_VERSIONING_CACHE_DIR", str(tmp_path))
+    return tmp_path
+
+
+@pytest.fixture
+def tags(repo: Repo):
+    created = [
+        repo.create_tag("v1.0"),
+        repo.create_tag("v1.0.0", message="release"),
+        repo.create_tag("v1.0.0rc1"),
+        repo.create_tag("v0.9.0+linux"),
+    ]
+    try:
+        yield created
+    finally:
+        for tag in created:
+            repo.delete_tag(tag)
+
+
+def test_sort_key_orders_like_version():
+    versions = [
+        Version.parse(v)
+        for v in ["1.0.0", "1.0.0rc1", "1!0.1", "1.0.0.dev1", "1.0.0.post1", "0.9+a.1"]
+    ]
+    keys = [sort_key(v) for v in versions]
+    for a, key_a in zip(versions, keys, strict=True):
+        for b, key_b in zip(versions, keys, strict=True):
+            assert (key_a < key_b) == (a < b)
+
+
+@pytest.mark.usefixtures("tags")
+@pytest.mark.parametrize(
+    "kwargs",
+    [
+        {"highest_tag": True},
+        {"latest_tag": True},
+        {"highest_tag": True, "strict": True},
+    ],
+)
+def test_from_git_with_tag_index_matches_cli(kwargs: dict):
+    expected = Version.from_git(**kwargs)
+    for _ in range(2):  # with a cold, then a warm index
+        actual = from_git(tag_index=True, **kwargs)
+        assert repr(actual) == repr(expected)
+        assert actual._matched_tag == expected._matched_tag
+
+
+@pytest.mark.usefixtures("tags")
+def test_update_only_peels_changed_refs(repo: Repo):
+    repository = Repository.discover()
+    assert repository is not None
+    index = TagIndex.open(repository)
+    assert "refs/tags/v1.0.0" in index.update(repository)
+
+    tag = repo.create_tag("v2.0.0")
+    try:
+        repository = Repository.discover()
+        assert repository is not None
+        with patch.object(Repository, "peel", return_value=(None, None)) as peel:
+            entries = index.update(repository)
+        peel.assert_called_once_with(tag.object.hexsha)
+    finally:
+        repo.delete_tag(tag)
+
+    repository = Repository.discover()
+    assert repository is not None
+    assert "refs/tags/v2.0.0" not in index.update(repository)
+    assert "refs/tags/v2.0.0" in entries
+
+
+@pytest.mark.usefixtures("tags")
+def test_get_version_with_tag_index(cache_dir: Path):
+    expected = get_version(schemas.UvDynamicVersioning(highest_tag=True))[0]
+    config = schemas.UvDynamicVersioning(tag_index=True, highest_tag=True)
+    with patch("subprocess.run", side_effect=AssertionError):
+        assert get_version(config)[0] == expected
+    assert len(list(cache_dir.glob("tags-*.json"))) == 1
@@ -1,12 +1,21 @@
 from __future__ import annotations
 
+import dataclasses
 from datetime import datetime, timezone
+from importlib import import_module
+from unittest.mock import patch
 
+import jinja2
 import pytest
 from dunamai import Version
 
 from uv_dynamic_versioning import schemas
-from uv_dynamic_versioning.template import render_template
+from uv_dynamic_versioning.template import (
+    TemplateRenderer,
+    compile_template,
+    render_template,
+    template_cache_info,
+)
 
 
 @pytest.fixture
@@ -95,7 +104,7 @@ def test_when_rendering_version_with_escaped_branch_then_returns_escaped_branch(
     escape_with: str | None,
     expected: str,
 ):
-    config.escape_with = escape_with
+    config = dataclasses.replace(config, escape_with=escape_with)
     version.branch = "feature/new-branch"
     assert (
         render_template("{{- branch_escaped }}", version=version, config=config)
@@ -165,3 +174,50 @@ def test_when_rendering_version_with_tagged_metadata_then_returns_metadata(
         render_template("{{ tagged_metadata }}", version=version, config=config)
         == "build123"
     )
+
+
+def test_when_rendering_same_template_twice_then_compiles_it_once(
+    version: Version,
+    config: schemas.UvDynamicVersioning,
+):
+    compile_template.cache_clear()
+    for _ in range(3):
+        assert (
+            render_template("{{ base }}-cached", version=version, config=config)
+            == "1.0.0-cached"
+        )
+
+    info = template_cache_info()
+    assert info.misses == 1
+    assert info.hits == 2
+
+
+def test_when_rendering_with_cache_then_matches_uncached_jinja2(
+    version: Version,
+    config: schemas.UvDynamicVersioning,
+):
+    template = "{% if distance == 0 %}{{ base }}{% else %}{{ base }}+{{ distance }}{% endif %}\n"
+    expected = jinja2.Template(template).render(base=version.base, distance=0)
+    assert render_template(template, version=version, config=config) == expected
+
+
+def test_when_rendering_many_templates_then_imports_modules_once(
+    version: Version,
+):
+    config = schemas.UvDynamicVersioning.from_dict(
+        {"format-jinja-imports": [{"module": "math", "item": "pow"}]}
+    )
+    renderer = TemplateRenderer(version=version, config=config)
+
+    with patch(
+        "uv_dynamic_versioning.template.import_module", wraps=import_module
+    ) as mock_import_module:
+        assert renderer.render_all(["a=={{ base }}", "b=={{ pow(2, 2) }}"]) == [
+            "a==1.0.0",
+            "b==4.0",
+        ]
+        assert renderer.render_mapping({"extra": ["c=={{ major }}"]}) == {
+            "extra": ["c==1"]
+        }
+
+    assert mock_import_module.call_count == 1
@@ -0,0 +1,60 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from uv_dynamic_versioning import schemas, trace
+from uv_dynamic_versioning.cli import main
+from uv_dynamic_versioning.main import get_version
+
+
+@pytest.fixture
+def trace_file(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    path = tmp_path / "trace.jsonl"
+    monkeypatch.setenv(trace.TRACE_ENV, str(path))
+    return path
+
+
+def phases(path: Path) -> list[str]:
+    return [entry["phase"] for entry in trace.read_entries(path)]
+
+
+def test_tracing_is_disabled_by_default(tmp_path: Path):
+    with trace.span("phase"):
+        pass
+    assert not list(tmp_path.iterdir())
+
+
+@pytest.mark.usefixtures("semver_tag")
+def test_get_version_records_phases_and_commands(trace_file: Path):
+    config = schemas.UvDynamicVersioning.from_dict(
+        {"format-jinja": "{{ base }}", "style": "pep440"}
+    )
+    assert get_version(config)[0] == "1.0.0"
+
+    recorded = phases(trace_file)
+    assert {"from-file", "vcs", "render-template", "check-version-style"} <= set(
+        recorded
+    )
+    assert any(phase.startswith("command git") for phase in recorded)
+    commands = [e for e in trace.read_entries(trace_file) if "command" in e]
+    assert all(e["duration"] >= 0 and e["pid"] for e in commands)
+
+
+def test_summarize():
+    entries = [{"phase": "vcs", "duration": d / 100} for d in range(1, 101)]
+    entries.append({"phase": "read", "duration": 0.5})
+    assert trace.summarize(entries) == {
+        "read": {"count": 1, "p50": 0.5, "p95": 0.5},
+        "vcs": {"count": 100, "p50": 0.5, "p95": 0.95},
+    }
+
+
+def test_cli_stats(tmp_path: Path, capsys: pytest.CaptureFixture[str]):
+    path = tmp_path / "trace.jsonl"
+    path.write_text(
+        "\n".join(json.dumps({"phase": "vcs", "duration": d}) for d in (0.1, 0.2))
+    )
+    assert main(["stats", str(path)]) == 0
+    out = capsys.readouterr().out.splitlines()
+    assert out[1].split() == ["vcs", "2", "100.00", "200.00"]
@@ -0,0 +1,53 @@
+import threading
+from pathlib import Path
+
+import pytest
+from git import Repo
+
+from uv_dynamic_versioning import schemas
+from uv_dynamic_versioning.cli import main
+from uv_dynamic_versioning.versionfile import render, write
+from uv_dynamic_versioning.watch import watch
+
+
+def test_write_skips_unchanged_content(tmp_path: Path):
+    path = tmp_path / "pkg" / "_version.py"
+    assert write(path, render("1.0.0"))
+    path.chmod(0o640)
+    mtime = path.stat().st_mtime_ns
+
+    assert not write(path, render("1.0.0"))
+    assert path.stat().st_mtime_ns == mtime
+
+    assert write(path, render("1.1.0"))
+    assert path.read_text(encoding="utf-8") == render("1.1.0")
+    assert path.stat().st_mode & 0o777 == 0o640
+    assert list(path.parent.iterdir()) == [path]
+
+
+@pytest.mark.parametrize("poll", [True, False])
+@pytest.mark.usefixtures("semver_tag")
+def test_watch_rewrites_version_file(tmp_path: Path, repo: Repo, poll: bool):
+    path = tmp_path / "_version.py"
+    config = schemas.UvDynamicVersioning(highest_tag=True)
+    version_file = schemas.VersionFile(str(path))
+    results = watch(config, version_file, poll=poll, poll_interval=0.05)
+
+    assert next(results) == {"version": "1.0.0"}
+    assert path.read_text(encoding="utf-8") == render("1.0.0")
+
+    tag = repo.create_tag("v2.0.0")
+    try:
+        result: dict[str, str] = {}
+        thread = threading.Thread(target=lambda: result.update(next(results)))
+        thread.start()
+        thread.join(10)
+        assert result == {"version": "2.0.0"}
+        assert path.read_text(encoding="utf-8") == render("2.0.0")
+    finally:
+        repo.delete_tag(tag)
+
+
+def test_cli_watch_requires_a_version_file():
+    with pytest.raises(SystemExit, match="version-file"):
+        main(["watch"])
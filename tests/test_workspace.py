@@ -0,0 +1,150 @@
+from pathlib import Path
+
+import pytest
+from git import Repo
+
+from uv_dynamic_versioning import registry, workspace
+from uv_dynamic_versioning.main import load
+from uv_dynamic_versioning.metadata_hook import DependenciesMetadataHook
+
+DYNAMIC = """
+[project]
+name = "{name}"
+dynamic = ["version", "dependencies"]
+
+[tool.hatch.version]
+source = "uv-dynamic-versioning"
+
+[tool.hatch.metadata.hooks.uv-dynamic-versioning]
+dependencies = {dependencies}
+
+[tool.uv-dynamic-versioning]
+workspace = true
+"""
+
+
+def _project(root: Path, text: str) -> Path:
+    root.mkdir(parents=True, exist_ok=True)
+    (root / "pyproject.toml").write_text(text, encoding="utf-8")
+    return root
+
+
+@pytest.fixture
+def uv_workspace(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    monkeypatch.setenv("UV_DYNAMIC_VERSIONING_CACHE_DIR", str(tmp_path / "cache"))
+    root = tmp_path / "workspace"
+    _project(
+        root,
+        '[tool.uv.workspace]\nmembers = ["packages/*"]\nexclude = ["packages/skip"]\n',
+    )
+    packages = root / "packages"
+    _project(packages / "app", DYNAMIC.format(name="app", dependencies='["lib"]'))
+    _project(
+        packages / "lib",
+        DYNAMIC.format(
+            name="lib",
+            dependencies="[\"static_pkg=={{ workspace['Static.Pkg'] }}\"]",
+        ),
+    )
+    _project(packages / "static", '[project]\nname = "Static_Pkg"\nversion = "0.1.0"\n')
+    _project(packages / "skip", '[project]\nname = "skip"\nversion = "0.0.1"\n')
+
+    repo = Repo.init(root)
+    repo.index.add([str(path) for path in root.rglob("pyproject.toml")])
+    repo.index.commit("init")
+    repo.create_tag("v1.2.0")
+    monkeypatch.chdir(root)
+    yield root
+    workspace.invalidate()
+
+
+@pytest.fixture
+def resolutions(monkeypatch: pytest.MonkeyPatch) -> list[Path]:
+    calls = []
+    resolve = workspace._get_version
+
+    def wrapper(config, root, daemon, fields):
+        calls.append(root)
+        return resolve(config, root, daemon, fields)
+
+    monkeypatch.setattr(workspace, "_get_version", wrapper)
+    return calls
+
+
+def test_members(uv_workspace: Path):
+    found = {member.name: member for member in workspace.members(uv_workspace)}
+    assert set(found) == {"app", "lib", "static-pkg"}
+    assert found["static-pkg"].version == "0.1.0"
+    assert found["app"].config is not None
+    assert workspace.find_root(uv_workspace / "packages" / "app") == uv_workspace
+
+
+def test_versions(uv_workspace: Path):
+    versions = workspace.versions(uv_workspace / "packages" / "lib")
+    assert versions == {"app": "1.2.0", "lib": "1.2.0", "static-pkg": "0.1.0"}
+    assert versions["Static.Pkg"] == "0.1.0"
+    with pytest.raises(KeyError):
+        versions["missing"]
+
+
+def test_not_in_workspace(tmp_path: Path):
+    with pytest.raises(ValueError):
+        workspace.versions(_project(tmp_path / "alone", '[project]\nname = "a"\n'))
+
+
+def test_members_share_one_resolution(uv_workspace: Path, resolutions: list[Path]):
+    for name in ("app", "lib"):
+        root = uv_workspace / "packages" / name
+        config = load(str(root)).tool.uv_dynamic_versioning
+        assert config is not None
+        version, _ = registry.resolve_version(root, config)
+        assert version == "1.2.0"
+    assert resolutions == [uv_workspace]
+
+    # the build of each member runs in a process of its own
+    workspace.invalidate()
+    registry.invalidate()
+    assert workspace.versions(uv_workspace)["lib"] == "1.2.0"
+    assert resolutions == [uv_workspace]
+
+
+def test_metadata_hook_pins_siblings(uv_workspace: Path, resolutions: list[Path]):
+    root = uv_workspace / "packages" / "lib"
+    hook = DependenciesMetadataHook(
+        str(root), {"dependencies": ["static-pkg=={{ workspace['Static.Pkg'] }}"]}
+    )
+    metadata = {"name": "lib", "dynamic": ["dependencies"]}
+    hook.update(metadata)
+    assert metadata["dependencies"] == ["static-pkg==0.1.0"]
+
+    hook = DependenciesMetadataHook(
+        str(uv_workspace / "packages" / "app"),
+        {"dependencies": ["lib=={{ workspace.lib }}"]},
+    )
+    assert hook.render_dependencies() == ["lib==1.2.0"]
+    assert resolutions == [uv_workspace]
+
+
+def test_members_resolve_only_their_own_group(
+    uv_workspace: Path, resolutions: list[Path]
+):
+    # another configuration, whose version can't be stored since it uses dirty
+    _project(
+        uv_workspace / "packages" / "tool",
+        DYNAMIC.format(name="tool", dependencies="[]") + "dirty = true\n",
+    )
+    root = uv_workspace / "packages" / "app"
+    config = load(str(root)).tool.uv_dynamic_versioning
+    assert config is not None
+    assert registry.resolve_version(root, config)[0] == "1.2.0"
+    assert len(resolutions) == 1
+
+    # the version of the other group is still read back in another process
+    workspace.invalidate()
+    registry.invalidate()
+    assert registry.resolve_version(root, config)[0] == "1.2.0"
+    assert len(resolutions) == 1
+
+    versions = workspace.versions(uv_workspace)
+    assert versions["tool"] == "1.2.0+dirty"
+    assert len(resolutions) == 2